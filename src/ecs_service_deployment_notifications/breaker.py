@@ -0,0 +1,89 @@
+import threading
+import time
+from typing import Callable, TypeVar
+
+from . import metrics, retry
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    def _transition(self, state: str) -> None:
+        self._state = state
+        metrics.increment("CircuitBreakerTransitions", dimensions={"State": state})
+
+    def _before_call(self) -> None:
+        with self._lock:
+            state = self._current_state()
+            # only one trial call is let through while half open
+            if state == OPEN or (state == HALF_OPEN and self._trial_in_flight):
+                metrics.increment("CircuitBreakerRejected")
+                raise CircuitOpenError("Circuit breaker is open")
+            if state == HALF_OPEN:
+                self._trial_in_flight = True
+
+    def _end_trial(self) -> None:
+        with self._lock:
+            self._trial_in_flight = False
+
+    def _after_call(self, failed: bool) -> None:
+        with self._lock:
+            self._trial_in_flight = False
+            if not failed:
+                self._failures = 0
+                if self._state != CLOSED:
+                    self._transition(CLOSED)
+                return
+
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+                if self._state != OPEN:
+                    self._transition(OPEN)
+
+    def call(self, function: Callable[[], T]) -> T:
+        self._before_call()
+        try:
+            result = function()
+        except Exception as exc:
+            if retry.retryable(exc):
+                self._after_call(failed=True)
+            else:
+                # errors that say nothing about the downstream's health, such as bad input, leave the breaker as it was
+                self._end_trial()
+            raise
+        self._after_call(failed=False)
+        return result
@@ -0,0 +1,71 @@
+import logging
+from typing import Any
+
+from . import cache, clients, ecs, enrichment, metrics
+
+# cached for services without the tag, so they are not looked up again until it expires
+NO_CHANNEL = ""
+
+
+class ChannelTags:
+    def __init__(
+        self,
+        tag_key: str,
+        ttl: float,
+        negative_ttl: float,
+        cache_size: int,
+        client: Any = None,
+        enricher: enrichment.ServiceEnricher | None = None,
+    ) -> None:
+        self.tag_key = tag_key
+        self.negative_ttl = negative_ttl
+        self.enricher = enricher
+        self._client = client
+        self._channels = cache.TTLCache(maxsize=cache_size, ttl=ttl)
+
+    @property
+    def client(self) -> Any:
+        return self._client or clients.get_client("ecs")
+
+    def lookup(self, service_arns: list[ecs.ServiceArn]) -> dict[str, str]:
+        channels = {}
+        missing = []
+        for service_arn in service_arns:
+            channel = self._channels.get(service_arn.arn)
+            if channel is None:
+                missing.append(service_arn)
+            elif channel != NO_CHANNEL:
+                channels[service_arn.arn] = channel
+
+        for cluster_name, arns in ecs.describe_batches(missing):
+            channels.update(self._describe_tags(cluster_name, arns))
+        return channels
+
+    def _describe_tags(self, cluster_name: str, arns: list[str]) -> dict[str, str]:
+        metrics.increment("ChannelTagLookups")
+        try:
+            response = self.client.describe_services(cluster=cluster_name, services=arns, include=["TAGS"])
+        except Exception as exc:
+            # without the tags, notifications still go to the channels in the routing table
+            logging.warning(f"Failed to look up channel tags in {cluster_name}: {exc}")
+            metrics.increment("ChannelTagFailures")
+            # hold off looking up the same services again while ECS is failing, such as when it throttles
+            for arn in arns:
+                self._channels.set(arn, NO_CHANNEL, ttl=self.negative_ttl)
+            return {}
+
+        if self.enricher is not None:
+            self.enricher.record(response["services"])
+
+        channels = {}
+        untagged = set(arns)
+        for service in response["services"]:
+            for tag in service.get("tags", []):
+                if tag["key"] == self.tag_key and tag["value"]:
+                    channels[service["serviceArn"]] = tag["value"]
+                    self._channels.set(service["serviceArn"], tag["value"])
+                    untagged.discard(service["serviceArn"])
+
+        for arn in untagged:
+            self._channels.set(arn, NO_CHANNEL, ttl=self.negative_ttl)
+        return channels
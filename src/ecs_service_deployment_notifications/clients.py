@@ -0,0 +1,67 @@
+import dataclasses
+import threading
+from typing import TYPE_CHECKING, Any, Mapping
+
+if TYPE_CHECKING:
+    import botocore.config
+
+
+@dataclasses.dataclass(frozen=True)
+class ClientSettings:
+    max_pool_connections: int = 10
+    connect_timeout: float = 2
+    read_timeout: float = 5
+    tcp_keepalive: bool = True
+    retry_mode: str = "standard"
+    max_attempts: int = 3
+
+
+_clients: dict[str, Any] = {}
+_settings = ClientSettings()
+_overrides: Mapping[str, ClientSettings] = {}
+_lock = threading.Lock()
+
+
+def configure(settings: ClientSettings, overrides: Mapping[str, ClientSettings] | None = None) -> None:
+    global _settings, _overrides
+    with _lock:
+        _settings = settings
+        _overrides = overrides or {}
+        # clients keep the settings they were built with
+        _clients.clear()
+
+
+def client_config(settings: ClientSettings | None = None) -> "botocore.config.Config":
+    import botocore.config
+
+    settings = settings or _settings
+    return botocore.config.Config(
+        max_pool_connections=settings.max_pool_connections,
+        connect_timeout=settings.connect_timeout,
+        read_timeout=settings.read_timeout,
+        tcp_keepalive=settings.tcp_keepalive,
+        retries={"mode": settings.retry_mode, "max_attempts": settings.max_attempts},
+    )
+
+
+def get_client(service_name: str) -> Any:
+    client = _clients.get(service_name)
+    if client is not None:
+        return client
+
+    # boto3 is slow to import, so only pay for it once a client is actually needed
+    import boto3
+
+    with _lock:
+        if service_name not in _clients:
+            settings = _overrides.get(service_name, _settings)
+            _clients[service_name] = boto3.client(service_name, config=client_config(settings))
+        return _clients[service_name]
+
+
+def reset() -> None:
+    global _settings, _overrides
+    with _lock:
+        _clients.clear()
+        _settings = ClientSettings()
+        _overrides = {}
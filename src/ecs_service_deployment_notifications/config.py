@@ -0,0 +1,239 @@
+import dataclasses
+import json
+import logging
+from typing import Callable, Mapping, TypeVar
+
+T = TypeVar("T", int, float)
+
+
+class ConfigurationError(ValueError):
+    pass
+
+
+def _bool(environ: Mapping[str, str], name: str, default: bool) -> bool:
+    value = environ.get(name)
+    if value is None:
+        return default
+    if value.lower() not in ("true", "false"):
+        raise ConfigurationError(f"{name} must be true or false, got {value!r}")
+    return value.lower() == "true"
+
+
+def _number(environ: Mapping[str, str], name: str, cast: Callable[[str], T], default: T, minimum: T) -> T:
+    value = environ.get(name)
+    if value is None:
+        return default
+    try:
+        number = cast(value)
+    except ValueError:
+        raise ConfigurationError(f"{name} must be a number, got {value!r}") from None
+    if number < minimum:
+        raise ConfigurationError(f"{name} must be at least {minimum}, got {value!r}")
+    return number
+
+
+@dataclasses.dataclass(frozen=True)
+class Config:
+    slack_notifications_lambda_arn: str
+    routes: tuple[dict, ...]
+    log_level: str = "INFO"
+    aggregate_notifications: bool = False
+    notification_max_concurrency: int = 1
+    idempotency_store: str | None = None
+    idempotency_ttl_seconds: float = 86400
+    idempotency_cache_size: int = 1024
+    deployment_state_store: str | None = None
+    deployment_state_ttl_seconds: float = 86400
+    deployment_state_cache_size: int = 1024
+    suppress_in_progress_window_seconds: float = 0
+    deployment_timing_store: str | None = None
+    deployment_timing_ttl_seconds: float = 86400
+    deployment_timing_cache_size: int = 1024
+    deployment_duration_in_message: bool = False
+    channel_tag: str | None = None
+    channel_tag_ttl_seconds: float = 300
+    channel_tag_negative_ttl_seconds: float = 300
+    channel_tag_cache_size: int = 1024
+    enrich_services: bool = False
+    enrichment_ttl_seconds: float = 60
+    enrichment_cache_size: int = 1024
+    rate_limit_per_second: float = 0
+    rate_limit_burst: float = 1
+    overflow_queue: str | None = None
+    deadline_safety_margin_millis: int | None = None
+    send_budget_millis: int = 0
+    lambda_transport: str = "boto3"
+    lambda_transport_timeout_seconds: float = 5
+    lambda_endpoint_url: str | None = None
+    aws_region: str | None = None
+    aws_client_max_pool_connections: int = 10
+    aws_client_connect_timeout_seconds: float = 2
+    aws_client_read_timeout_seconds: float = 5
+    aws_client_tcp_keepalive: bool = True
+    aws_client_retry_mode: str = "standard"
+    aws_client_max_attempts: int = 3
+    slack_sink: str = "lambda"
+    slack_webhook_url: str | None = None
+    slack_bot_token: str | None = dataclasses.field(default=None, repr=False)
+    slack_api_url: str = "https://slack.com/api"
+    slack_timeout_seconds: float = 5
+    slack_max_retries: int = 2
+    slack_max_retry_after_seconds: float = 30
+    slack_message_mode: str = "post"
+    message_store: str = "memory://"
+    message_store_ttl_seconds: float = 86400
+    message_store_cache_size: int = 1024
+    retry_max_attempts: int = 1
+    retry_base_delay_millis: int = 100
+    retry_max_delay_millis: int = 2000
+    circuit_breaker_failure_threshold: int = 0
+    circuit_breaker_reset_seconds: float = 30
+    digest_window_seconds: int = 0
+    digest_store: str | None = None
+    digest_ttl_seconds: float = 86400
+    digest_post_failed_immediately: bool = False
+    emit_metrics: bool = False
+    metrics_namespace: str = "ECSServiceDeploymentNotifications"
+
+    @classmethod
+    def from_environ(cls, environ: Mapping[str, str]) -> "Config":
+        slack_sink = environ.get("SLACK_SINK", "lambda")
+        if slack_sink not in ("lambda", "webhook", "api"):
+            raise ConfigurationError(f"SLACK_SINK must be lambda, webhook or api, got {slack_sink!r}")
+        if slack_sink == "lambda" and not environ.get("SLACK_NOTIFICATIONS_LAMBDA_ARN"):
+            raise ConfigurationError("SLACK_NOTIFICATIONS_LAMBDA_ARN must be set")
+        if slack_sink == "webhook" and not environ.get("SLACK_WEBHOOK_URL"):
+            raise ConfigurationError("SLACK_WEBHOOK_URL must be set for the webhook sink")
+        if slack_sink == "api" and not environ.get("SLACK_BOT_TOKEN"):
+            raise ConfigurationError("SLACK_BOT_TOKEN must be set for the api sink")
+
+        slack_message_mode = environ.get("SLACK_MESSAGE_MODE", "post")
+        if slack_message_mode not in ("post", "update", "thread"):
+            raise ConfigurationError(f"SLACK_MESSAGE_MODE must be post, update or thread, got {slack_message_mode!r}")
+        if slack_message_mode != "post" and slack_sink != "api":
+            raise ConfigurationError("SLACK_MESSAGE_MODE update and thread need the api sink")
+
+        deployment_duration_in_message = _bool(environ, "DEPLOYMENT_DURATION_IN_MESSAGE", False)
+        if deployment_duration_in_message and not environ.get("DEPLOYMENT_TIMING_STORE"):
+            raise ConfigurationError("DEPLOYMENT_DURATION_IN_MESSAGE needs DEPLOYMENT_TIMING_STORE")
+
+        # the scheduled flush usually runs in another execution environment, which cannot see a local buffer
+        digest_window_seconds = _number(environ, "DIGEST_WINDOW_SECONDS", int, 0, 0)
+        if digest_window_seconds > 0 and not environ.get("DIGEST_STORE"):
+            raise ConfigurationError("DIGEST_WINDOW_SECONDS needs DIGEST_STORE")
+
+        if environ.get("ROUTING_TABLE"):
+            try:
+                routes = json.loads(environ["ROUTING_TABLE"])
+            except ValueError as exc:
+                raise ConfigurationError(f"ROUTING_TABLE is not valid JSON: {exc}") from None
+            if not isinstance(routes, list):
+                raise ConfigurationError("ROUTING_TABLE must be a list of routes")
+        elif environ.get("CLUSTER_NAME") and environ.get("SLACK_CHANNEL"):
+            routes = [{"cluster": environ["CLUSTER_NAME"], "channel": environ["SLACK_CHANNEL"]}]
+        else:
+            raise ConfigurationError("Either ROUTING_TABLE or CLUSTER_NAME and SLACK_CHANNEL must be set")
+
+        log_level = environ.get("LOG_LEVEL", "INFO")
+        if not isinstance(logging.getLevelName(log_level), int):
+            raise ConfigurationError(f"LOG_LEVEL is not a valid log level, got {log_level!r}")
+
+        rate_limit_per_second = _number(environ, "RATE_LIMIT_PER_SECOND", float, 0.0, 0.0)
+
+        lambda_transport = environ.get("LAMBDA_TRANSPORT", "boto3")
+        aws_region = environ.get("AWS_REGION") or environ.get("AWS_DEFAULT_REGION")
+        if lambda_transport not in ("boto3", "http"):
+            raise ConfigurationError(f"LAMBDA_TRANSPORT must be boto3 or http, got {lambda_transport!r}")
+        if lambda_transport == "http" and (
+            aws_region is None or "AWS_ACCESS_KEY_ID" not in environ or "AWS_SECRET_ACCESS_KEY" not in environ
+        ):
+            raise ConfigurationError("AWS_REGION and credentials must be set in the environment for the http transport")
+
+        aws_client_connect_timeout_seconds = _number(environ, "AWS_CLIENT_CONNECT_TIMEOUT", float, 2.0, 0.1)
+        aws_client_read_timeout_seconds = _number(environ, "AWS_CLIENT_READ_TIMEOUT", float, 5.0, 0.1)
+        lambda_transport_timeout_seconds = _number(environ, "LAMBDA_TRANSPORT_TIMEOUT_SECONDS", float, 5.0, 0.1)
+        slack_timeout_seconds = _number(environ, "SLACK_TIMEOUT_SECONDS", float, 5.0, 0.1)
+        if slack_sink != "lambda":
+            send_timeout_seconds = slack_timeout_seconds
+        elif lambda_transport == "http":
+            send_timeout_seconds = lambda_transport_timeout_seconds
+        else:
+            send_timeout_seconds = aws_client_connect_timeout_seconds + aws_client_read_timeout_seconds
+        deadline_safety_margin_millis = _number(environ, "DEADLINE_SAFETY_MARGIN_MILLIS", int, None, 0)
+        # a send that starts just before the deadline must time out before the function does
+        if deadline_safety_margin_millis is not None and deadline_safety_margin_millis < send_timeout_seconds * 1000:
+            raise ConfigurationError(
+                f"DEADLINE_SAFETY_MARGIN_MILLIS must be at least the send timeout of "
+                f"{round(send_timeout_seconds * 1000)} ms, got {deadline_safety_margin_millis}"
+            )
+
+        aws_client_retry_mode = environ.get("AWS_CLIENT_RETRY_MODE", "standard")
+        if aws_client_retry_mode not in ("legacy", "standard", "adaptive"):
+            raise ConfigurationError(
+                f"AWS_CLIENT_RETRY_MODE must be legacy, standard or adaptive, got {aws_client_retry_mode!r}"
+            )
+
+        return cls(
+            slack_notifications_lambda_arn=environ.get("SLACK_NOTIFICATIONS_LAMBDA_ARN", ""),
+            routes=tuple(routes),
+            log_level=log_level,
+            aggregate_notifications=_bool(environ, "AGGREGATE_NOTIFICATIONS", False),
+            notification_max_concurrency=_number(environ, "NOTIFICATION_MAX_CONCURRENCY", int, 1, 1),
+            idempotency_store=environ.get("IDEMPOTENCY_STORE") or None,
+            idempotency_ttl_seconds=_number(environ, "IDEMPOTENCY_TTL_SECONDS", float, 86400.0, 1.0),
+            idempotency_cache_size=_number(environ, "IDEMPOTENCY_CACHE_SIZE", int, 1024, 1),
+            deployment_state_store=environ.get("DEPLOYMENT_STATE_STORE") or None,
+            deployment_state_ttl_seconds=_number(environ, "DEPLOYMENT_STATE_TTL_SECONDS", float, 86400.0, 1.0),
+            deployment_state_cache_size=_number(environ, "DEPLOYMENT_STATE_CACHE_SIZE", int, 1024, 1),
+            suppress_in_progress_window_seconds=_number(
+                environ, "SUPPRESS_IN_PROGRESS_WINDOW_SECONDS", float, 0.0, 0.0
+            ),
+            deployment_timing_store=environ.get("DEPLOYMENT_TIMING_STORE") or None,
+            deployment_timing_ttl_seconds=_number(environ, "DEPLOYMENT_TIMING_TTL_SECONDS", float, 86400.0, 1.0),
+            deployment_timing_cache_size=_number(environ, "DEPLOYMENT_TIMING_CACHE_SIZE", int, 1024, 1),
+            deployment_duration_in_message=deployment_duration_in_message,
+            channel_tag=environ.get("CHANNEL_TAG") or None,
+            channel_tag_ttl_seconds=_number(environ, "CHANNEL_TAG_TTL_SECONDS", float, 300.0, 0.0),
+            channel_tag_negative_ttl_seconds=_number(environ, "CHANNEL_TAG_NEGATIVE_TTL_SECONDS", float, 300.0, 0.0),
+            channel_tag_cache_size=_number(environ, "CHANNEL_TAG_CACHE_SIZE", int, 1024, 1),
+            enrich_services=_bool(environ, "ENRICH_SERVICES", False),
+            enrichment_ttl_seconds=_number(environ, "ENRICHMENT_TTL_SECONDS", float, 60.0, 0.0),
+            enrichment_cache_size=_number(environ, "ENRICHMENT_CACHE_SIZE", int, 1024, 1),
+            rate_limit_per_second=rate_limit_per_second,
+            rate_limit_burst=_number(environ, "RATE_LIMIT_BURST", float, max(1.0, rate_limit_per_second), 1.0),
+            overflow_queue=environ.get("OVERFLOW_QUEUE") or None,
+            deadline_safety_margin_millis=deadline_safety_margin_millis,
+            send_budget_millis=_number(environ, "SEND_BUDGET_MILLIS", int, 0, 0),
+            lambda_transport=lambda_transport,
+            lambda_transport_timeout_seconds=lambda_transport_timeout_seconds,
+            lambda_endpoint_url=environ.get("LAMBDA_ENDPOINT_URL") or None,
+            aws_region=aws_region,
+            aws_client_max_pool_connections=_number(environ, "AWS_CLIENT_MAX_POOL_CONNECTIONS", int, 10, 1),
+            aws_client_connect_timeout_seconds=aws_client_connect_timeout_seconds,
+            aws_client_read_timeout_seconds=aws_client_read_timeout_seconds,
+            aws_client_tcp_keepalive=_bool(environ, "AWS_CLIENT_TCP_KEEPALIVE", True),
+            aws_client_retry_mode=aws_client_retry_mode,
+            aws_client_max_attempts=_number(environ, "AWS_CLIENT_MAX_ATTEMPTS", int, 3, 1),
+            slack_sink=slack_sink,
+            slack_webhook_url=environ.get("SLACK_WEBHOOK_URL") or None,
+            slack_bot_token=environ.get("SLACK_BOT_TOKEN") or None,
+            slack_api_url=environ.get("SLACK_API_URL") or "https://slack.com/api",
+            slack_timeout_seconds=slack_timeout_seconds,
+            slack_max_retries=_number(environ, "SLACK_MAX_RETRIES", int, 2, 0),
+            slack_max_retry_after_seconds=_number(environ, "SLACK_MAX_RETRY_AFTER_SECONDS", float, 30.0, 0.0),
+            slack_message_mode=slack_message_mode,
+            message_store=environ.get("MESSAGE_STORE") or "memory://",
+            message_store_ttl_seconds=_number(environ, "MESSAGE_STORE_TTL_SECONDS", float, 86400.0, 1.0),
+            message_store_cache_size=_number(environ, "MESSAGE_STORE_CACHE_SIZE", int, 1024, 1),
+            retry_max_attempts=_number(environ, "RETRY_MAX_ATTEMPTS", int, 1, 1),
+            retry_base_delay_millis=_number(environ, "RETRY_BASE_DELAY_MILLIS", int, 100, 0),
+            retry_max_delay_millis=_number(environ, "RETRY_MAX_DELAY_MILLIS", int, 2000, 0),
+            circuit_breaker_failure_threshold=_number(environ, "CIRCUIT_BREAKER_FAILURE_THRESHOLD", int, 0, 0),
+            circuit_breaker_reset_seconds=_number(environ, "CIRCUIT_BREAKER_RESET_SECONDS", float, 30.0, 0.0),
+            digest_window_seconds=digest_window_seconds,
+            digest_store=environ.get("DIGEST_STORE") or None,
+            digest_ttl_seconds=_number(environ, "DIGEST_TTL_SECONDS", float, 86400.0, 1.0),
+            digest_post_failed_immediately=_bool(environ, "DIGEST_POST_FAILED_IMMEDIATELY", False),
+            emit_metrics=_bool(environ, "EMIT_METRICS", False),
+            metrics_namespace=environ.get("METRICS_NAMESPACE") or "ECSServiceDeploymentNotifications",
+        )
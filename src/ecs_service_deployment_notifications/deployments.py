@@ -0,0 +1,110 @@
+import datetime
+import time
+
+from . import cache, store
+
+IN_PROGRESS = "SERVICE_DEPLOYMENT_IN_PROGRESS"
+COMPLETED = "SERVICE_DEPLOYMENT_COMPLETED"
+FAILED = "SERVICE_DEPLOYMENT_FAILED"
+TERMINAL = frozenset({COMPLETED, FAILED})
+
+
+def parse_timestamp(timestamp: str) -> datetime.datetime:
+    return datetime.datetime.fromisoformat(timestamp)
+
+
+class DeploymentTracker:
+    def __init__(self, durable_store: store.Store, ttl: float, cache_size: int) -> None:
+        self.store = durable_store
+        self.ttl = ttl
+        self._states = cache.TTLCache(maxsize=cache_size, ttl=ttl)
+
+    def _key(self, deployment_id: str) -> str:
+        return f"deployment#{deployment_id}"
+
+    def state(self, deployment_id: str) -> dict | None:
+        state = self._states.get(deployment_id)
+        if state is None:
+            state = self.store.get_item(self._key(deployment_id))
+            if state is not None:
+                self._states.set(deployment_id, state)
+        return state
+
+    def transition(self, deployment_id: str, event_name: str, updated_at: str) -> bool:
+        current = self.state(deployment_id)
+        if current is not None:
+            current_updated_at = parse_timestamp(current["updatedAt"])
+            new_updated_at = parse_timestamp(updated_at)
+            if new_updated_at < current_updated_at:
+                return False
+            if current["eventName"] in TERMINAL and event_name not in TERMINAL:
+                return False
+            if current["eventName"] == event_name and new_updated_at > current_updated_at:
+                return False
+
+        state = {"eventName": event_name, "updatedAt": updated_at}
+        self._states.set(deployment_id, state)
+        self.store.put_item(self._key(deployment_id), state, expires_at=time.time() + self.ttl)
+        return True
+
+
+class DeploymentTimer:
+    def __init__(self, durable_store: store.Store, ttl: float, cache_size: int) -> None:
+        self.store = durable_store
+        self.ttl = ttl
+        self._started_at = cache.TTLCache(maxsize=cache_size, ttl=ttl)
+
+    def _key(self, deployment_id: str) -> str:
+        return f"deployment-start#{deployment_id}"
+
+    def start(self, deployment_id: str, updated_at: str) -> None:
+        if self._started_at.get(deployment_id) is not None:
+            return
+        self._started_at.set(deployment_id, updated_at)
+        # keep the first start recorded by any execution environment
+        self.store.put_item(
+            self._key(deployment_id), {"updatedAt": updated_at}, expires_at=time.time() + self.ttl, if_not_exists=True
+        )
+
+    def started_at(self, deployment_id: str) -> str | None:
+        started_at = self._started_at.get(deployment_id)
+        if started_at is None:
+            item = self.store.get_item(self._key(deployment_id))
+            if item is not None:
+                started_at = item["updatedAt"]
+                self._started_at.set(deployment_id, started_at)
+        return started_at
+
+    def duration(self, deployment_id: str, updated_at: str) -> float | None:
+        started_at = self.started_at(deployment_id)
+        if started_at is None:
+            return None
+        seconds = (parse_timestamp(updated_at) - parse_timestamp(started_at)).total_seconds()
+        return seconds if seconds >= 0 else None
+
+
+def format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h{minutes}m{seconds}s"
+    if minutes:
+        return f"{minutes}m{seconds}s"
+    return f"{seconds}s"
+
+
+def completed_times(events: list[dict]) -> dict[str, datetime.datetime]:
+    completed_at = {}
+    for event in events:
+        detail = event.get("detail", {})
+        if detail.get("eventName") == COMPLETED and "deploymentId" in detail and "updatedAt" in detail:
+            completed_at[detail["deploymentId"]] = parse_timestamp(detail["updatedAt"])
+    return completed_at
+
+
+def superseded(event: dict, completed_at: dict[str, datetime.datetime], window: float) -> bool:
+    detail = event.get("detail", {})
+    if detail.get("eventName") != IN_PROGRESS or detail.get("deploymentId") not in completed_at:
+        return False
+    elapsed = completed_at[detail["deploymentId"]] - parse_timestamp(detail["updatedAt"])
+    return elapsed.total_seconds() <= window
@@ -0,0 +1,129 @@
+import collections
+import datetime
+import time
+from typing import Callable, Iterator
+
+from . import deployments, store
+
+SCHEDULED_EVENT = "Scheduled Event"
+CHANNELS_KEY = "digest-channels"
+MAX_LOOKBACK_WINDOWS = 288
+MAX_FAILING_SERVICES = 50
+
+OUTCOMES = {
+    deployments.COMPLETED: "completed",
+    deployments.FAILED: "failed",
+    deployments.IN_PROGRESS: "in progress",
+}
+
+
+def is_scheduled(event: dict) -> bool:
+    return event.get("source") == "aws.events" and event.get("detail-type") == SCHEDULED_EVENT
+
+
+class DigestBuffer:
+    def __init__(
+        self,
+        durable_store: store.Store,
+        window: int,
+        ttl: float,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.store = durable_store
+        self.window = window
+        self.ttl = ttl
+        self.clock = clock
+        self._recorded_channels: set[str] = set()
+
+    def _key(self, channel: str, window_start: int) -> str:
+        return f"digest#{channel}#{window_start}"
+
+    def _cursor_key(self, channel: str) -> str:
+        return f"digest-cursor#{channel}"
+
+    def window_start(self, at: float) -> int:
+        return int(at // self.window * self.window)
+
+    def add(self, channel: str, entry: dict) -> None:
+        window_start = self.window_start(self.clock())
+        self.store.append_item(
+            self._key(channel, window_start),
+            entry,
+            expires_at=window_start + self.window + self.ttl,
+        )
+        # channels can come from service tags rather than the routing table, so record them for the flush to find
+        if channel not in self._recorded_channels:
+            self.store.add_member(CHANNELS_KEY, channel, expires_at=self.clock() + self.ttl)
+            self._recorded_channels.add(channel)
+
+    def channels(self) -> set[str]:
+        item = self.store.get_item(CHANNELS_KEY)
+        return set() if item is None else set(item["members"])
+
+    def closed_windows(self, channel: str) -> Iterator[tuple[int, list[dict]]]:
+        current = self.window_start(self.clock())
+        cursor = self.store.get_item(self._cursor_key(channel))
+        if cursor is not None:
+            first = cursor["flushed"] + self.window
+        else:
+            lookback = min(int(self.ttl // self.window) + 1, MAX_LOOKBACK_WINDOWS)
+            first = current - lookback * self.window
+
+        # only windows before the current one are closed, so nothing can be appended to them while they are flushed
+        for window_start in range(first, current, self.window):
+            item = self.store.get_item(self._key(channel, window_start))
+            yield window_start, [] if item is None else item["entries"]
+
+    def discard(self, channel: str, window_start: int) -> None:
+        self.store.delete_item(self._key(channel, window_start))
+
+    def advance(self, channel: str, window_start: int) -> None:
+        self.store.put_item(self._cursor_key(channel), {"flushed": window_start}, expires_at=self.clock() + self.ttl)
+
+
+def latest_entries(entries: list[dict]) -> list[dict]:
+    latest: dict[tuple, dict] = {}
+    for entry in entries:
+        key = (entry["cluster_name"], entry["service_name"], entry.get("deployment_id"))
+        current = latest.get(key)
+        if current is None or entry.get("updated_at", "") >= current.get("updated_at", ""):
+            latest[key] = entry
+    return list(latest.values())
+
+
+def _outcome_order(item: tuple[str, int]) -> tuple[int, str]:
+    event_name = item[0]
+    return list(OUTCOMES).index(event_name) if event_name in OUTCOMES else len(OUTCOMES), event_name
+
+
+def _window_time(timestamp: int) -> str:
+    return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).strftime("%Y-%m-%d %H:%M")
+
+
+def summary(window_start: int, window: int, entries: list[dict]) -> tuple[str, list[dict], str]:
+    counts: dict[str, collections.Counter[str]] = collections.defaultdict(collections.Counter)
+    failing = []
+    for entry in latest_entries(entries):
+        counts[entry["cluster_name"]][entry["event_name"]] += 1
+        if entry["event_name"] == deployments.FAILED:
+            failing.append(f"{entry['service_name']} ({entry['cluster_name']})")
+
+    fields = []
+    for cluster_name in sorted(counts):
+        value = ", ".join(
+            f"{count} {OUTCOMES.get(event_name, event_name)}"
+            for event_name, count in sorted(counts[cluster_name].items(), key=_outcome_order)
+        )
+        fields.append({"short": False, "title": cluster_name, "value": value})
+
+    if failing:
+        failing = sorted(failing)
+        value = ", ".join(failing[:MAX_FAILING_SERVICES])
+        if len(failing) > MAX_FAILING_SERVICES:
+            value += f" and {len(failing) - MAX_FAILING_SERVICES} more"
+        fields.append({"short": False, "title": "Failing services", "value": value})
+
+    description = (
+        f"ECS service deployments from {_window_time(window_start)} to {_window_time(window_start + window)} UTC"
+    )
+    return description, fields, "danger" if failing else "good"
@@ -0,0 +1,90 @@
+import concurrent.futures
+import dataclasses
+import math
+import time
+from typing import Callable
+
+from . import metrics, overflow, ratelimit, slack
+
+NOTIFICATION_FUNCTIONS = frozenset(
+    {"send_notification", "send_aggregated_notification", "send_deployment_notification", "send_summary"}
+)
+
+
+class ThrottledError(Exception):
+    pass
+
+
+class DeadlineExceededError(Exception):
+    pass
+
+
+@dataclasses.dataclass(frozen=True)
+class Notification:
+    function: str
+    kwargs: dict
+
+    def __call__(self, deadline: float | None = None) -> None:
+        kwargs = self.kwargs if deadline is None else {**self.kwargs, "deadline": deadline}
+        getattr(slack, self.function)(**kwargs)
+        metrics.increment("NotificationsSent")
+
+    def to_message(self) -> dict:
+        return {"function": self.function, "kwargs": self.kwargs}
+
+    @classmethod
+    def from_message(cls, message: dict) -> "Notification":
+        if message.get("function") not in NOTIFICATION_FUNCTIONS:
+            raise ValueError(f"Unexpected notification function {message.get('function')}")
+        return cls(function=message["function"], kwargs=message["kwargs"])
+
+
+def is_message(body: object) -> bool:
+    return isinstance(body, dict) and body.keys() == {"function", "kwargs"}
+
+
+def spill(notification: Notification, overflow_queue: overflow.OverflowQueue | None, error: Exception) -> None:
+    if overflow_queue is None:
+        raise error
+
+    overflow_queue.put(notification.to_message())
+    metrics.increment("NotificationsSpilled")
+
+
+def send(
+    notification: Notification,
+    deadline: float | None = None,
+    limiter: ratelimit.TokenBucket | None = None,
+    overflow_queue: overflow.OverflowQueue | None = None,
+    budget: float = 0.0,
+) -> None:
+    if limiter is not None:
+        timeout = math.inf if deadline is None else max(0.0, deadline - budget - time.monotonic())
+        if not limiter.acquire(timeout):
+            metrics.increment("NotificationsThrottled")
+            spill(notification, overflow_queue, ThrottledError("Rate limit exceeded before deadline"))
+            return
+
+    # leave the send its budget before the deadline rather than be cut off part way through it
+    if deadline is not None and time.monotonic() + budget > deadline:
+        metrics.increment("NotificationsPastDeadline")
+        spill(notification, overflow_queue, DeadlineExceededError("Not enough time left to send before deadline"))
+        return
+
+    notification(deadline)
+
+
+def _call(send: Callable[[], None]) -> Exception | None:
+    try:
+        send()
+    except Exception as exc:
+        return exc
+    return None
+
+
+def send_all(sends: list[Callable[[], None]], max_concurrency: int = 1) -> list[Exception | None]:
+    if max_concurrency <= 1 or len(sends) <= 1:
+        return [_call(send) for send in sends]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(max_concurrency, len(sends))) as executor:
+        return list(executor.map(_call, sends))
@@ -1,22 +1,84 @@
+import functools
+from typing import Iterator
+
+MAX_SERVICES_PER_DESCRIBE = 10
+
+
+def _invalid_reason(service_arn: str) -> str:
+    sections = service_arn.count(":") + 1
+    if sections < 6:
+        return "ARN missing section"
+    elif sections > 6:
+        return "ARN has too many sections"
+
+    path_sections = service_arn.rpartition(":")[2].count("/") + 1
+    if path_sections < 3:
+        return "ARN missing path section"
+    elif path_sections > 3:
+        return "ARN has too many path sections"
+
+    return "ARN does not have service path"
+
+
 class ServiceArn:
+    __slots__ = ("arn", "cluster_name", "service_name")
+
     def __init__(self, service_arn: str) -> None:
-        arn_split = service_arn.split(":")
-        if len(arn_split) < 6:
-            raise ValueError("ARN missing section")
-        elif len(arn_split) > 6:
-            raise ValueError("ARN has too many sections")
-
-        resource_path = arn_split[5]
-        resource_split = resource_path.split("/")
-
-        if len(resource_split) < 3:
-            raise ValueError("ARN missing path section")
-        elif len(resource_split) > 3:
-            raise ValueError("ARN has too many path sections")
-
-        if resource_split[0] != "service":
-            raise ValueError("ARN does not have service path")
-
-        self.arn = service_arn
-        self.cluster_name = resource_split[1]
-        self.service_name = resource_split[2]
+        sections = service_arn.split(":")
+        if len(sections) == 6:
+            path = sections[5].split("/")
+            if len(path) == 3 and path[0] == "service":
+                self.arn = service_arn
+                self.cluster_name = path[1]
+                self.service_name = path[2]
+                return
+
+        raise ValueError(_invalid_reason(service_arn))
+
+    # the other components are rarely needed, so they are split out of the ARN when asked for
+    @property
+    def partition(self) -> str:
+        return self.arn.split(":")[1]
+
+    @property
+    def service(self) -> str:
+        return self.arn.split(":")[2]
+
+    @property
+    def region(self) -> str:
+        return self.arn.split(":")[3]
+
+    @property
+    def account_id(self) -> str:
+        return self.arn.split(":")[4]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ServiceArn):
+            return NotImplemented
+        return self.arn == other.arn
+
+    def __hash__(self) -> int:
+        return hash(self.arn)
+
+    def __reduce__(self) -> tuple:
+        return type(self), (self.arn,)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.arn!r})"
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_service_arn(service_arn: str) -> ServiceArn:
+    # parsed ARNs are shared between callers, so they must not be changed
+    return ServiceArn(service_arn)
+
+
+def describe_batches(service_arns: list[ServiceArn]) -> Iterator[tuple[str, list[str]]]:
+    by_cluster: dict[str, dict[str, None]] = {}
+    for service_arn in service_arns:
+        by_cluster.setdefault(service_arn.cluster_name, {})[service_arn.arn] = None
+
+    for cluster_name, cluster_arns in by_cluster.items():
+        arns = list(cluster_arns)
+        for start in range(0, len(arns), MAX_SERVICES_PER_DESCRIBE):
+            yield cluster_name, arns[start : start + MAX_SERVICES_PER_DESCRIBE]
@@ -0,0 +1,103 @@
+import dataclasses
+import logging
+from typing import Any
+
+from . import cache, clients, ecs, metrics
+
+
+@dataclasses.dataclass(frozen=True)
+class ServiceDetails:
+    task_definition: str
+    image: str | None
+    desired_count: int
+    running_count: int
+
+
+def task_definition_name(task_definition_arn: str) -> str:
+    return task_definition_arn.rpartition("/")[2]
+
+
+def image_tag(image: str) -> str:
+    name = image.rpartition("/")[2]
+    if "@" in name:
+        return name.partition("@")[2]
+    if ":" in name:
+        return name.partition(":")[2]
+    return "latest"
+
+
+class ServiceEnricher:
+    def __init__(self, ttl: float, cache_size: int, client: Any = None) -> None:
+        self._client = client
+        self._services = cache.TTLCache(maxsize=cache_size, ttl=ttl)
+        self._details = cache.TTLCache(maxsize=cache_size, ttl=ttl)
+        # task definition revisions never change, so their images only leave the cache to keep it bounded
+        self._images = cache.TTLCache(maxsize=cache_size, ttl=float("inf"))
+
+    @property
+    def client(self) -> Any:
+        return self._client or clients.get_client("ecs")
+
+    def record(self, services: list[dict]) -> None:
+        # services described for another reason, such as their tags, save a call of our own
+        for service in services:
+            self._services.set(
+                service["serviceArn"],
+                {field: service[field] for field in ("taskDefinition", "desiredCount", "runningCount")},
+            )
+
+    def describe(self, service_arns: list[ecs.ServiceArn]) -> dict[str, ServiceDetails]:
+        details = {}
+        missing = []
+        for service_arn in service_arns:
+            service_details = self._details.get(service_arn.arn)
+            if service_details is None:
+                service = self._services.get(service_arn.arn)
+                if service is None:
+                    missing.append(service_arn)
+                    continue
+                service_details = self._service_details(service_arn.arn, service)
+            details[service_arn.arn] = service_details
+
+        for cluster_name, arns in ecs.describe_batches(missing):
+            for service in self._describe_services(cluster_name, arns):
+                details[service["serviceArn"]] = self._service_details(service["serviceArn"], service)
+        return details
+
+    def _describe_services(self, cluster_name: str, arns: list[str]) -> list[dict]:
+        metrics.increment("DescribeServicesCalls")
+        try:
+            response = self.client.describe_services(cluster=cluster_name, services=arns)
+        except Exception as exc:
+            # notifications are still worth sending without the details
+            logging.warning(f"Failed to describe services in {cluster_name}: {exc}")
+            metrics.increment("EnrichmentFailures")
+            return []
+        return response["services"]
+
+    def _service_details(self, service_arn: str, service: dict) -> ServiceDetails:
+        service_details = ServiceDetails(
+            task_definition=task_definition_name(service["taskDefinition"]),
+            image=self._image(service["taskDefinition"]),
+            desired_count=service["desiredCount"],
+            running_count=service["runningCount"],
+        )
+        self._details.set(service_arn, service_details)
+        return service_details
+
+    def _image(self, task_definition_arn: str) -> str | None:
+        image = self._images.get(task_definition_arn)
+        if image is not None:
+            return image
+
+        try:
+            response = self.client.describe_task_definition(taskDefinition=task_definition_arn)
+        except Exception as exc:
+            logging.warning(f"Failed to describe task definition {task_definition_arn}: {exc}")
+            metrics.increment("EnrichmentFailures")
+            return None
+
+        containers = response["taskDefinition"]["containerDefinitions"]
+        image = ", ".join(dict.fromkeys(image_tag(container["image"]) for container in containers))
+        self._images.set(task_definition_arn, image)
+        return image
@@ -0,0 +1,144 @@
+import dataclasses
+from typing import Callable, Iterator
+
+from . import deployments, ecs
+
+DEPLOYMENT_STATE_CHANGE = "ECS Deployment State Change"
+SERVICE_ACTION = "ECS Service Action"
+TASK_STATE_CHANGE = "ECS Task State Change"
+
+# task state changes carry no eventName, so their last status names them instead
+NAME_FIELDS = {TASK_STATE_CHANGE: "lastStatus"}
+EXPECTED_STOP_CODES = frozenset({"ServiceSchedulerInitiated", "UserInitiated"})
+WARM_UP_KEY = "warmUp"
+
+
+def detail_type(event: dict) -> str:
+    # events from before the detail type was checked, such as replayed archives and tests, are deployment events
+    return event.get("detail-type", DEPLOYMENT_STATE_CHANGE)
+
+
+def is_warm_up(event: dict) -> bool:
+    return event.get(WARM_UP_KEY) is True
+
+
+def event_name(event: dict) -> str | None:
+    return event.get("detail", {}).get(NAME_FIELDS.get(detail_type(event), "eventName"))
+
+
+def require_reason(event: dict) -> None:
+    if "reason" not in event["detail"]:
+        raise ValueError("Missing reason")
+
+
+def require_cluster(event: dict) -> None:
+    if "clusterArn" not in event["detail"]:
+        raise ValueError("Missing cluster ARN")
+
+
+def no_validation(event: dict) -> None:
+    pass
+
+
+def detail_reason(event: dict) -> str:
+    return event["detail"]["reason"]
+
+
+def service_action_reason(event: dict) -> str:
+    return event["detail"].get("reason", event["detail"]["eventName"])
+
+
+def stopped_reason(event: dict) -> str:
+    return event["detail"].get("stoppedReason", "Task stopped")
+
+
+def resource_service(event: dict, resource: str) -> ecs.ServiceArn | None:
+    return ecs.parse_service_arn(resource)
+
+
+def task_service(event: dict, resource: str) -> ecs.ServiceArn | None:
+    detail = event["detail"]
+    group_type, _, service_name = detail.get("group", "").partition(":")
+    # tasks replaced by deployments and scaling are stopped by the scheduler, which is not worth a notification
+    if group_type != "service" or detail.get("stopCode") in EXPECTED_STOP_CODES:
+        return None
+
+    # tasks belong to the service named by their group, in the cluster that ran them
+    cluster_prefix, _, cluster_name = detail["clusterArn"].rpartition(":cluster/")
+    return ecs.parse_service_arn(f"{cluster_prefix}:service/{cluster_name}/{service_name}")
+
+
+@dataclasses.dataclass(frozen=True)
+class EventType:
+    description: str
+    color: str | None
+    validate: Callable[[dict], None] = require_reason
+    reason: Callable[[dict], str] = detail_reason
+    service: Callable[[dict, str], ecs.ServiceArn | None] = resource_service
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._event_types: dict[tuple[str, str], EventType] = {}
+        self._detail_types: set[str] = set()
+
+    def register(self, detail_type: str, event_name: str, event_type: EventType) -> None:
+        self._event_types[(detail_type, event_name)] = event_type
+        self._detail_types.add(detail_type)
+
+    def lookup(self, detail_type: str, event_name: str | None) -> EventType | None:
+        if event_name is None:
+            return None
+        return self._event_types.get((detail_type, event_name))
+
+    def handles(self, detail_type: str) -> bool:
+        return detail_type in self._detail_types
+
+    def __iter__(self) -> Iterator[EventType]:
+        return iter(self._event_types.values())
+
+    def __len__(self) -> int:
+        return len(self._event_types)
+
+
+def default_registry() -> Registry:
+    registry = Registry()
+    registry.register(
+        DEPLOYMENT_STATE_CHANGE,
+        deployments.IN_PROGRESS,
+        EventType(description="ECS service deployment in progress", color=None),
+    )
+    registry.register(
+        DEPLOYMENT_STATE_CHANGE,
+        deployments.COMPLETED,
+        EventType(description="ECS service deployment completed", color="good"),
+    )
+    registry.register(
+        DEPLOYMENT_STATE_CHANGE,
+        deployments.FAILED,
+        EventType(description="ECS service deployment failed", color="danger"),
+    )
+
+    for name, description in (
+        ("SERVICE_TASK_PLACEMENT_FAILURE", "ECS service failed to place tasks"),
+        ("SERVICE_TASK_START_IMPAIRED", "ECS service unable to start tasks"),
+        ("SERVICE_DISCOVERY_INSTANCE_UNHEALTHY", "ECS service discovery instance unhealthy"),
+    ):
+        registry.register(
+            SERVICE_ACTION,
+            name,
+            EventType(description=description, color="danger", validate=no_validation, reason=service_action_reason),
+        )
+
+    registry.register(
+        TASK_STATE_CHANGE,
+        "STOPPED",
+        EventType(
+            description="ECS service task stopped",
+            color="warning",
+            validate=require_cluster,
+            reason=stopped_reason,
+            service=task_service,
+        ),
+    )
+    return registry
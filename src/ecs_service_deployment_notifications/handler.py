@@ -1,63 +1,675 @@
 import dataclasses
+import functools
 import json
 import logging
 import os
+import time
+from typing import Mapping, Protocol
 
-from . import ecs, slack
+from . import (
+    breaker,
+    channels,
+    clients,
+    config,
+    deployments,
+    digest,
+    dispatch,
+    ecs,
+    enrichment,
+    events,
+    idempotency,
+    messages,
+    metrics,
+    overflow,
+    ratelimit,
+    render,
+    retry,
+    routing,
+    slack,
+    store,
+    transport,
+)
 
 logging.basicConfig()
 
 
-@dataclasses.dataclass
-class EventType:
-    description: str
-    color: str | None
+class LambdaContext(Protocol):
+    def get_remaining_time_in_millis(self) -> int: ...
 
 
-event_types = {
-    "SERVICE_DEPLOYMENT_IN_PROGRESS": EventType(
-        description="ECS service deployment in progress",
-        color=None,
-    ),
-    "SERVICE_DEPLOYMENT_COMPLETED": EventType(
-        description="ECS service deployment completed",
-        color="good",
-    ),
-    "SERVICE_DEPLOYMENT_FAILED": EventType(
-        description="ECS service deployment failed",
-        color="danger",
-    ),
-}
+@dataclasses.dataclass(frozen=True)
+class Runtime:
+    config: config.Config
+    routes: routing.RoutingTable
+    event_types: events.Registry
+    guard: idempotency.IdempotencyGuard | None
+    tracker: deployments.DeploymentTracker | None
+    deployment_timer: deployments.DeploymentTimer | None
+    enricher: enrichment.ServiceEnricher | None
+    channel_tags: channels.ChannelTags | None
+    limiter: ratelimit.TokenBucket | None
+    overflow_queue: overflow.OverflowQueue | None
+    breaker: breaker.CircuitBreaker | None
+    digest_buffer: digest.DigestBuffer | None
+    init_duration_millis: float
 
 
-def handler(event: dict, context: dict) -> None:
+_runtime: Runtime | None = None
+_cold_start = False
+
+
+def init(environ: Mapping[str, str] = os.environ) -> Runtime:
+    global _runtime, _cold_start
+
+    start = time.perf_counter()
+    runtime_config = config.Config.from_environ(environ)
+
     logger = logging.getLogger()
-    logger.setLevel(os.environ.get("LOG_LEVEL", "INFO"))
+    logger.setLevel(runtime_config.log_level)
+
+    client_settings = clients.ClientSettings(
+        max_pool_connections=runtime_config.aws_client_max_pool_connections,
+        connect_timeout=runtime_config.aws_client_connect_timeout_seconds,
+        read_timeout=runtime_config.aws_client_read_timeout_seconds,
+        tcp_keepalive=runtime_config.aws_client_tcp_keepalive,
+        retry_mode=runtime_config.aws_client_retry_mode,
+        max_attempts=runtime_config.aws_client_max_attempts,
+    )
+    overrides = {}
+    if runtime_config.deadline_safety_margin_millis is not None:
+        # the safety margin only covers one invoke, so retries are left to retry.call, which checks the deadline
+        overrides["lambda"] = dataclasses.replace(client_settings, max_attempts=0)
+    clients.configure(client_settings, overrides)
+
+    routes = routing.RoutingTable.from_routes(list(runtime_config.routes))
+    event_types = events.default_registry()
+    for event_type in event_types:
+        for channel in routes.channels:
+            render.template(event_type.description, channel, event_type.color)
+
+    guard = None
+    if runtime_config.idempotency_store is not None:
+        guard = idempotency.IdempotencyGuard(
+            store.from_url(runtime_config.idempotency_store),
+            ttl=runtime_config.idempotency_ttl_seconds,
+            cache_size=runtime_config.idempotency_cache_size,
+        )
+
+    tracker = None
+    if runtime_config.deployment_state_store is not None:
+        tracker = deployments.DeploymentTracker(
+            store.from_url(runtime_config.deployment_state_store),
+            ttl=runtime_config.deployment_state_ttl_seconds,
+            cache_size=runtime_config.deployment_state_cache_size,
+        )
+
+    deployment_timer = None
+    if runtime_config.deployment_timing_store is not None:
+        deployment_timer = deployments.DeploymentTimer(
+            store.from_url(runtime_config.deployment_timing_store),
+            ttl=runtime_config.deployment_timing_ttl_seconds,
+            cache_size=runtime_config.deployment_timing_cache_size,
+        )
+
+    enricher = None
+    if runtime_config.enrich_services:
+        enricher = enrichment.ServiceEnricher(
+            ttl=runtime_config.enrichment_ttl_seconds,
+            cache_size=runtime_config.enrichment_cache_size,
+        )
+
+    channel_tags = None
+    if runtime_config.channel_tag is not None:
+        channel_tags = channels.ChannelTags(
+            runtime_config.channel_tag,
+            ttl=runtime_config.channel_tag_ttl_seconds,
+            negative_ttl=runtime_config.channel_tag_negative_ttl_seconds,
+            cache_size=runtime_config.channel_tag_cache_size,
+            enricher=enricher,
+        )
+
+    limiter = None
+    if runtime_config.rate_limit_per_second > 0:
+        limiter = ratelimit.TokenBucket(runtime_config.rate_limit_per_second, runtime_config.rate_limit_burst)
+
+    overflow_queue = None
+    if runtime_config.overflow_queue is not None:
+        overflow_queue = overflow.from_url(runtime_config.overflow_queue)
+
+    lambda_transport = None
+    if runtime_config.lambda_transport == "http":
+        lambda_transport = transport.LambdaInvokeTransport(
+            region=runtime_config.aws_region,
+            credentials=transport.Credentials.from_environ(environ),
+            endpoint=runtime_config.lambda_endpoint_url,
+            pool_size=runtime_config.notification_max_concurrency,
+            timeout=runtime_config.lambda_transport_timeout_seconds,
+        )
+    slack.configure_transport(lambda_transport)
+
+    sink = None
+    sink_options = dict(
+        pool_size=runtime_config.notification_max_concurrency,
+        timeout=runtime_config.slack_timeout_seconds,
+        max_retries=runtime_config.slack_max_retries,
+        max_retry_after=runtime_config.slack_max_retry_after_seconds,
+    )
+    if runtime_config.slack_sink == "webhook":
+        sink = slack.SlackSink.webhook(runtime_config.slack_webhook_url, **sink_options)
+    elif runtime_config.slack_sink == "api":
+        sink = slack.SlackSink.api(runtime_config.slack_bot_token, runtime_config.slack_api_url, **sink_options)
+    slack.configure_sink(sink)
+
+    message_store = None
+    if runtime_config.slack_message_mode != messages.POST:
+        message_store = messages.MessageStore(
+            store.from_url(runtime_config.message_store),
+            ttl=runtime_config.message_store_ttl_seconds,
+            cache_size=runtime_config.message_store_cache_size,
+        )
+    slack.configure_messages(message_store, runtime_config.slack_message_mode)
+
+    retry_policy = None
+    if runtime_config.retry_max_attempts > 1:
+        retry_policy = retry.RetryPolicy(
+            max_attempts=runtime_config.retry_max_attempts,
+            base_delay=runtime_config.retry_base_delay_millis / 1000,
+            max_delay=runtime_config.retry_max_delay_millis / 1000,
+        )
+
+    circuit_breaker = None
+    if runtime_config.circuit_breaker_failure_threshold > 0:
+        circuit_breaker = breaker.CircuitBreaker(
+            runtime_config.circuit_breaker_failure_threshold,
+            runtime_config.circuit_breaker_reset_seconds,
+        )
+    slack.configure_resilience(retry_policy, circuit_breaker)
+
+    digest_buffer = None
+    if runtime_config.digest_window_seconds > 0 and runtime_config.digest_store is not None:
+        digest_buffer = digest.DigestBuffer(
+            store.from_url(runtime_config.digest_store),
+            window=runtime_config.digest_window_seconds,
+            ttl=runtime_config.digest_ttl_seconds,
+        )
+
+    init_duration_millis = (time.perf_counter() - start) * 1000
+    _runtime = Runtime(
+        config=runtime_config,
+        routes=routes,
+        event_types=event_types,
+        guard=guard,
+        tracker=tracker,
+        deployment_timer=deployment_timer,
+        enricher=enricher,
+        channel_tags=channel_tags,
+        limiter=limiter,
+        overflow_queue=overflow_queue,
+        breaker=circuit_breaker,
+        digest_buffer=digest_buffer,
+        init_duration_millis=init_duration_millis,
+    )
+    _cold_start = True
+    metrics.observe("InitDuration", init_duration_millis)
+    logging.debug(f"Initialised in {init_duration_millis:.1f}ms")
+    return _runtime
+
+
+def get_runtime() -> Runtime:
+    return _runtime or init()
+
+
+def reset() -> None:
+    global _runtime, _cold_start
+    _runtime = None
+    _cold_start = False
+
+
+def _deadline(context: LambdaContext | dict, runtime: Runtime) -> float | None:
+    safety_margin = runtime.config.deadline_safety_margin_millis
+    if safety_margin is None or not hasattr(context, "get_remaining_time_in_millis"):
+        return None
+
+    return time.monotonic() + (context.get_remaining_time_in_millis() - safety_margin) / 1000
+
+
+def _flush_metrics(runtime: Runtime) -> None:
+    flushed = metrics.flush()
+    if runtime.config.emit_metrics:
+        metrics.emit(metrics.emf_records(runtime.config.metrics_namespace, flushed))
+    elif logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug(f"Metrics {json.dumps(metrics.emf_records(runtime.config.metrics_namespace, flushed))}")
+
+
+def _send(runtime: Runtime, notification: dispatch.Notification, deadline: float | None) -> functools.partial:
+    return functools.partial(
+        dispatch.send,
+        notification,
+        deadline,
+        runtime.limiter,
+        runtime.overflow_queue,
+        runtime.config.send_budget_millis / 1000,
+    )
+
+
+def drain_overflow(deadline: float | None = None) -> None:
+    runtime = get_runtime()
+    overflow_queue = runtime.overflow_queue
+    if overflow_queue is None:
+        return
+
+    messages = []
+    while deadline is None or time.monotonic() < deadline:
+        message = overflow_queue.get()
+        if message is None:
+            break
+        messages.append(message)
+
+    if not messages:
+        return
+
+    logging.info(f"Draining {len(messages)} notifications from the overflow queue")
+    metrics.increment("NotificationsDrained", len(messages))
+    notifications = [dispatch.Notification.from_message(message) for message in messages]
+    results = dispatch.send_all(
+        [_send(runtime, notification, deadline) for notification in notifications],
+        max_concurrency=runtime.config.notification_max_concurrency,
+    )
+    for notification, error in zip(notifications, results):
+        if error is not None:
+            # put failed notifications back so a later invocation tries them again
+            logging.error(f"Failed to send notification from the overflow queue: {error}")
+            metrics.increment("NotificationsFailed")
+            overflow_queue.put(notification.to_message())
+
+
+def flush_digests(deadline: float | None = None) -> None:
+    runtime = get_runtime()
+    digest_buffer = runtime.digest_buffer
+    if digest_buffer is None:
+        logging.warning("Ignoring scheduled event as DIGEST_WINDOW_SECONDS is not set")
+        return
+
+    errors = []
+    for channel in sorted(runtime.routes.channels | digest_buffer.channels()):
+        flushed = None
+        for window_start, entries in digest_buffer.closed_windows(channel):
+            if entries:
+                description, fields, color = digest.summary(window_start, digest_buffer.window, entries)
+                notification = dispatch.Notification(
+                    "send_summary",
+                    dict(
+                        lambda_arn=runtime.config.slack_notifications_lambda_arn,
+                        description=description,
+                        channel=channel,
+                        fields=fields,
+                        color=color,
+                    ),
+                )
+                try:
+                    _send(runtime, notification, deadline)()
+                except Exception as exc:
+                    # leave this and later windows buffered so the next scheduled invocation tries them again
+                    logging.error(f"Failed to send digest for {channel}: {exc}")
+                    metrics.increment("NotificationsFailed")
+                    errors.append(exc)
+                    break
+                metrics.increment("DigestsSent")
+                digest_buffer.discard(channel, window_start)
+            flushed = window_start
+
+        if flushed is not None:
+            digest_buffer.advance(channel, flushed)
+
+    if errors:
+        raise ExceptionGroup(f"Failed to send {len(errors)} digests", errors)
+
+
+def _aws_services(runtime_config: config.Config) -> list[str]:
+    store_urls = [
+        runtime_config.idempotency_store,
+        runtime_config.deployment_state_store,
+        runtime_config.deployment_timing_store,
+    ]
+    if runtime_config.slack_message_mode != messages.POST:
+        store_urls.append(runtime_config.message_store)
+    if runtime_config.digest_window_seconds > 0:
+        store_urls.append(runtime_config.digest_store)
+
+    services = set()
+    if any(url.startswith("dynamodb://") for url in store_urls if url is not None):
+        services.add("dynamodb")
+    if runtime_config.overflow_queue is not None and runtime_config.overflow_queue.startswith("https://sqs."):
+        services.add("sqs")
+    if runtime_config.enrich_services or runtime_config.channel_tag is not None:
+        services.add("ecs")
+    return sorted(services)
+
+
+def warm_up(runtime: Runtime, cold_start: bool) -> dict:
+    metrics.increment("WarmUps")
+    for service_name in _aws_services(runtime.config):
+        clients.get_client(service_name)
+
+    try:
+        slack.warm()
+    except Exception as exc:
+        # the next notification opens its own connection, so a failed warm-up is not worth retrying
+        logging.warning(f"Failed to open notification connections: {exc}")
+        metrics.increment("WarmUpFailures")
+    return {"warmUp": True, "coldStart": cold_start}
 
-    logging.debug(json.dumps(event))
 
-    if "detail" not in event or "eventName" not in event["detail"]:
-        raise ValueError("Missing event name")
+def handler(event: dict, context: LambdaContext | dict) -> dict | None:
+    global _cold_start
 
-    event_name = event["detail"]["eventName"]
-    if event_name not in event_types:
-        raise ValueError(f"Unexpected event name {event_name}")
+    runtime = get_runtime()
+    cold_start = _cold_start
+    if _cold_start:
+        metrics.increment("ColdStart")
+        _cold_start = False
 
-    event_type = event_types[event_name]
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug(json.dumps(event))
 
-    service_arns = [ecs.ServiceArn(service_arn) for service_arn in event["resources"]]
+    deadline = _deadline(context, runtime)
+    try:
+        if events.is_warm_up(event):
+            return warm_up(runtime, cold_start)
 
-    for service_arn in service_arns:
-        if service_arn.cluster_name == os.environ["CLUSTER_NAME"]:
-            logging.info(f"Sending {event_name} notification for {service_arn.arn}")
-            slack.send_notification(
-                lambda_arn=os.environ["SLACK_NOTIFICATIONS_LAMBDA_ARN"],
-                description=event_type.description,
-                color=event_type.color,
-                channel=os.environ["SLACK_CHANNEL"],
-                cluster_name=service_arn.cluster_name,
-                service_name=service_arn.service_name,
-                reason=event["detail"]["reason"],
-            )
+        with metrics.timer("HandlerDuration"):
+            drain_overflow(deadline)
+
+            if digest.is_scheduled(event):
+                flush_digests(deadline)
+                return None
+
+            if "Records" in event:
+                return process_sqs_batch(event["Records"], deadline)
+
+            process_event(event, deadline)
+            return None
+    finally:
+        _flush_metrics(runtime)
+
+
+def _deployment_key(event: dict) -> tuple | None:
+    detail = event.get("detail", {})
+    if "deploymentId" not in detail:
+        return None
+    return detail["deploymentId"], detail.get("eventName"), tuple(event.get("resources", []))
+
+
+def process_sqs_batch(records: list[dict], deadline: float | None = None) -> dict:
+    batch_item_failures = []
+    events = {}
+    window = get_runtime().config.suppress_in_progress_window_seconds
+    completed_at = {}
+
+    for record in records:
+        try:
+            event = json.loads(record["body"])
+            if not isinstance(event, dict):
+                raise ValueError(f"Expected a JSON object, got {type(event).__name__}")
+            if window > 0:
+                completed_at.update(deployments.completed_times([event]))
+            events[record["messageId"]] = event
+        except (AttributeError, KeyError, TypeError, ValueError) as exc:
+            logging.error(f"Failed to parse message {record['messageId']}: {exc}")
+            batch_item_failures.append({"itemIdentifier": record["messageId"]})
+
+    prefetch([event for event in events.values() if not dispatch.is_message(event)])
+
+    processed = set()
+
+    for message_id, event in events.items():
+        try:
+            if deployments.superseded(event, completed_at, window):
+                logging.info(f"Skipping in progress event superseded by completion in message {message_id}")
+                continue
+
+            if dispatch.is_message(event):
+                process_overflow_message(event, deadline)
+                continue
+
+            deployment_key = _deployment_key(event)
+            if deployment_key is not None and deployment_key in processed:
+                logging.info(f"Skipping duplicate deployment event in message {message_id}")
+                continue
+
+            process_event(event, deadline)
+            if deployment_key is not None:
+                processed.add(deployment_key)
+        except Exception as exc:
+            logging.error(f"Failed to process message {message_id}: {exc}")
+            batch_item_failures.append({"itemIdentifier": message_id})
+
+    return {"batchItemFailures": batch_item_failures}
+
+
+def route(runtime: Runtime, service_arns: list[ecs.ServiceArn]) -> list[tuple[ecs.ServiceArn, str | None]]:
+    overrides = {}
+    if runtime.channel_tags is not None:
+        watched = [service_arn for service_arn in service_arns if runtime.routes.watches(service_arn.cluster_name)]
+        if watched:
+            overrides = runtime.channel_tags.lookup(watched)
+
+    return [
+        (
+            service_arn,
+            overrides.get(service_arn.arn) or runtime.routes.lookup(service_arn.cluster_name, service_arn.service_name),
+        )
+        for service_arn in service_arns
+    ]
+
+
+def prefetch(batch: list[dict]) -> None:
+    runtime = get_runtime()
+    config = runtime.config
+    enrich = runtime.enricher is not None and runtime.digest_buffer is None and not config.aggregate_notifications
+    if runtime.channel_tags is None and not enrich:
+        return
+
+    # look up the services of a whole batch together so they share DescribeServices calls
+    service_arns = []
+    for event in batch:
+        try:
+            event_type = runtime.event_types.lookup(events.detail_type(event), events.event_name(event))
+            if event_type is None:
+                continue
+            for resource in event.get("resources", []):
+                service_arn = event_type.service(event, resource)
+                if service_arn is not None:
+                    service_arns.append(service_arn)
+        except (AttributeError, KeyError, TypeError, ValueError):
+            # malformed events are reported when they are processed
+            continue
+
+    if not service_arns:
+        return
+
+    routed = [service_arn for service_arn, channel in route(runtime, service_arns) if channel is not None]
+    if enrich and routed:
+        with metrics.timer("EnrichDuration"):
+            runtime.enricher.describe(routed)
+
+
+def process_overflow_message(message: dict, deadline: float | None = None) -> None:
+    runtime = get_runtime()
+    notification = dispatch.Notification.from_message(message)
+    metrics.increment("NotificationsDrained")
+    _send(runtime, notification, deadline)()
+
+
+def process_event(event: dict, deadline: float | None = None) -> None:
+    runtime = get_runtime()
+
+    guard = runtime.guard
+    claimed: list[str] = []
+    try:
+        with metrics.timer("ValidateDuration"):
+            detail_type = events.detail_type(event)
+            event_name = events.event_name(event)
+            if event_name is None and runtime.event_types.handles(detail_type):
+                raise ValueError("Missing event name")
+
+            event_type = runtime.event_types.lookup(detail_type, event_name)
+            if event_type is None:
+                logging.debug(f"Ignoring unknown {detail_type} event {event_name}")
+                metrics.increment("UnknownEvents", dimensions={"DetailType": detail_type})
+                return
+
+            event_type.validate(event)
+            metrics.increment("Events", dimensions={"EventName": event_name})
+
+            resources = event["resources"]
+            if guard is not None and "id" in event:
+                resources = []
+                for resource in event["resources"]:
+                    key = idempotency.key(event["id"], resource, event_name)
+                    if guard.claim(key):
+                        claimed.append(key)
+                        resources.append(resource)
+                    else:
+                        logging.info(f"Skipping duplicate {event_name} event {event['id']} for {resource}")
+
+            detail = event["detail"]
+            tracker = runtime.tracker
+            if tracker is not None and "deploymentId" in detail and "updatedAt" in detail:
+                if not tracker.transition(detail["deploymentId"], event_name, detail["updatedAt"]):
+                    logging.info(f"Skipping stale {event_name} event for deployment {detail['deploymentId']}")
+                    return
+
+            duration = None
+            deployment_timer = runtime.deployment_timer
+            if deployment_timer is not None and "deploymentId" in detail and "updatedAt" in detail:
+                if event_name == deployments.IN_PROGRESS:
+                    deployment_timer.start(detail["deploymentId"], detail["updatedAt"])
+                elif event_name in deployments.TERMINAL:
+                    duration = deployment_timer.duration(detail["deploymentId"], detail["updatedAt"])
+
+        with metrics.timer("ParseDuration"):
+            # idempotency keys use the event's resources, which for task events are tasks rather than services
+            service_arns = []
+            resources_by_arn = {}
+            for resource in resources:
+                service_arn = event_type.service(event, resource)
+                if service_arn is not None:
+                    service_arns.append(service_arn)
+                    resources_by_arn[service_arn.arn] = resource
+
+        if duration is not None:
+            for service_arn in service_arns:
+                metrics.observe(
+                    "DeploymentDuration",
+                    duration * 1000,
+                    dimensions={"ClusterName": service_arn.cluster_name, "ServiceName": service_arn.service_name},
+                )
+
+        with metrics.timer("FilterDuration"):
+            notify = []
+            for service_arn, channel in route(runtime, service_arns):
+                if channel is not None:
+                    logging.info(f"Sending {event_name} notification for {service_arn.arn}")
+                    metrics.increment("ServiceEvents", dimensions={"ClusterName": service_arn.cluster_name})
+                    notify.append((service_arn, channel))
+                else:
+                    logging.debug(f"Ignoring {event_name} event for {service_arn.arn}")
+
+        digest_buffer = runtime.digest_buffer
+        if digest_buffer is not None and not (
+            event_name == deployments.FAILED and runtime.config.digest_post_failed_immediately
+        ):
+            for service_arn, channel in notify:
+                digest_buffer.add(
+                    channel,
+                    dict(
+                        cluster_name=service_arn.cluster_name,
+                        service_name=service_arn.service_name,
+                        event_name=event_name,
+                        deployment_id=detail.get("deploymentId"),
+                        updated_at=detail.get("updatedAt", ""),
+                    ),
+                )
+            metrics.increment("NotificationsBuffered", len(notify))
+            return
+
+        reason = event_type.reason(event)
+        duration_in_message = runtime.config.deployment_duration_in_message
+        if duration is not None and event_name == deployments.COMPLETED and duration_in_message:
+            reason = f"{reason} (took {deployments.format_duration(duration)})"
+
+        sends = []
+        if runtime.config.aggregate_notifications:
+            by_channel: dict[str, list] = {}
+            for service_arn, channel in notify:
+                by_channel.setdefault(channel, []).append(service_arn)
+
+            for channel, channel_arns in by_channel.items():
+                notification = dispatch.Notification(
+                    "send_aggregated_notification",
+                    dict(
+                        lambda_arn=runtime.config.slack_notifications_lambda_arn,
+                        description=event_type.description,
+                        color=event_type.color,
+                        channel=channel,
+                        services=[(service_arn.cluster_name, service_arn.service_name) for service_arn in channel_arns],
+                        reason=reason,
+                    ),
+                )
+                sends.append((channel_arns, notification))
         else:
-            logging.debug(f"Ignoring {event_name} event for {service_arn.arn}")
+            details = {}
+            if runtime.enricher is not None:
+                with metrics.timer("EnrichDuration"):
+                    details = runtime.enricher.describe([service_arn for service_arn, _ in notify])
+
+            deployment_id = detail.get("deploymentId") if runtime.config.slack_message_mode != messages.POST else None
+            for service_arn, channel in notify:
+                kwargs = dict(
+                    lambda_arn=runtime.config.slack_notifications_lambda_arn,
+                    description=event_type.description,
+                    color=event_type.color,
+                    channel=channel,
+                    cluster_name=service_arn.cluster_name,
+                    service_name=service_arn.service_name,
+                    reason=reason,
+                )
+                if service_arn.arn in details:
+                    kwargs["details"] = dataclasses.asdict(details[service_arn.arn])
+                if deployment_id is not None:
+                    kwargs["deployment_id"] = deployment_id
+                    notification = dispatch.Notification("send_deployment_notification", kwargs)
+                else:
+                    notification = dispatch.Notification("send_notification", kwargs)
+                sends.append(([service_arn], notification))
+
+        sends = [(arns, _send(runtime, notification, deadline)) for arns, notification in sends]
+    except Exception:
+        # nothing was sent, so a retry of the event must not be skipped as a duplicate
+        for key in claimed:
+            guard.release(key)
+        raise
+
+    with metrics.timer("InvokeDuration"):
+        results = dispatch.send_all(
+            [send for _, send in sends],
+            max_concurrency=runtime.config.notification_max_concurrency,
+        )
+
+    errors = []
+    for (failed_arns, _), error in zip(sends, results):
+        if error is not None:
+            metrics.increment("NotificationsFailed")
+            for service_arn in failed_arns:
+                logging.error(f"Failed to send {event_name} notification for {service_arn.arn}: {error}")
+                if guard is not None and "id" in event:
+                    guard.release(idempotency.key(event["id"], resources_by_arn[service_arn.arn], event_name))
+            errors.append(error)
+
+    if errors:
+        raise ExceptionGroup(f"Failed to send {len(errors)} of {len(sends)} {event_name} notifications", errors)
+
+
+if "AWS_LAMBDA_FUNCTION_NAME" in os.environ:
+    init()
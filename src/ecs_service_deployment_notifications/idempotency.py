@@ -0,0 +1,26 @@
+import time
+
+from . import cache, store
+
+
+def key(event_id: str, service_arn: str, event_name: str) -> str:
+    return f"{event_id}#{service_arn}#{event_name}"
+
+
+class IdempotencyGuard:
+    def __init__(self, durable_store: store.Store, ttl: float, cache_size: int) -> None:
+        self.store = durable_store
+        self.ttl = ttl
+        self._seen = cache.TTLCache(maxsize=cache_size, ttl=ttl)
+
+    def claim(self, key: str) -> bool:
+        if key in self._seen:
+            return False
+
+        claimed = self.store.put_item(key, {"status": "claimed"}, expires_at=time.time() + self.ttl, if_not_exists=True)
+        self._seen.set(key, True)
+        return claimed
+
+    def release(self, key: str) -> None:
+        self._seen.delete(key)
+        self.store.delete_item(key)
@@ -0,0 +1,32 @@
+import time
+
+from . import cache, store
+
+POST = "post"
+UPDATE = "update"
+THREAD = "thread"
+MODES = (POST, UPDATE, THREAD)
+
+
+class MessageStore:
+    def __init__(self, durable_store: store.Store, ttl: float, cache_size: int) -> None:
+        self.store = durable_store
+        self.ttl = ttl
+        self._references = cache.TTLCache(maxsize=cache_size, ttl=ttl)
+
+    def _key(self, deployment_id: str, channel: str) -> str:
+        return f"message#{deployment_id}#{channel}"
+
+    def get(self, deployment_id: str, channel: str) -> dict | None:
+        key = self._key(deployment_id, channel)
+        reference = self._references.get(key)
+        if reference is None:
+            reference = self.store.get_item(key)
+            if reference is not None:
+                self._references.set(key, reference)
+        return reference
+
+    def put(self, deployment_id: str, channel: str, reference: dict) -> None:
+        key = self._key(deployment_id, channel)
+        self._references.set(key, reference)
+        self.store.put_item(key, reference, expires_at=time.time() + self.ttl)
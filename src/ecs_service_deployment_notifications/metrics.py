@@ -0,0 +1,100 @@
+import collections
+import contextlib
+import json
+import sys
+import threading
+import time
+from typing import Iterator, Mapping, TextIO
+
+# EMF accepts at most 100 metrics per record and 100 values per metric
+MAX_METRICS_PER_RECORD = 100
+MAX_VALUES_PER_METRIC = 100
+
+Dimensions = tuple[tuple[str, str], ...]
+
+_counters: collections.Counter[tuple[str, Dimensions]] = collections.Counter()
+_observations: dict[tuple[str, Dimensions], list[float]] = collections.defaultdict(list)
+_lock = threading.Lock()
+
+
+def _dimensions(dimensions: Mapping[str, str] | None) -> Dimensions:
+    return tuple(sorted(dimensions.items())) if dimensions else ()
+
+
+def increment(name: str, value: int = 1, dimensions: Mapping[str, str] | None = None) -> None:
+    with _lock:
+        _counters[name, _dimensions(dimensions)] += value
+
+
+def observe(name: str, value: float, dimensions: Mapping[str, str] | None = None) -> None:
+    with _lock:
+        _observations[name, _dimensions(dimensions)].append(value)
+
+
+@contextlib.contextmanager
+def timer(name: str, dimensions: Mapping[str, str] | None = None) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, (time.perf_counter() - start) * 1000, dimensions)
+
+
+def flush() -> dict[Dimensions, dict[str, int | list[float]]]:
+    flushed: dict[Dimensions, dict[str, int | list[float]]] = collections.defaultdict(dict)
+    with _lock:
+        for (name, dimensions), count in _counters.items():
+            flushed[dimensions][name] = count
+        for (name, dimensions), values in _observations.items():
+            flushed[dimensions][name] = values
+        _counters.clear()
+        _observations.clear()
+    return dict(flushed)
+
+
+def emf_records(
+    namespace: str,
+    flushed: dict[Dimensions, dict[str, int | list[float]]],
+    timestamp: int | None = None,
+) -> list[dict]:
+    timestamp = int(time.time() * 1000) if timestamp is None else timestamp
+
+    records = []
+    for dimensions, metrics in flushed.items():
+        # counters go in the first record, observations beyond the per metric limit spill into further records
+        pending = {
+            name: [value] if isinstance(value, int) else list(value) for name, value in metrics.items() if value != []
+        }
+        while pending:
+            names = list(pending)[:MAX_METRICS_PER_RECORD]
+            record: dict = {
+                "_aws": {
+                    "Timestamp": timestamp,
+                    "CloudWatchMetrics": [
+                        {
+                            "Namespace": namespace,
+                            "Dimensions": [[key for key, _ in dimensions]],
+                            "Metrics": [
+                                {"Name": name, "Unit": "Count" if isinstance(metrics[name], int) else "Milliseconds"}
+                                for name in names
+                            ],
+                        }
+                    ],
+                },
+                **dict(dimensions),
+            }
+            for name in names:
+                values = pending[name][:MAX_VALUES_PER_METRIC]
+                record[name] = values[0] if isinstance(metrics[name], int) else values
+                del pending[name][:MAX_VALUES_PER_METRIC]
+                if not pending[name]:
+                    del pending[name]
+            records.append(record)
+
+    return records
+
+
+def emit(records: list[dict], stream: TextIO | None = None) -> None:
+    stream = sys.stdout if stream is None else stream
+    stream.write("".join(f"{json.dumps(record)}\n" for record in records))
+    stream.flush()
@@ -0,0 +1,52 @@
+import collections
+import json
+import threading
+from typing import Any, Protocol
+
+from . import clients
+
+
+class OverflowQueue(Protocol):
+    def put(self, message: dict) -> None: ...
+
+    def get(self) -> dict | None: ...
+
+
+class InMemoryQueue:
+    def __init__(self) -> None:
+        self.messages: collections.deque[dict] = collections.deque()
+        self._lock = threading.Lock()
+
+    def put(self, message: dict) -> None:
+        with self._lock:
+            self.messages.append(message)
+
+    def get(self) -> dict | None:
+        with self._lock:
+            return self.messages.popleft() if self.messages else None
+
+
+class SQSQueue:
+    def __init__(self, queue_url: str, client: Any = None) -> None:
+        self.queue_url = queue_url
+        self._client = client
+
+    @property
+    def client(self) -> Any:
+        return self._client or clients.get_client("sqs")
+
+    def put(self, message: dict) -> None:
+        self.client.send_message(QueueUrl=self.queue_url, MessageBody=json.dumps(message))
+
+    def get(self) -> dict | None:
+        # messages are delivered back to the function by an event source mapping on the queue
+        return None
+
+
+def from_url(url: str) -> OverflowQueue:
+    if url == "memory://":
+        return InMemoryQueue()
+    elif url.startswith("https://sqs."):
+        return SQSQueue(url)
+
+    raise ValueError(f"Unsupported overflow queue URL {url}")
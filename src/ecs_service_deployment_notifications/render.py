@@ -0,0 +1,109 @@
+import functools
+import json
+import json.encoder
+
+# the C accelerated escaper produces exactly what json.dumps would, so fall back to the pure Python one only if missing
+encode_string = json.encoder.c_encode_basestring_ascii or json.encoder.py_encode_basestring_ascii
+
+USERNAME = "ecs_service_deployment_notifications"
+
+_FIELDS_MARKER = "\x00fields\x00"
+_SERVICE_NAME_FIELD = '{"short": true, "title": "Service Name", "value": '
+_CLUSTER_NAME_FIELD = '}, {"short": true, "title": "Cluster Name", "value": '
+_REASON_FIELD = '{"short": false, "title": "Reason", "value": '
+
+
+def build_payload(description: str, channel: str, fields: list, color: str | None) -> dict:
+    payload: dict = {
+        "channels": [channel],
+        "username": USERNAME,
+        "text": description,
+        "message_content": {"fields": fields},
+    }
+
+    if color is not None:
+        payload["message_content"]["color"] = color
+
+    return payload
+
+
+class PayloadTemplate:
+    __slots__ = ("prefix", "suffix")
+
+    def __init__(self, description: str, channel: str, color: str | None) -> None:
+        # serialise the static parts once around a placeholder field list so they match json.dumps exactly
+        serialised = json.dumps(build_payload(description, channel, [_FIELDS_MARKER], color))
+        self.prefix, self.suffix = serialised.split(json.dumps(_FIELDS_MARKER))
+
+    def render(self, fields: str) -> bytes:
+        return f"{self.prefix}{fields}{self.suffix}".encode()
+
+
+@functools.lru_cache(maxsize=256)
+def template(description: str, channel: str, color: str | None) -> PayloadTemplate:
+    return PayloadTemplate(description, channel, color)
+
+
+def service_fields(cluster_name: str, service_name: str) -> str:
+    return f"{_SERVICE_NAME_FIELD}{encode_string(service_name)}{_CLUSTER_NAME_FIELD}{encode_string(cluster_name)}}}"
+
+
+def details_fields(task_definition: str, image: str | None, desired_count: int, running_count: int) -> str:
+    fields = [f'{{"short": true, "title": "Task Definition", "value": {encode_string(task_definition)}}}']
+    if image is not None:
+        fields.append(f'{{"short": true, "title": "Image", "value": {encode_string(image)}}}')
+    tasks = f"{running_count} running of {desired_count} desired"
+    fields.append(f'{{"short": true, "title": "Tasks", "value": {encode_string(tasks)}}}')
+    return ", ".join(fields)
+
+
+def reason_field(reason: str) -> str:
+    return f"{_REASON_FIELD}{encode_string(reason)}}}"
+
+
+def render_notification(
+    description: str,
+    channel: str,
+    cluster_name: str,
+    service_name: str,
+    reason: str,
+    color: str | None = None,
+    details: dict | None = None,
+) -> bytes:
+    fields = service_fields(cluster_name, service_name)
+    if details is not None:
+        fields = f"{fields}, {details_fields(**details)}"
+    fields = f"{fields}, {reason_field(reason)}"
+    return template(description, channel, color).render(fields)
+
+
+def render_aggregated(
+    description: str,
+    channel: str,
+    services: list[tuple[str, str]],
+    reason: str,
+    color: str | None,
+    max_bytes: int,
+) -> list[bytes]:
+    payload_template = template(description, channel, color)
+    reason_json = reason_field(reason)
+    base_size = len(payload_template.prefix) + len(payload_template.suffix) + len(reason_json)
+
+    chunks: list[list[str]] = []
+    rows: list[str] = []
+    size = base_size
+    for cluster_name, service_name in services:
+        row = service_fields(cluster_name, service_name)
+        # each row is followed by the ", " separator before the next row or the reason
+        row_size = len(row) + 2
+        if rows and size + row_size > max_bytes:
+            chunks.append(rows)
+            rows = []
+            size = base_size
+        rows.append(row)
+        size += row_size
+
+    if rows or not chunks:
+        chunks.append(rows)
+
+    return [payload_template.render(", ".join([*chunk, reason_json])) for chunk in chunks]
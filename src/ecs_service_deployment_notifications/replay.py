@@ -0,0 +1,234 @@
+import argparse
+import collections
+import concurrent.futures
+import dataclasses
+import gzip
+import json
+import logging
+import os
+import pathlib
+import sys
+import threading
+from typing import IO, Iterator, Sequence, TextIO
+
+from . import handler, metrics, slack
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+class DryRunTransport:
+    def __init__(self, stream: TextIO) -> None:
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def invoke(self, function_name: str, payload: bytes) -> None:
+        self._write({"function_name": function_name, "payload": json.loads(payload)})
+
+    def send(self, payload: bytes, deadline: float | None = None) -> None:
+        self._write({"payload": json.loads(payload)})
+
+    def _write(self, record: dict) -> None:
+        line = json.dumps(record)
+        with self._lock:
+            self.stream.write(f"{line}\n")
+
+
+@dataclasses.dataclass
+class Checkpoint:
+    path: pathlib.Path | None
+    positions: dict[str, int] = dataclasses.field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: pathlib.Path | None) -> "Checkpoint":
+        if path is None or not path.exists():
+            return cls(path)
+        return cls(path, json.loads(path.read_text()))
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        temporary_path = self.path.with_name(f"{self.path.name}.tmp")
+        temporary_path.write_text(json.dumps(self.positions))
+        os.replace(temporary_path, self.path)
+
+
+def _open(source: str) -> IO[str]:
+    if source == "-":
+        return sys.stdin
+
+    with open(source, "rb") as file:
+        compressed = file.read(2) == GZIP_MAGIC
+    if compressed:
+        return gzip.open(source, "rt", encoding="utf-8")
+    return open(source, encoding="utf-8")
+
+
+def read_lines(source: str) -> Iterator[tuple[int, str]]:
+    file = _open(source)
+    try:
+        for number, line in enumerate(file, start=1):
+            yield number, line
+    finally:
+        if file is not sys.stdin:
+            file.close()
+
+
+def process_line(line: str) -> str:
+    if not line.strip():
+        return "blank"
+
+    try:
+        event = json.loads(line)
+    except ValueError as exc:
+        logging.error(f"Failed to parse event: {exc}")
+        return "invalid"
+
+    handler.process_event(event)
+    return "processed"
+
+
+class Replay:
+    def __init__(
+        self,
+        checkpoint: Checkpoint,
+        concurrency: int = 1,
+        checkpoint_every: int = 100,
+        failures: TextIO | None = None,
+    ) -> None:
+        self.checkpoint = checkpoint
+        self.concurrency = concurrency
+        self.checkpoint_every = checkpoint_every
+        self.failures = failures
+        self.counts: collections.Counter[str] = collections.Counter()
+        self._unflushed = 0
+
+    def run(self, sources: Sequence[str]) -> None:
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                for source in sources:
+                    self._run_source(executor, source)
+        finally:
+            self._flush_metrics()
+
+    def _flush_metrics(self) -> None:
+        # nothing flushes the handler's metrics outside Lambda, so they would otherwise grow with every event
+        flushed = metrics.flush()
+        self._unflushed = 0
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            namespace = handler.get_runtime().config.metrics_namespace
+            logging.debug(f"Metrics {json.dumps(metrics.emf_records(namespace, flushed))}")
+
+    def _run_source(self, executor: concurrent.futures.Executor, source: str) -> None:
+        resume_after = self.checkpoint.positions.get(source, 0)
+        watermark = resume_after
+        completed: set[int] = set()
+        in_flight: dict[concurrent.futures.Future, tuple[int, str]] = {}
+
+        def collect(futures) -> None:
+            nonlocal watermark
+            for future in futures:
+                number, line = in_flight.pop(future)
+                try:
+                    self.counts[future.result()] += 1
+                except Exception as exc:
+                    logging.error(f"Failed to replay line {number} of {source}: {exc}")
+                    self.counts["failed"] += 1
+                    if self.failures is not None:
+                        self.failures.write(line if line.endswith("\n") else f"{line}\n")
+                completed.add(number)
+                self._unflushed += 1
+
+            if self._unflushed >= self.checkpoint_every:
+                self._flush_metrics()
+
+            # only checkpoint past lines when every line before them has finished
+            previous = watermark
+            while watermark + 1 in completed:
+                watermark += 1
+                completed.remove(watermark)
+            self.checkpoint.positions[source] = watermark
+            if watermark // self.checkpoint_every > previous // self.checkpoint_every:
+                self.checkpoint.save()
+
+        try:
+            for number, line in read_lines(source):
+                if number <= resume_after:
+                    self.counts["skipped"] += 1
+                    continue
+
+                if len(in_flight) >= self.concurrency * 2:
+                    done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                    collect(done)
+                in_flight[executor.submit(process_line, line)] = (number, line)
+
+            collect(concurrent.futures.as_completed(list(in_flight)))
+        finally:
+            self.checkpoint.save()
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Replay archived ECS deployment events, one JSON event per line, through the notification pipeline"
+    )
+    parser.add_argument("archives", nargs="+", help="newline delimited JSON files, optionally gzipped, or - for stdin")
+    parser.add_argument("--rate", type=float, default=0, help="maximum notifications sent per second")
+    parser.add_argument("--concurrency", type=int, default=1, help="number of events to process at once")
+    parser.add_argument("--dry-run", action="store_true", help="print payloads instead of invoking the Lambda")
+    parser.add_argument("--checkpoint", type=pathlib.Path, help="file recording progress to resume from")
+    parser.add_argument("--checkpoint-every", type=int, default=100, help="lines between checkpoint writes")
+    parser.add_argument("--failures", type=pathlib.Path, help="file to write events that failed to replay to")
+    args = parser.parse_args(argv)
+
+    if args.rate < 0:
+        parser.error("--rate must not be negative")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.checkpoint_every < 1:
+        parser.error("--checkpoint-every must be at least 1")
+    return args
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(argv)
+
+    environ = dict(os.environ)
+    if args.rate > 0:
+        environ["RATE_LIMIT_PER_SECOND"] = str(args.rate)
+    if args.dry_run:
+        # a dry run must not record anything, queue notifications or hold them back for a digest
+        for name in (
+            "IDEMPOTENCY_STORE",
+            "DEPLOYMENT_STATE_STORE",
+            "DEPLOYMENT_TIMING_STORE",
+            "DEPLOYMENT_DURATION_IN_MESSAGE",
+            "MESSAGE_STORE",
+            "DIGEST_WINDOW_SECONDS",
+            "DIGEST_STORE",
+            "OVERFLOW_QUEUE",
+        ):
+            environ.pop(name, None)
+    runtime = handler.init(environ)
+    if args.dry_run:
+        dry_run = DryRunTransport(sys.stdout)
+        slack.configure_transport(dry_run)
+        if runtime.config.slack_sink != "lambda":
+            slack.configure_sink(dry_run)
+        slack.configure_messages(None)
+
+    failures = open(args.failures, "a", encoding="utf-8") if args.failures else None
+    replay = Replay(Checkpoint.load(args.checkpoint), args.concurrency, args.checkpoint_every, failures)
+    try:
+        replay.run(args.archives)
+    except KeyboardInterrupt:
+        logging.warning("Replay interrupted")
+        return 130
+    finally:
+        if failures is not None:
+            failures.close()
+        logging.info(f"Replay finished {dict(replay.counts)}")
+
+    return 1 if replay.counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
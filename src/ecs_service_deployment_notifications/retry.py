@@ -0,0 +1,66 @@
+import dataclasses
+import http.client
+import random
+import time
+from typing import Callable, TypeVar
+
+from . import metrics
+
+T = TypeVar("T")
+
+THROTTLING_ERROR_CODES = frozenset(
+    {"TooManyRequestsException", "ThrottlingException", "Throttling", "RequestLimitExceeded", "ServiceException"}
+)
+CONNECTION_ERROR_NAMES = frozenset(
+    {"EndpointConnectionError", "ConnectTimeoutError", "ReadTimeoutError", "ConnectionClosedError"}
+)
+
+
+def retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (ConnectionError, TimeoutError, http.client.HTTPException)):
+        return True
+    # botocore is imported lazily, so recognise its connection errors by name
+    if type(exc).__name__ in CONNECTION_ERROR_NAMES:
+        return True
+
+    status = getattr(exc, "status", None)
+    response = getattr(exc, "response", None)
+    if status is None and isinstance(response, dict):
+        if response.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES:
+            return True
+        status = response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
+@dataclasses.dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int = 3
+    base_delay: float = 0.1
+    max_delay: float = 2.0
+
+    def delay(self, attempt: int, random: Callable[[], float] = random.random) -> float:
+        # full jitter spreads retries from concurrent sends so they do not arrive together
+        return random() * min(self.max_delay, self.base_delay * 2**attempt)
+
+
+def call(
+    function: Callable[[], T],
+    policy: RetryPolicy,
+    deadline: float | None = None,
+    sleep: Callable[[float], None] = time.sleep,
+    clock: Callable[[], float] = time.monotonic,
+) -> T:
+    attempt = 0
+    while True:
+        try:
+            return function()
+        except Exception as exc:
+            attempt += 1
+            if attempt >= policy.max_attempts or not retryable(exc):
+                raise
+            delay = policy.delay(attempt - 1)
+            if deadline is not None and clock() + delay >= deadline:
+                raise
+            metrics.increment("NotificationRetries")
+            sleep(delay)
@@ -0,0 +1,65 @@
+class _Node:
+    __slots__ = ("children", "channel")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _Node] = {}
+        self.channel: str | None = None
+
+
+class PrefixTrie:
+    def __init__(self) -> None:
+        self._root = _Node()
+
+    def insert(self, prefix: str, channel: str) -> None:
+        node = self._root
+        for character in prefix:
+            node = node.children.setdefault(character, _Node())
+        node.channel = channel
+
+    def longest_prefix(self, name: str) -> str | None:
+        node = self._root
+        channel = node.channel
+        for character in name:
+            node = node.children.get(character)
+            if node is None:
+                break
+            if node.channel is not None:
+                channel = node.channel
+        return channel
+
+
+class RoutingTable:
+    def __init__(self) -> None:
+        self._clusters: dict[str, PrefixTrie] = {}
+        self._channels: set[str] = set()
+
+    def add(self, cluster_name: str, service_prefix: str, channel: str) -> None:
+        self._channels.add(channel)
+        self._clusters.setdefault(cluster_name, PrefixTrie()).insert(service_prefix, channel)
+
+    def lookup(self, cluster_name: str, service_name: str) -> str | None:
+        services = self._clusters.get(cluster_name)
+        if services is None:
+            return None
+        return services.longest_prefix(service_name)
+
+    def watches(self, cluster_name: str) -> bool:
+        return cluster_name in self._clusters
+
+    @property
+    def cluster_names(self) -> list[str]:
+        return list(self._clusters)
+
+    @property
+    def channels(self) -> set[str]:
+        return set(self._channels)
+
+    @classmethod
+    def from_routes(cls, routes: list[dict]) -> "RoutingTable":
+        table = cls()
+        for route in routes:
+            if "cluster" not in route or "channel" not in route:
+                raise ValueError(f"Route missing cluster or channel: {route}")
+            table.add(route["cluster"], route.get("service_prefix", ""), route["channel"])
+        return table
+
@@ -1,27 +1,211 @@
+import email.utils
+import functools
+import hashlib
 import json
-from typing import TYPE_CHECKING
+import math
+import time
+import urllib.parse
+from typing import TYPE_CHECKING, Callable, Protocol, TypeVar
 
-import boto3
+from . import breaker, clients, messages, metrics, render, retry, transport
 
 if TYPE_CHECKING:
     from mypy_boto3_lambda.client import LambdaClient
 else:
     LambdaClient = object
 
+T = TypeVar("T")
+
+MAX_ASYNC_PAYLOAD_BYTES = 256 * 1024
+
+SLACK_API_URL = "https://slack.com/api"
+DEFAULT_RETRY_AFTER = 1.0
+
+
+class SlackError(Exception):
+    def __init__(self, status: int, error: str, retry_after: float | None = None) -> None:
+        super().__init__(f"{error} ({status})")
+        self.status = status
+        self.error = error
+        self.retry_after = retry_after
+
+
+def retry_after_seconds(value: str | None, now: Callable[[], float] = time.time) -> float:
+    if value is None:
+        return DEFAULT_RETRY_AFTER
+    try:
+        seconds = float(value)
+    except ValueError:
+        # HTTP also allows the time to retry at as a date
+        try:
+            seconds = email.utils.parsedate_to_datetime(value).timestamp() - now()
+        except (TypeError, ValueError):
+            return DEFAULT_RETRY_AFTER
+        return max(seconds, 0.0)
+    return seconds if math.isfinite(seconds) and seconds >= 0 else DEFAULT_RETRY_AFTER
+
+
+class Sink(Protocol):
+    def send(self, payload: bytes, deadline: float | None = None) -> None: ...
+
+
+def slack_messages(payload: dict) -> list[dict]:
+    attachment = dict(payload["message_content"])
+    return [
+        {"channel": channel, "username": payload["username"], "text": payload["text"], "attachments": [attachment]}
+        for channel in payload["channels"]
+    ]
+
+
+class SlackSink:
+    def __init__(
+        self,
+        url: str,
+        token: str | None = None,
+        pool_size: int = 10,
+        timeout: float = 5,
+        max_retries: int = 2,
+        max_retry_after: float = 30,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        parsed = urllib.parse.urlsplit(url)
+        self.pool = transport.ConnectionPool(f"{parsed.scheme}://{parsed.netloc}", pool_size, timeout)
+        self.path = parsed.path or "/"
+        self.headers = {"Content-Type": "application/json; charset=utf-8"}
+        if token is not None:
+            self.headers["Authorization"] = f"Bearer {token}"
+        self.token = token
+        self.max_retries = max_retries
+        self.max_retry_after = max_retry_after
+        self.sleep = sleep
+        self.clock = clock
+
+    @classmethod
+    def webhook(cls, url: str, **kwargs) -> "SlackSink":
+        return cls(url, **kwargs)
+
+    @classmethod
+    def api(cls, token: str, api_url: str = SLACK_API_URL, **kwargs) -> "SlackSink":
+        return cls(f"{api_url.rstrip('/')}/chat.postMessage", token=token, **kwargs)
+
+    def send(self, payload: bytes, deadline: float | None = None) -> None:
+        for message in slack_messages(json.loads(payload)):
+            self._post(self.path, json.dumps(message).encode(), deadline)
+
+    def call(self, method: str, message: dict, deadline: float | None = None) -> dict:
+        if self.token is None:
+            raise ValueError("Slack API methods need a bot token")
+        return self._post(f"{self.path.rsplit('/', 1)[0]}/{method}", json.dumps(message).encode(), deadline)
+
+    def _post(self, path: str, body: bytes, deadline: float | None = None) -> dict:
+        retries = 0
+        while True:
+            status, headers, response_body = self.pool.request("POST", path, body, self.headers)
+            if status == 429:
+                retry_after = retry_after_seconds(headers.get("retry-after"))
+                past_deadline = deadline is not None and self.clock() + retry_after > deadline
+                if retries >= self.max_retries or retry_after > self.max_retry_after or past_deadline:
+                    raise SlackError(status, "rate_limited", retry_after)
+                retries += 1
+                metrics.increment("SlackRetryAfter")
+                self.sleep(retry_after)
+                continue
+
+            if status >= 300:
+                raise SlackError(status, response_body.decode(errors="replace"))
+
+            # the Web API reports errors in the body of a 200 response, webhooks reply with plain text
+            if self.token is None:
+                return {}
+            response = json.loads(response_body)
+            if not response.get("ok"):
+                raise SlackError(status, response.get("error", "unknown_error"))
+            return response
+
+
+_transport: transport.LambdaInvokeTransport | None = None
+_sink: Sink | None = None
+_retry_policy: retry.RetryPolicy | None = None
+_breaker: breaker.CircuitBreaker | None = None
+_message_store: messages.MessageStore | None = None
+_message_mode = messages.POST
+
+
+def configure_transport(lambda_transport: transport.LambdaInvokeTransport | None) -> None:
+    global _transport
+    _transport = lambda_transport
+
+
+def configure_sink(sink: Sink | None) -> None:
+    global _sink
+    _sink = sink
+
+
+def configure_messages(message_store: messages.MessageStore | None, mode: str = messages.POST) -> None:
+    global _message_store, _message_mode
+    _message_store = message_store
+    _message_mode = mode
+
+
+def configure_resilience(
+    retry_policy: retry.RetryPolicy | None,
+    circuit_breaker: breaker.CircuitBreaker | None,
+) -> None:
+    global _retry_policy, _breaker
+    _retry_policy = retry_policy
+    _breaker = circuit_breaker
+
 
 def get_lambda_client() -> LambdaClient:
-    return boto3.client("lambda")
+    return clients.get_client("lambda")
+
+
+def invoke_lambda(lambda_arn: str, payload: dict | bytes) -> None:
+    if isinstance(payload, dict):
+        payload = json.dumps(payload).encode()
 
+    if _transport is not None:
+        _transport.invoke(lambda_arn, payload)
+        return
 
-def invoke_lambda(lambda_arn: str, payload: dict) -> None:
     lambda_client = get_lambda_client()
     lambda_client.invoke(
         FunctionName=lambda_arn,
-        Payload=json.dumps(payload).encode(),
+        Payload=payload,
         InvocationType="Event",
     )
 
 
+def warm() -> None:
+    if isinstance(_sink, SlackSink):
+        _sink.pool.warm()
+    elif _sink is None and _transport is not None:
+        _transport.pool.warm()
+    elif _sink is None:
+        get_lambda_client()
+
+
+def _deliver_once(lambda_arn: str, payload: bytes, deadline: float | None = None) -> None:
+    with metrics.timer("InvokeLatency"):
+        if _sink is not None:
+            _sink.send(payload, deadline)
+        else:
+            invoke_lambda(lambda_arn, payload)
+
+
+def _resilient(send: Callable[[], T], deadline: float | None = None) -> T:
+    if _breaker is not None:
+        send = functools.partial(_breaker.call, send)
+    if _retry_policy is not None:
+        return retry.call(send, _retry_policy, deadline)
+    return send()
+
+
+def deliver(lambda_arn: str, payload: bytes, deadline: float | None = None) -> None:
+    _resilient(functools.partial(_deliver_once, lambda_arn, payload, deadline), deadline)
+
+
 def send_notification(
     lambda_arn: str,
     description: str,
@@ -30,21 +214,92 @@ def send_notification(
     service_name: str,
     reason: str,
     color: str | None = None,
+    details: dict | None = None,
+    deadline: float | None = None,
+) -> None:
+    with metrics.timer("RenderDuration"):
+        payload = render.render_notification(description, channel, cluster_name, service_name, reason, color, details)
+    deliver(lambda_arn, payload, deadline)
+
+
+def aggregated_payloads(
+    description: str,
+    channel: str,
+    services: list[tuple[str, str]],
+    reason: str,
+    color: str | None = None,
+    max_bytes: int = MAX_ASYNC_PAYLOAD_BYTES,
+) -> list[bytes]:
+    return render.render_aggregated(description, channel, services, reason, color, max_bytes)
+
+
+def send_aggregated_notification(
+    lambda_arn: str,
+    description: str,
+    channel: str,
+    services: list[tuple[str, str]],
+    reason: str,
+    color: str | None = None,
+    deadline: float | None = None,
+) -> None:
+    with metrics.timer("RenderDuration"):
+        payloads = aggregated_payloads(description, channel, services, reason, color)
+    for payload in payloads:
+        deliver(lambda_arn, payload, deadline)
+
+
+def send_summary(
+    lambda_arn: str,
+    description: str,
+    channel: str,
+    fields: list[dict],
+    color: str | None = None,
+    deadline: float | None = None,
+) -> None:
+    with metrics.timer("RenderDuration"):
+        payload = json.dumps(render.build_payload(description, channel, fields, color)).encode()
+    deliver(lambda_arn, payload, deadline)
+
+
+def _call_api(method: str, message: dict, deadline: float | None = None) -> dict:
+    with metrics.timer("InvokeLatency"):
+        metrics.increment("SlackApiCalls", dimensions={"Method": method})
+        return _sink.call(method, message, deadline)
+
+
+def send_deployment_notification(
+    lambda_arn: str,
+    description: str,
+    channel: str,
+    cluster_name: str,
+    service_name: str,
+    reason: str,
+    deployment_id: str,
+    color: str | None = None,
+    details: dict | None = None,
+    deadline: float | None = None,
 ) -> None:
-    payload: dict = {
-        "channels": [channel],
-        "username": "ecs_service_deployment_notifications",
-        "text": description,
-        "message_content": {
-            "fields": [
-                {"short": True, "title": "Service Name", "value": service_name},
-                {"short": True, "title": "Cluster Name", "value": cluster_name},
-                {"short": False, "title": "Reason", "value": reason},
-            ]
-        },
-    }
-
-    if color is not None:
-        payload["message_content"]["color"] = color
-
-    invoke_lambda(lambda_arn, payload)
+    with metrics.timer("RenderDuration"):
+        payload = render.render_notification(description, channel, cluster_name, service_name, reason, color, details)
+
+    if _message_store is None or _message_mode == messages.POST or not isinstance(_sink, SlackSink):
+        deliver(lambda_arn, payload, deadline)
+        return
+
+    [message] = slack_messages(json.loads(payload))
+    digest = hashlib.sha256(payload).hexdigest()
+    reference = _message_store.get(deployment_id, channel)
+    if reference is None:
+        response = _resilient(functools.partial(_call_api, "chat.postMessage", message, deadline), deadline)
+        reference = {"channel": response["channel"], "ts": response["ts"]}
+    elif reference.get("digest") == digest:
+        metrics.increment("SlackUnchangedSkipped")
+        return
+    elif _message_mode == messages.UPDATE:
+        update = message | {"channel": reference["channel"], "ts": reference["ts"]}
+        _resilient(functools.partial(_call_api, "chat.update", update, deadline), deadline)
+    else:
+        reply = message | {"channel": reference["channel"], "thread_ts": reference["ts"]}
+        _resilient(functools.partial(_call_api, "chat.postMessage", reply, deadline), deadline)
+
+    _message_store.put(deployment_id, channel, reference | {"digest": digest})
@@ -0,0 +1,223 @@
+import collections
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Protocol
+
+from . import clients
+
+
+class Store(Protocol):
+    def get_item(self, key: str) -> dict | None: ...
+
+    def put_item(self, key: str, item: dict, expires_at: float | None = None, if_not_exists: bool = False) -> bool: ...
+
+    def delete_item(self, key: str) -> None: ...
+
+    def append_item(self, key: str, entry: dict, expires_at: float | None = None) -> None: ...
+
+    def add_member(self, key: str, member: str, expires_at: float | None = None) -> None: ...
+
+
+class InMemoryStore:
+    def __init__(self, maxsize: int = 10000) -> None:
+        self.maxsize = maxsize
+        self._items: collections.OrderedDict[str, tuple[float | None, dict]] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def _live(self, key: str) -> dict | None:
+        entry = self._items.get(key)
+        if entry is None:
+            return None
+        expires_at, item = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self._items[key]
+            return None
+        return item
+
+    def get_item(self, key: str) -> dict | None:
+        with self._lock:
+            item = self._live(key)
+            return None if item is None else dict(item)
+
+    def put_item(self, key: str, item: dict, expires_at: float | None = None, if_not_exists: bool = False) -> bool:
+        with self._lock:
+            if if_not_exists and self._live(key) is not None:
+                return False
+            self._items[key] = (expires_at, dict(item))
+            self._items.move_to_end(key)
+            # the oldest writes are evicted first to keep the store bounded
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+            return True
+
+    def delete_item(self, key: str) -> None:
+        with self._lock:
+            self._items.pop(key, None)
+
+    def append_item(self, key: str, entry: dict, expires_at: float | None = None) -> None:
+        with self._lock:
+            item = self._live(key) or {"entries": []}
+            self._items[key] = (expires_at, {"entries": [*item["entries"], dict(entry)]})
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def add_member(self, key: str, member: str, expires_at: float | None = None) -> None:
+        with self._lock:
+            item = self._live(key) or {"members": []}
+            self._items[key] = (expires_at, {"members": sorted({*item["members"], member})})
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+
+class SQLiteStore:
+    def __init__(self, path: str) -> None:
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS items (key TEXT PRIMARY KEY, item TEXT NOT NULL, expires_at REAL)"
+        )
+        self._lock = threading.Lock()
+
+    def get_item(self, key: str) -> dict | None:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT item FROM items WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, time.time()),
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def put_item(self, key: str, item: dict, expires_at: float | None = None, if_not_exists: bool = False) -> bool:
+        with self._lock:
+            if if_not_exists:
+                cursor = self._connection.execute(
+                    "INSERT INTO items (key, item, expires_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET item = excluded.item, expires_at = excluded.expires_at "
+                    "WHERE items.expires_at IS NOT NULL AND items.expires_at <= ?",
+                    (key, json.dumps(item), expires_at, time.time()),
+                )
+                return cursor.rowcount == 1
+
+            self._connection.execute(
+                "INSERT OR REPLACE INTO items (key, item, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(item), expires_at),
+            )
+            return True
+
+    def delete_item(self, key: str) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM items WHERE key = ?", (key,))
+
+    def append_item(self, key: str, entry: dict, expires_at: float | None = None) -> None:
+        self._update(key, lambda item: {"entries": [*item.get("entries", []), entry]}, expires_at)
+
+    def add_member(self, key: str, member: str, expires_at: float | None = None) -> None:
+        self._update(key, lambda item: {"members": sorted({*item.get("members", []), member})}, expires_at)
+
+    def _update(self, key: str, update: Callable[[dict], dict], expires_at: float | None) -> None:
+        with self._lock:
+            # the write lock keeps concurrent updates from other processes sharing the file from losing writes
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._connection.execute(
+                    "SELECT item FROM items WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                    (key, time.time()),
+                ).fetchone()
+                item = update({} if row is None else json.loads(row[0]))
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO items (key, item, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(item), expires_at),
+                )
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+
+class DynamoDBStore:
+    def __init__(self, table_name: str, client: Any = None) -> None:
+        self.table_name = table_name
+        self._client = client
+
+    @property
+    def client(self) -> Any:
+        return self._client or clients.get_client("dynamodb")
+
+    def get_item(self, key: str) -> dict | None:
+        response = self.client.get_item(TableName=self.table_name, Key={"pk": {"S": key}}, ConsistentRead=True)
+        if "Item" not in response:
+            return None
+
+        item = response["Item"]
+        if "expires_at" in item and float(item["expires_at"]["N"]) <= time.time():
+            return None
+        if "entries" in item:
+            return {"entries": [json.loads(entry["S"]) for entry in item["entries"]["L"]]}
+        if "members" in item:
+            return {"members": sorted(item["members"]["SS"])}
+        return json.loads(item["item"]["S"])
+
+    def put_item(self, key: str, item: dict, expires_at: float | None = None, if_not_exists: bool = False) -> bool:
+        dynamodb_item = {"pk": {"S": key}, "item": {"S": json.dumps(item)}}
+        if expires_at is not None:
+            dynamodb_item["expires_at"] = {"N": str(int(expires_at))}
+
+        kwargs: dict = {}
+        if if_not_exists:
+            kwargs = {
+                "ConditionExpression": "attribute_not_exists(pk) OR expires_at <= :now",
+                "ExpressionAttributeValues": {":now": {"N": str(int(time.time()))}},
+            }
+
+        try:
+            self.client.put_item(TableName=self.table_name, Item=dynamodb_item, **kwargs)
+        except self.client.exceptions.ConditionalCheckFailedException:
+            return False
+        return True
+
+    def delete_item(self, key: str) -> None:
+        self.client.delete_item(TableName=self.table_name, Key={"pk": {"S": key}})
+
+    def append_item(self, key: str, entry: dict, expires_at: float | None = None) -> None:
+        # list_append is applied by DynamoDB itself so concurrent appends never overwrite each other
+        update_expression = "SET entries = list_append(if_not_exists(entries, :empty), :entry)"
+        values: dict = {":empty": {"L": []}, ":entry": {"L": [{"S": json.dumps(entry)}]}}
+        if expires_at is not None:
+            update_expression += ", expires_at = :expires_at"
+            values[":expires_at"] = {"N": str(int(expires_at))}
+
+        self.client.update_item(
+            TableName=self.table_name,
+            Key={"pk": {"S": key}},
+            UpdateExpression=update_expression,
+            ExpressionAttributeValues=values,
+        )
+
+    def add_member(self, key: str, member: str, expires_at: float | None = None) -> None:
+        # a string set holds each member once, however many times it is added
+        update_expression = "ADD members :member"
+        values: dict = {":member": {"SS": [member]}}
+        if expires_at is not None:
+            update_expression += " SET expires_at = :expires_at"
+            values[":expires_at"] = {"N": str(int(expires_at))}
+
+        self.client.update_item(
+            TableName=self.table_name,
+            Key={"pk": {"S": key}},
+            UpdateExpression=update_expression,
+            ExpressionAttributeValues=values,
+        )
+
+
+def from_url(url: str) -> Store:
+    scheme, _, location = url.partition("://")
+    if scheme == "memory":
+        return InMemoryStore()
+    elif scheme == "sqlite":
+        return SQLiteStore(location or ":memory:")
+    elif scheme == "dynamodb":
+        return DynamoDBStore(location)
+
+    raise ValueError(f"Unsupported store URL {url}")
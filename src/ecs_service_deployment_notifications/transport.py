@@ -0,0 +1,189 @@
+import dataclasses
+import datetime
+import hashlib
+import hmac
+import http.client
+import json
+import queue
+import urllib.parse
+from typing import Mapping
+
+
+class InvokeError(Exception):
+    def __init__(self, status: int, error_type: str, message: str) -> None:
+        super().__init__(f"{error_type} ({status}): {message}")
+        self.status = status
+        self.error_type = error_type
+
+
+@dataclasses.dataclass(frozen=True)
+class Credentials:
+    access_key: str
+    secret_key: str
+    session_token: str | None = None
+
+    @classmethod
+    def from_environ(cls, environ: Mapping[str, str]) -> "Credentials":
+        return cls(
+            access_key=environ["AWS_ACCESS_KEY_ID"],
+            secret_key=environ["AWS_SECRET_ACCESS_KEY"],
+            session_token=environ.get("AWS_SESSION_TOKEN"),
+        )
+
+
+def _hmac(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode(), hashlib.sha256).digest()
+
+
+def sign(
+    method: str,
+    host: str,
+    path: str,
+    headers: dict[str, str],
+    body: bytes,
+    credentials: Credentials,
+    region: str,
+    service: str,
+    now: datetime.datetime,
+) -> dict[str, str]:
+    amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+    date_stamp = amz_date[:8]
+
+    signed = {name.lower(): value.strip() for name, value in headers.items()}
+    signed["host"] = host
+    signed["x-amz-date"] = amz_date
+    if credentials.session_token is not None:
+        signed["x-amz-security-token"] = credentials.session_token
+
+    signed_header_names = ";".join(sorted(signed))
+    canonical_request = "\n".join(
+        [
+            method,
+            # the path is URI-encoded once for the request and again for the canonical request
+            urllib.parse.quote(path, safe="/~"),
+            "",
+            "".join(f"{name}:{signed[name]}\n" for name in sorted(signed)),
+            signed_header_names,
+            hashlib.sha256(body).hexdigest(),
+        ]
+    )
+
+    scope = f"{date_stamp}/{region}/{service}/aws4_request"
+    string_to_sign = "\n".join(
+        ["AWS4-HMAC-SHA256", amz_date, scope, hashlib.sha256(canonical_request.encode()).hexdigest()]
+    )
+
+    key = _hmac(f"AWS4{credentials.secret_key}".encode(), date_stamp)
+    for part in (region, service, "aws4_request"):
+        key = _hmac(key, part)
+    signature = hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+    signed_headers = dict(headers)
+    signed_headers["X-Amz-Date"] = amz_date
+    if credentials.session_token is not None:
+        signed_headers["X-Amz-Security-Token"] = credentials.session_token
+    signed_headers["Authorization"] = (
+        f"AWS4-HMAC-SHA256 Credential={credentials.access_key}/{scope}, "
+        f"SignedHeaders={signed_header_names}, Signature={signature}"
+    )
+    return signed_headers
+
+
+class ConnectionPool:
+    def __init__(self, endpoint: str, size: int = 10, timeout: float = 5) -> None:
+        url = urllib.parse.urlsplit(endpoint)
+        self.host = url.netloc
+        self._connection_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        self._timeout = timeout
+        self._idle: queue.LifoQueue[http.client.HTTPConnection] = queue.LifoQueue(maxsize=size)
+
+    def _connection(self) -> tuple[http.client.HTTPConnection, bool]:
+        try:
+            return self._idle.get_nowait(), True
+        except queue.Empty:
+            return self._connection_class(self.host, timeout=self._timeout), False
+
+    def _release(self, connection: http.client.HTTPConnection) -> None:
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def warm(self) -> None:
+        # idle connections may have been closed by the server since they were last used, so replace them
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+        connection = self._connection_class(self.host, timeout=self._timeout)
+        try:
+            connection.connect()
+        except Exception:
+            connection.close()
+            raise
+        self._release(connection)
+
+    def request(self, method: str, path: str, body: bytes, headers: dict[str, str]) -> tuple[int, dict, bytes]:
+        connection, reused = self._connection()
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            connection.close()
+            if not reused:
+                raise
+            # the server closed an idle keep-alive connection, so retry once on a fresh one
+            connection = self._connection_class(self.host, timeout=self._timeout)
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+        except Exception:
+            connection.close()
+            raise
+
+        response_body = response.read()
+        response_headers = {name.lower(): value for name, value in response.getheaders()}
+        if response.will_close:
+            connection.close()
+        else:
+            self._release(connection)
+        return response.status, response_headers, response_body
+
+
+class LambdaInvokeTransport:
+    def __init__(
+        self,
+        region: str,
+        credentials: Credentials,
+        endpoint: str | None = None,
+        pool_size: int = 10,
+        timeout: float = 5,
+    ) -> None:
+        self.region = region
+        self.credentials = credentials
+        self.pool = ConnectionPool(endpoint or f"https://lambda.{region}.amazonaws.com", pool_size, timeout)
+
+    def invoke(self, function_name: str, payload: bytes) -> None:
+        path = f"/2015-03-31/functions/{urllib.parse.quote(function_name, safe='')}/invocations"
+        headers = sign(
+            "POST",
+            self.pool.host,
+            path,
+            {"Content-Type": "application/json", "X-Amz-Invocation-Type": "Event"},
+            payload,
+            self.credentials,
+            self.region,
+            "lambda",
+            datetime.datetime.now(datetime.timezone.utc),
+        )
+
+        status, response_headers, body = self.pool.request("POST", path, payload, headers)
+        if status >= 300:
+            error_type = response_headers.get("x-amzn-errortype", "UnknownError").split(":")[0]
+            try:
+                error = json.loads(body)
+            except ValueError:
+                error = {}
+            message = error.get("message") or error.get("Message") or body.decode(errors="replace")
+            raise InvokeError(status, error_type, message)
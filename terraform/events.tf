@@ -1,13 +1,42 @@
+locals {
+  service_arn_prefix = "arn:aws:ecs:${data.aws_region.current.name}:${data.aws_caller_identity.current.account_id}:service"
+
+  monitored_service_arn_prefixes = length(var.routing_table) > 0 ? distinct([
+    for route in var.routing_table : "${local.service_arn_prefix}/${route.cluster}/${route.service_prefix}"
+  ]) : ["${local.service_arn_prefix}/${var.cluster_name}/${var.service_name_prefix}"]
+
+  monitored_cluster_arns = distinct([
+    for cluster in length(var.routing_table) > 0 ? var.routing_table[*].cluster : [var.cluster_name] :
+    "arn:aws:ecs:${data.aws_region.current.name}:${data.aws_caller_identity.current.account_id}:cluster/${cluster}"
+  ])
+
+  # service events name the service in their resources, while task events only name it in their detail
+  service_event_pattern = {
+    "detail-type" = [for family in var.event_families : family if family != "ECS Task State Change"],
+    resources     = [for prefix in local.monitored_service_arn_prefixes : { prefix = prefix }]
+  }
+  task_event_pattern = {
+    "detail-type" = ["ECS Task State Change"],
+    detail = {
+      clusterArn = local.monitored_cluster_arns,
+      group      = [{ prefix = "service:" }],
+      lastStatus = ["STOPPED"],
+    }
+  }
+  event_patterns = concat(
+    length(local.service_event_pattern["detail-type"]) > 0 ? [local.service_event_pattern] : [],
+    contains(var.event_families, "ECS Task State Change") ? [local.task_event_pattern] : [],
+  )
+}
+
 resource "aws_cloudwatch_event_rule" "ecs_service_deployment" {
   name        = "ecs-service-deployment-notifications-${var.cluster_name}"
   description = "Matches ECS service deployment events"
-  event_pattern = jsonencode({
-    source        = ["aws.ecs"],
-    "detail-type" = ["ECS Deployment State Change"],
-    resources = [{
-      prefix = "arn:aws:ecs:${data.aws_region.current.name}:${data.aws_caller_identity.current.account_id}:service/${var.cluster_name}/${var.service_name_prefix}"
-    }]
-  })
+  event_pattern = (
+    length(local.event_patterns) == 1
+    ? jsonencode(merge({ source = ["aws.ecs"] }, local.event_patterns[0]))
+    : jsonencode({ source = ["aws.ecs"], "$or" = local.event_patterns })
+  )
 }
 
 resource "aws_cloudwatch_event_target" "ecs_service_deployment_notifications" {
@@ -24,3 +53,62 @@ resource "aws_lambda_permission" "allow_lambda_to_execute_from_eventbridge_on_ev
   principal     = "events.amazonaws.com"
   source_arn    = aws_cloudwatch_event_rule.ecs_service_deployment.arn
 }
+
+locals {
+  digest_window_minutes = var.digest_window_seconds / 60
+}
+
+resource "aws_cloudwatch_event_rule" "digest" {
+  count = var.digest_window_seconds > 0 ? 1 : 0
+
+  name                = "ecs-service-deployment-notifications-digest-${var.cluster_name}"
+  description         = "Flushes buffered ECS service deployment notifications as digests"
+  schedule_expression = local.digest_window_minutes == 1 ? "rate(1 minute)" : "rate(${local.digest_window_minutes} minutes)"
+}
+
+resource "aws_cloudwatch_event_target" "digest" {
+  count = var.digest_window_seconds > 0 ? 1 : 0
+
+  target_id = "ecs-service-deployment-notifications-digest-${var.cluster_name}"
+  rule      = aws_cloudwatch_event_rule.digest[0].name
+  arn       = module.lambda.lambda_alias_arn
+}
+
+resource "aws_lambda_permission" "allow_lambda_to_execute_from_eventbridge_on_schedule" {
+  count = var.digest_window_seconds > 0 ? 1 : 0
+
+  statement_id  = "AllowExecutionFromDigestSchedule"
+  action        = "lambda:InvokeFunction"
+  function_name = module.lambda.lambda_name
+  qualifier     = module.lambda.lambda_alias_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.digest[0].arn
+}
+
+resource "aws_cloudwatch_event_rule" "warm_up" {
+  count = var.warm_up_schedule_expression != "" ? 1 : 0
+
+  name                = "ecs-service-deployment-notifications-warm-up-${var.cluster_name}"
+  description         = "Keeps the ECS service deployment notifications function initialised"
+  schedule_expression = var.warm_up_schedule_expression
+}
+
+resource "aws_cloudwatch_event_target" "warm_up" {
+  count = var.warm_up_schedule_expression != "" ? 1 : 0
+
+  target_id = "ecs-service-deployment-notifications-warm-up-${var.cluster_name}"
+  rule      = aws_cloudwatch_event_rule.warm_up[0].name
+  arn       = module.lambda.lambda_alias_arn
+  input     = jsonencode({ warmUp = true })
+}
+
+resource "aws_lambda_permission" "allow_lambda_to_execute_from_eventbridge_on_warm_up_schedule" {
+  count = var.warm_up_schedule_expression != "" ? 1 : 0
+
+  statement_id  = "AllowExecutionFromWarmUpSchedule"
+  action        = "lambda:InvokeFunction"
+  function_name = module.lambda.lambda_name
+  qualifier     = module.lambda.lambda_alias_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.warm_up[0].arn
+}
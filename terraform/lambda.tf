@@ -10,11 +10,18 @@ module "lambda" {
   lambda_git_repo                         = "https://www.github.com/hmrc/aws-lambda-ecs-service-deployment-notifications"
   log_subscription_filter_destination_arn = var.log_subscription_filter_destination_arn
 
-  environment_variables = {
-    CLUSTER_NAME                   = var.cluster_name
-    SLACK_CHANNEL                  = var.slack_channel
-    SLACK_NOTIFICATIONS_LAMBDA_ARN = var.slack_notifications_lambda_arn
-  }
+  environment_variables = merge(
+    {
+      CLUSTER_NAME                   = var.cluster_name
+      SLACK_CHANNEL                  = var.slack_channel
+      SLACK_NOTIFICATIONS_LAMBDA_ARN = var.slack_notifications_lambda_arn
+    },
+    length(var.routing_table) > 0 ? { ROUTING_TABLE = jsonencode(var.routing_table) } : {},
+    var.digest_window_seconds > 0 ? { DIGEST_WINDOW_SECONDS = tostring(var.digest_window_seconds) } : {},
+    var.digest_store != "" ? { DIGEST_STORE = var.digest_store } : {},
+    var.enrich_services ? { ENRICH_SERVICES = "true" } : {},
+    var.channel_tag != "" ? { CHANNEL_TAG = var.channel_tag } : {},
+  )
 }
 
 data "aws_iam_policy_document" "invoke_slack_notifications_lambda" {
@@ -35,3 +42,53 @@ resource "aws_iam_role_policy" "invoke_slack_notifications_lambda" {
   policy = data.aws_iam_policy_document.invoke_slack_notifications_lambda.json
   role   = module.lambda.iam_role_id
 }
+
+data "aws_iam_policy_document" "describe_services" {
+  statement {
+    actions = [
+      "ecs:DescribeServices",
+      "ecs:DescribeTaskDefinition",
+    ]
+    effect    = "Allow"
+    resources = ["*"]
+    sid       = "AllowDescribeServices"
+  }
+}
+
+resource "aws_iam_role_policy" "describe_services" {
+  count = var.enrich_services || var.channel_tag != "" ? 1 : 0
+
+  name   = "lambda-describe-services"
+  policy = data.aws_iam_policy_document.describe_services.json
+  role   = module.lambda.iam_role_id
+}
+
+locals {
+  digest_table_name = startswith(var.digest_store, "dynamodb://") ? trimprefix(var.digest_store, "dynamodb://") : ""
+}
+
+data "aws_iam_policy_document" "digest_store" {
+  count = local.digest_table_name != "" ? 1 : 0
+
+  statement {
+    actions = [
+      "dynamodb:DeleteItem",
+      "dynamodb:GetItem",
+      "dynamodb:PutItem",
+      "dynamodb:UpdateItem",
+    ]
+    effect = "Allow"
+    resources = [
+      "arn:aws:dynamodb:${data.aws_region.current.name}:${data.aws_caller_identity.current.account_id}:table/${local.digest_table_name}"
+    ]
+    sid = "AllowDigestStore"
+  }
+}
+
+resource "aws_iam_role_policy" "digest_store" {
+  count = local.digest_table_name != "" ? 1 : 0
+
+  name   = "lambda-digest-store"
+  policy = data.aws_iam_policy_document.digest_store[0].json
+  role   = module.lambda.iam_role_id
+}
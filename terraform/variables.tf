@@ -44,3 +44,87 @@ variable "service_name_prefix" {
   type    = string
   default = ""
 }
+
+variable "routing_table" {
+  description = <<EOT
+  Routes from ECS cluster and service name prefix to Slack channel, allowing one function to notify for many clusters.
+
+  The longest matching service name prefix within a cluster wins. When empty, all services in cluster_name matching service_name_prefix are notified in slack_channel.
+  EOT
+
+  type = list(object({
+    cluster        = string
+    service_prefix = optional(string, "")
+    channel        = string
+  }))
+  default = []
+}
+
+variable "event_families" {
+  description = <<EOT
+  ECS event families to notify about, by EventBridge detail type.
+
+  Deployment state changes notify deployment progress, service actions notify task placement and start failures, and task state changes notify service tasks that stopped unexpectedly.
+  EOT
+
+  type    = list(string)
+  default = ["ECS Deployment State Change"]
+
+  validation {
+    condition = length(var.event_families) > 0 && alltrue([
+      for family in var.event_families :
+      contains(["ECS Deployment State Change", "ECS Service Action", "ECS Task State Change"], family)
+    ])
+    error_message = "event_families must list ECS Deployment State Change, ECS Service Action or ECS Task State Change."
+  }
+}
+
+variable "digest_window_seconds" {
+  description = <<EOT
+  Buffer notifications and post one summary per channel for each window of this many seconds instead of one message per event.
+
+  Leave this at 0 to post every notification as it happens. The window must be a whole number of minutes, as summaries are flushed by a schedule.
+  EOT
+
+  type    = number
+  default = 0
+
+  validation {
+    condition     = var.digest_window_seconds == 0 || (var.digest_window_seconds >= 60 && var.digest_window_seconds % 60 == 0)
+    error_message = "digest_window_seconds must be 0 or a whole number of minutes."
+  }
+}
+
+variable "digest_store" {
+  description = "Store buffering digest notifications between invocations, for example dynamodb://table-name. Required with digest_window_seconds, as it must be shared by all instances of the function. The function is given access to the DynamoDB table named here."
+  type        = string
+  default     = ""
+
+  validation {
+    condition     = var.digest_store == "" || can(regex("^dynamodb://.+$", var.digest_store))
+    error_message = "digest_store must be empty or dynamodb://table-name."
+  }
+
+  validation {
+    condition     = var.digest_window_seconds == 0 || var.digest_store != ""
+    error_message = "digest_store must be set to a shared dynamodb://table-name when digest_window_seconds is set."
+  }
+}
+
+variable "enrich_services" {
+  description = "Add each service's task definition, image tags and task counts to notifications, looked up with DescribeServices."
+  type        = bool
+  default     = false
+}
+
+variable "channel_tag" {
+  description = "Name of an ECS service tag whose value overrides the Slack channel for that service, for example slack-channel."
+  type        = string
+  default     = ""
+}
+
+variable "warm_up_schedule_expression" {
+  description = "EventBridge schedule expression, such as rate(5 minutes), for warm-up events that keep the function initialised. Disabled when empty."
+  type        = string
+  default     = ""
+}
@@ -0,0 +1,48 @@
+import statistics
+import time
+
+import botocore.stub
+import ecs_service_deployment_notifications.clients as clients
+import ecs_service_deployment_notifications.slack as slack
+import pytest
+
+ITERATIONS = 20
+LAMBDA_ARN = "arn:aws:lambda:eu-west-2:123456789012:function:example-function:1"
+
+
+@pytest.fixture(autouse=True)
+def region(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "eu-west-2")
+
+
+def _stubbed_invoke() -> None:
+    stubber = botocore.stub.Stubber(slack.get_lambda_client())
+    stubber.add_response(method="invoke", service_response={"StatusCode": 202})
+
+    with stubber:
+        slack.invoke_lambda(LAMBDA_ARN, {"text": "benchmark"})
+
+
+def _cold_call() -> float:
+    clients.reset()
+    start = time.perf_counter()
+    _stubbed_invoke()
+    return time.perf_counter() - start
+
+
+def _warm_call() -> float:
+    start = time.perf_counter()
+    _stubbed_invoke()
+    return time.perf_counter() - start
+
+
+def test_warm_calls_are_cheaper_than_cold_calls():
+    cold = [_cold_call() for _ in range(ITERATIONS)]
+    slack.get_lambda_client()
+    warm = [_warm_call() for _ in range(ITERATIONS)]
+
+    cold_median = statistics.median(cold)
+    warm_median = statistics.median(warm)
+    print(f"lambda invoke cold={cold_median * 1000:.3f}ms warm={warm_median * 1000:.3f}ms")
+
+    assert warm_median < cold_median
@@ -0,0 +1,63 @@
+import os
+import time
+import unittest.mock
+
+import ecs_service_deployment_notifications.handler as handler_module
+import fixtures.sample_events as sample_events
+import pytest
+from ecs_service_deployment_notifications.handler import handler
+
+LATENCY = 0.02
+SERVICES = 16
+
+
+def _event(services: int) -> dict:
+    return sample_events.event_completed | {
+        "resources": [
+            f"arn:aws:ecs:{sample_events.region}:{sample_events.account}:service/"
+            f"{sample_events.cluster_name}/service-{index}"
+            for index in range(services)
+        ]
+    }
+
+
+def _slow_invoke(**kwargs) -> dict:
+    time.sleep(LATENCY)
+    return {"StatusCode": 202}
+
+
+@pytest.fixture
+def slow_lambda_client():
+    client = unittest.mock.MagicMock()
+    client.invoke.side_effect = _slow_invoke
+    with unittest.mock.patch("ecs_service_deployment_notifications.slack.get_lambda_client", return_value=client):
+        yield client
+
+
+def _run(max_concurrency: int) -> float:
+    with unittest.mock.patch.dict(
+        os.environ,
+        {
+            "CLUSTER_NAME": sample_events.cluster_name,
+            "SLACK_CHANNEL": "event-integ-recycle",
+            "SLACK_NOTIFICATIONS_LAMBDA_ARN": "test-arn",
+            "NOTIFICATION_MAX_CONCURRENCY": str(max_concurrency),
+        },
+        clear=True,
+    ):
+        handler_module.init()
+        start = time.perf_counter()
+        handler(_event(SERVICES), {})
+        return time.perf_counter() - start
+
+
+def test_wall_clock_scales_with_concurrency(slow_lambda_client: unittest.mock.MagicMock):
+    timings = {max_concurrency: _run(max_concurrency) for max_concurrency in (1, 4, 16)}
+
+    for max_concurrency, elapsed in timings.items():
+        print(f"{SERVICES} services at concurrency {max_concurrency}: {elapsed * 1000:.1f}ms")
+
+    assert slow_lambda_client.invoke.call_count == SERVICES * 3
+    assert timings[1] >= SERVICES * LATENCY
+    assert timings[4] < timings[1] / 2
+    assert timings[16] < timings[4]
@@ -0,0 +1,100 @@
+import math
+import sys
+import time
+import tracemalloc
+from typing import Callable
+
+import ecs_service_deployment_notifications.ecs as ecs
+
+ARNS = [f"arn:aws:ecs:eu-west-2:123456789012:service/cluster-{index % 10}/service-{index}" for index in range(2000)]
+ROUNDS = 50
+
+
+class LegacyServiceArn:
+    def __init__(self, service_arn: str) -> None:
+        arn_split = service_arn.split(":")
+        if len(arn_split) < 6:
+            raise ValueError("ARN missing section")
+        elif len(arn_split) > 6:
+            raise ValueError("ARN has too many sections")
+
+        resource_path = arn_split[5]
+        resource_split = resource_path.split("/")
+
+        if len(resource_split) < 3:
+            raise ValueError("ARN missing path section")
+        elif len(resource_split) > 3:
+            raise ValueError("ARN has too many path sections")
+
+        if resource_split[0] != "service":
+            raise ValueError("ARN does not have service path")
+
+        self.arn = service_arn
+        self.cluster_name = resource_split[1]
+        self.service_name = resource_split[2]
+
+
+def _throughput(parsers: dict[str, Callable[[str], object]]) -> dict[str, float]:
+    # interleave the parsers and keep each one's best round, so a noisy machine slows them all alike
+    best = dict.fromkeys(parsers, math.inf)
+    for _ in range(ROUNDS):
+        for name, parse in parsers.items():
+            start = time.perf_counter()
+            for service_arn in ARNS:
+                parse(service_arn)
+            best[name] = min(best[name], time.perf_counter() - start)
+    return {name: len(ARNS) / elapsed for name, elapsed in best.items()}
+
+
+def _bytes_per_object(parse) -> float:
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        objects = [parse(service_arn) for service_arn in ARNS]
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del objects
+    return allocated / len(ARNS)
+
+
+def test_parse_throughput():
+    results = _throughput(
+        {
+            "legacy": LegacyServiceArn,
+            "uncached": ecs.ServiceArn,
+            "cached": ecs.parse_service_arn,
+        }
+    )
+
+    for name, throughput in results.items():
+        print(f"ServiceArn {name}: {throughput:,.0f} parses/s")
+
+    # every ARN is parsed uncached on a cold start, so that must not be slower than before
+    assert results["uncached"] >= results["legacy"]
+    assert results["cached"] > results["legacy"]
+
+
+def _instance_size(service_arn: object) -> int:
+    return sys.getsizeof(service_arn) + (sys.getsizeof(vars(service_arn)) if hasattr(service_arn, "__dict__") else 0)
+
+
+def test_memory_per_object():
+    instance_sizes = {
+        "legacy": _instance_size(LegacyServiceArn(ARNS[0])),
+        "slots": _instance_size(ecs.ServiceArn(ARNS[0])),
+    }
+    allocated = {
+        "legacy": _bytes_per_object(LegacyServiceArn),
+        "slots": _bytes_per_object(ecs.ServiceArn),
+    }
+
+    for name in instance_sizes:
+        print(
+            f"ServiceArn {name}: {instance_sizes[name]} bytes/instance, "
+            f"{allocated[name]:.0f} bytes/object allocated including component strings"
+        )
+
+    assert instance_sizes["slots"] < instance_sizes["legacy"]
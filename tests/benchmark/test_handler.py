@@ -0,0 +1,129 @@
+import json
+import os
+import pathlib
+import statistics
+import subprocess
+import time
+import tracemalloc
+import unittest.mock
+
+import ecs_service_deployment_notifications.handler as handler_module
+import fixtures.sample_events as sample_events
+import pytest
+from ecs_service_deployment_notifications.handler import handler
+
+EVENTS = 2000
+RESULTS_PATH = pathlib.Path(os.environ.get("BENCHMARK_RESULTS", ".benchmarks/handler.json"))
+BASELINE_PATH = os.environ.get("BENCHMARK_BASELINE")
+
+ROUTED_CLUSTERS = [f"cluster-{index}" for index in range(4)]
+ROUTING_TABLE = [{"cluster": cluster, "channel": f"{cluster}-deployments"} for cluster in ROUTED_CLUSTERS]
+
+SCENARIOS = {
+    "single-resource": ([sample_events.cluster_name], [1]),
+    "many-resources": ([sample_events.cluster_name], [10, 25, 50]),
+    "cluster-mix": (ROUTED_CLUSTERS + ["unrouted-0", "unrouted-1"], [1, 5, 10]),
+}
+
+
+class StubLambdaClient:
+    def __init__(self) -> None:
+        self.invocations = 0
+
+    def invoke(self, **kwargs) -> dict:
+        self.invocations += 1
+        return {"StatusCode": 202}
+
+
+def _percentile(values: list[float], q: int) -> float:
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+def _replay(events: list[dict]) -> dict:
+    latencies = []
+    start = time.perf_counter()
+    for event in events:
+        event_start = time.perf_counter()
+        handler(event, {})
+        latencies.append(time.perf_counter() - event_start)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "events_per_second": len(events) / elapsed,
+        "p50_millis": _percentile(latencies, 50) * 1000,
+        "p99_millis": _percentile(latencies, 99) * 1000,
+    }
+
+
+def _peak_memory(events: list[dict]) -> dict:
+    peaks = []
+    tracemalloc.start()
+    try:
+        for event in events:
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            handler(event, {})
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    finally:
+        tracemalloc.stop()
+
+    return {"peak_bytes_per_event_mean": statistics.fmean(peaks), "peak_bytes_per_event_max": max(peaks)}
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@pytest.fixture
+def stub_lambda_client():
+    client = StubLambdaClient()
+    with unittest.mock.patch("ecs_service_deployment_notifications.slack.get_lambda_client", return_value=client):
+        yield client
+
+
+@unittest.mock.patch.dict(
+    os.environ,
+    {
+        "ROUTING_TABLE": json.dumps(
+            ROUTING_TABLE + [{"cluster": sample_events.cluster_name, "channel": "deployments"}]
+        ),
+        "SLACK_NOTIFICATIONS_LAMBDA_ARN": "test-arn",
+        "LOG_LEVEL": "WARNING",
+    },
+    clear=True,
+)
+def test_handler_throughput(stub_lambda_client: StubLambdaClient):
+    handler_module.init()
+
+    results = {}
+    for name, (clusters, resource_counts) in SCENARIOS.items():
+        events = sample_events.synthetic_events(EVENTS, clusters, resource_counts)
+        results[name] = (
+            {"events": len(events), "resources": sum(len(event["resources"]) for event in events)}
+            | _replay(events)
+            | _peak_memory(events[: EVENTS // 10])
+        )
+
+    for name, result in results.items():
+        print(
+            f"Handler {name}: {result['events_per_second']:,.0f} events/s, "
+            f"p50 {result['p50_millis']:.3f}ms, p99 {result['p99_millis']:.3f}ms, "
+            f"peak {result['peak_bytes_per_event_mean']:,.0f} bytes/event"
+        )
+
+    if BASELINE_PATH:
+        baseline = json.loads(pathlib.Path(BASELINE_PATH).read_text())
+        for name, result in results.items():
+            if name in baseline["results"]:
+                change = result["events_per_second"] / baseline["results"][name]["events_per_second"] - 1
+                print(f"Handler {name}: {change:+.1%} events/s against {baseline['commit']}")
+
+    RESULTS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    RESULTS_PATH.write_text(json.dumps({"commit": _commit(), "time": time.time(), "results": results}, indent=2))
+    print(f"Results written to {RESULTS_PATH}")
+
+    assert stub_lambda_client.invocations > 0
+    assert all(result["events_per_second"] > 0 for result in results.values())
@@ -0,0 +1,68 @@
+import collections
+
+import ecs_service_deployment_notifications.messages as messages
+import ecs_service_deployment_notifications.slack as slack
+import ecs_service_deployment_notifications.store as store
+
+DEPLOYMENTS = 1000
+# the events ECS sends for a deployment that succeeds
+TRANSITIONS = [
+    ("ECS service deployment in progress", None),
+    ("ECS service deployment completed", "good"),
+]
+
+
+class CountingSink(slack.SlackSink):
+    def __init__(self) -> None:
+        self.calls: collections.Counter[str] = collections.Counter()
+
+    def send(self, payload: bytes, deadline: float | None = None) -> None:
+        self.calls["chat.postMessage"] += 1
+
+    def call(self, method: str, message: dict, deadline: float | None = None) -> dict:
+        self.calls[method if "thread_ts" not in message else "reply"] += 1
+        return {"channel": "C123", "ts": f"{self.calls.total()}.000000"}
+
+
+def _api_calls(mode: str) -> collections.Counter[str]:
+    sink = CountingSink()
+    slack.configure_sink(sink)
+    slack.configure_messages(messages.MessageStore(store.InMemoryStore(), ttl=3600, cache_size=DEPLOYMENTS), mode)
+
+    for description, color in TRANSITIONS:
+        for deployment in range(DEPLOYMENTS):
+            slack.send_deployment_notification(
+                lambda_arn="",
+                description=description,
+                channel="deployments",
+                cluster_name="cluster-name",
+                service_name=f"service-{deployment}",
+                reason="No reason",
+                deployment_id=f"ecs-svc/{deployment}",
+                color=color,
+            )
+    return sink.calls
+
+
+def test_slack_messages_and_writes_per_deployment():
+    results = {mode: _api_calls(mode) for mode in messages.MODES}
+    # replies and updates do not add messages to the channel itself
+    channel_messages = {mode: calls["chat.postMessage"] for mode, calls in results.items()}
+    api_writes = {mode: calls.total() for mode, calls in results.items()}
+
+    for mode, calls in results.items():
+        print(
+            f"Slack {mode}: {channel_messages[mode]} channel messages, {api_writes[mode]} API writes "
+            f"{dict(calls)} for {DEPLOYMENTS} deployments"
+        )
+
+    assert results[messages.POST] == {"chat.postMessage": DEPLOYMENTS * len(TRANSITIONS)}
+    assert results[messages.UPDATE] == {"chat.postMessage": DEPLOYMENTS, "chat.update": DEPLOYMENTS}
+    assert results[messages.THREAD] == {"chat.postMessage": DEPLOYMENTS, "reply": DEPLOYMENTS}
+    assert channel_messages == {
+        messages.POST: DEPLOYMENTS * len(TRANSITIONS),
+        messages.UPDATE: DEPLOYMENTS,
+        messages.THREAD: DEPLOYMENTS,
+    }
+    # every transition is still one write, so the modes only change how the channel reads
+    assert api_writes == dict.fromkeys(messages.MODES, DEPLOYMENTS * len(TRANSITIONS))
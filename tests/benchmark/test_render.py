@@ -0,0 +1,44 @@
+import json
+import time
+
+import ecs_service_deployment_notifications.render as render
+
+REPEATS = 20000
+
+
+def _legacy(description: str, channel: str, cluster_name: str, service_name: str, reason: str, color: str) -> bytes:
+    fields = [
+        {"short": True, "title": "Service Name", "value": service_name},
+        {"short": True, "title": "Cluster Name", "value": cluster_name},
+        {"short": False, "title": "Reason", "value": reason},
+    ]
+    return json.dumps(render.build_payload(description, channel, fields, color)).encode()
+
+
+def _throughput(build) -> float:
+    start = time.perf_counter()
+    for index in range(REPEATS):
+        build(
+            "ECS service deployment completed",
+            "event-integ-recycle",
+            "cluster-name",
+            f"service-{index}",
+            "ECS deployment ecs-svc/1234567890 completed.",
+            "good",
+        )
+    return REPEATS / (time.perf_counter() - start)
+
+
+def test_render_throughput():
+    args = ("ECS service deployment completed", "event-integ-recycle", "cluster", "service", "reason", "good")
+    assert render.render_notification(*args) == _legacy(*args)
+
+    results = {
+        "json.dumps": _throughput(_legacy),
+        "template": _throughput(render.render_notification),
+    }
+
+    for name, throughput in results.items():
+        print(f"Payload {name}: {throughput:,.0f} payloads/s")
+
+    assert results["template"] > results["json.dumps"]
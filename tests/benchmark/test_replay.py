@@ -0,0 +1,60 @@
+import gzip
+import json
+import os
+import pathlib
+import time
+import tracemalloc
+
+import ecs_service_deployment_notifications.handler as handler
+import ecs_service_deployment_notifications.metrics as metrics
+import ecs_service_deployment_notifications.replay as replay
+import ecs_service_deployment_notifications.slack as slack
+import fixtures.sample_events as sample_events
+import pytest
+
+
+def _archive(path: pathlib.Path, count: int) -> pathlib.Path:
+    with gzip.open(path, "wt", encoding="utf-8") as file:
+        for event in sample_events.synthetic_events(count, [sample_events.cluster_name], [1, 5]):
+            file.write(f"{json.dumps(event)}\n")
+    return path
+
+
+def _replay(archive: pathlib.Path) -> tuple[float, int]:
+    runner = replay.Replay(replay.Checkpoint(archive.with_suffix(".checkpoint")), concurrency=4, checkpoint_every=1000)
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        runner.run([str(archive)])
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+@pytest.fixture
+def dry_run():
+    handler.init(
+        {
+            "CLUSTER_NAME": sample_events.cluster_name,
+            "SLACK_CHANNEL": "deployments",
+            "SLACK_NOTIFICATIONS_LAMBDA_ARN": "test-arn",
+            "LOG_LEVEL": "WARNING",
+        }
+    )
+    with open(os.devnull, "w") as devnull:
+        slack.configure_transport(replay.DryRunTransport(devnull))
+        yield
+
+
+# events go through the whole pipeline, so anything it keeps per event, such as metrics, shows up in peak memory
+@pytest.mark.usefixtures("dry_run")
+def test_replay_memory_does_not_grow_with_archive_size(tmp_path: pathlib.Path):
+    results = {count: _replay(_archive(tmp_path / f"events-{count}.json.gz", count)) for count in (2500, 10000)}
+
+    for count, (elapsed, peak) in results.items():
+        print(f"Replay {count} events: {count / elapsed:,.0f} events/s, peak {peak / 1024:,.0f} KiB")
+
+    assert results[10000][1] < results[2500][1] * 2
+    assert not metrics.flush()
@@ -0,0 +1,56 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RUNS = 5
+
+COLD_START = """
+import json
+import time
+
+start = time.perf_counter()
+import ecs_service_deployment_notifications.slack as slack
+imported = time.perf_counter()
+{create}
+created = time.perf_counter()
+print(json.dumps({{"import": imported - start, "create": created - imported}}))
+"""
+
+TRANSPORTS = {
+    "boto3": 'slack.get_lambda_client()',
+    "http": (
+        "import ecs_service_deployment_notifications.transport as transport\n"
+        'transport.LambdaInvokeTransport("eu-west-2", transport.Credentials("access", "secret"))'
+    ),
+}
+
+
+def _cold_start(create: str) -> dict[str, float]:
+    result = subprocess.run(
+        [sys.executable, "-c", COLD_START.format(create=create)],
+        capture_output=True,
+        check=True,
+        env=os.environ | {"AWS_DEFAULT_REGION": "eu-west-2", "PYTHONPATH": os.pathsep.join(sys.path)},
+        text=True,
+    )
+    return json.loads(result.stdout)
+
+
+def test_http_transport_cold_start_is_cheaper_than_boto3():
+    results = {}
+    for name, create in TRANSPORTS.items():
+        samples = [_cold_start(create) for _ in range(RUNS)]
+        results[name] = {
+            "import": statistics.median(sample["import"] for sample in samples),
+            "create": statistics.median(sample["create"] for sample in samples),
+        }
+
+    for name, result in results.items():
+        print(
+            f"{name} transport cold start: import slack {result['import'] * 1000:.1f}ms, "
+            f"create transport {result['create'] * 1000:.1f}ms"
+        )
+
+    assert results["http"]["create"] < results["boto3"]["create"]
@@ -0,0 +1,34 @@
+import ecs_service_deployment_notifications.clients as clients
+import ecs_service_deployment_notifications.ecs as ecs
+import ecs_service_deployment_notifications.handler as handler
+import ecs_service_deployment_notifications.metrics as metrics
+import ecs_service_deployment_notifications.slack as slack
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def reset_clients():
+    clients.reset()
+    yield
+    clients.reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_service_arns():
+    # tests patch ServiceArn, so parsed ARNs must not carry over between them
+    ecs.parse_service_arn.cache_clear()
+    yield
+    ecs.parse_service_arn.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_runtime():
+    handler.reset()
+    metrics.flush()
+    yield
+    handler.reset()
+    metrics.flush()
+    slack.configure_transport(None)
+    slack.configure_sink(None)
+    slack.configure_resilience(None, None)
+    slack.configure_messages(None)
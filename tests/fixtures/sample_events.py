@@ -1,3 +1,6 @@
+import json
+import random
+
 account = "123456789012"
 region = "eu-west-2"
 cluster_name = "cluster-name"
@@ -96,3 +99,82 @@ slack_payload_failed = {
         ],
     },
 }
+
+event_task_placement_failure = _event_base | {
+    "detail-type": "ECS Service Action",
+    "detail": {
+        "eventType": "ERROR",
+        "eventName": "SERVICE_TASK_PLACEMENT_FAILURE",
+        "clusterArn": f"arn:aws:ecs:{region}:{account}:cluster/{cluster_name}",
+        "capacityProviderArns": [],
+        "reason": "RESOURCE:MEMORY",
+        "createdAt": "2020-05-23T11:11:11Z",
+    },
+}
+
+event_task_stopped = _event_base | {
+    "detail-type": "ECS Task State Change",
+    "resources": [f"arn:aws:ecs:{region}:{account}:task/{cluster_name}/0123456789abcdef0123456789abcdef"],
+    "detail": {
+        "clusterArn": f"arn:aws:ecs:{region}:{account}:cluster/{cluster_name}",
+        "taskArn": f"arn:aws:ecs:{region}:{account}:task/{cluster_name}/0123456789abcdef0123456789abcdef",
+        "group": f"service:{service_name}",
+        "lastStatus": "STOPPED",
+        "desiredStatus": "STOPPED",
+        "stopCode": "EssentialContainerExited",
+        "stoppedReason": "Essential container in task exited",
+    },
+}
+
+scheduled_event = {
+    "version": "0",
+    "id": "89d1a02d-5ec7-412e-82f5-13505f849b41",
+    "detail-type": "Scheduled Event",
+    "source": "aws.events",
+    "account": account,
+    "time": "2020-05-23T11:05:00Z",
+    "region": region,
+    "resources": [f"arn:aws:events:{region}:{account}:rule/ecs-service-deployment-notifications-digest"],
+    "detail": {},
+}
+
+
+def sqs_batch(*events: dict) -> dict:
+    return {
+        "Records": [
+            {
+                "messageId": f"message-{index}",
+                "receiptHandle": f"receipt-{index}",
+                "body": json.dumps(event),
+                "attributes": {},
+                "messageAttributes": {},
+                "md5OfBody": "",
+                "eventSource": "aws:sqs",
+                "eventSourceARN": f"arn:aws:sqs:{region}:{account}:ecs-service-deployment-notifications",
+                "awsRegion": region,
+            }
+            for index, event in enumerate(events)
+        ]
+    }
+
+
+def synthetic_events(count: int, clusters: list[str], resource_counts: list[int], seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    templates = [event_in_progress, event_completed, event_failed]
+
+    events = []
+    for index in range(count):
+        template = rng.choice(templates)
+        resources = [
+            f"arn:aws:ecs:{region}:{account}:service/{rng.choice(clusters)}/service-{rng.randrange(1000)}"
+            for _ in range(rng.choice(resource_counts))
+        ]
+        events.append(
+            template
+            | {
+                "id": f"{index:08x}-b258-46c0-8653-e0e3a6example",
+                "resources": resources,
+                "detail": template["detail"] | {"deploymentId": f"ecs-svc/{index}"},
+            }
+        )
+    return events
@@ -0,0 +1,44 @@
+import http.server
+import threading
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests.append((self.path, dict(self.headers), body, self.client_address))
+
+        status, response_headers, response_body = (
+            self.server.responses.pop(0) if self.server.responses else self.server.default_response
+        )
+        self.send_response(status)
+        for name, value in response_headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(response_body)))
+        self.end_headers()
+        self.wfile.write(response_body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(http.server.ThreadingHTTPServer):
+    def __init__(self, default_response: tuple[int, dict, bytes]) -> None:
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.default_response = default_response
+        self.requests: list[tuple[str, dict, bytes, tuple]] = []
+        self.responses: list[tuple[int, dict, bytes]] = []
+        self._thread = threading.Thread(target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def __enter__(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+        self.server_close()
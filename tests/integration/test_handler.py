@@ -1,8 +1,16 @@
 import json
 import os
+import time
 import unittest.mock
 
+import boto3
+import botocore.exceptions
+import botocore.stub
+import ecs_service_deployment_notifications.digest as digest
+import ecs_service_deployment_notifications.handler as handler_module
+import ecs_service_deployment_notifications.slack as slack
 import fixtures.sample_events as sample_events
+import fixtures.stub_server as stub_server
 import pytest
 from ecs_service_deployment_notifications.handler import handler
 
@@ -12,7 +20,7 @@ def mock_lambda_client():
     with unittest.mock.patch("boto3.client") as mock_client:
         mock_lambda_client = unittest.mock.MagicMock()
 
-        def mock_client_side_effect(client_service: str):
+        def mock_client_side_effect(client_service: str, **kwargs):
             assert client_service == "lambda"
             return mock_lambda_client
 
@@ -102,3 +110,839 @@ def test_handler_does_not_invoke_slack_notifications_lambda(
     handler(sample_event, context)
 
     mock_lambda_client.invoke.assert_not_called()
+
+
+@unittest.mock.patch.dict(
+    os.environ,
+    {
+        "CLUSTER_NAME": sample_events.cluster_name,
+        "SLACK_CHANNEL": "event-integ-recycle",
+        "SLACK_NOTIFICATIONS_LAMBDA_ARN": "test-arn",
+    },
+    clear=True,
+)
+def test_handler_processes_sqs_batch(mock_lambda_client: unittest.mock.MagicMock):
+    mock_lambda_client.invoke.return_value = {"StatusCode": 200}
+
+    event = sample_events.sqs_batch(
+        sample_events.event_in_progress,
+        sample_events.event_completed,
+        sample_events.event_completed,
+        sample_events.event_failed,
+    )
+
+    context = {}
+    response = handler(event, context)
+
+    assert response == {"batchItemFailures": []}
+    assert [json.loads(call.kwargs["Payload"]) for call in mock_lambda_client.invoke.call_args_list] == [
+        sample_events.slack_payload_in_progress,
+        sample_events.slack_payload_completed,
+        sample_events.slack_payload_failed,
+    ]
+
+
+@unittest.mock.patch.dict(
+    os.environ,
+    {
+        "CLUSTER_NAME": sample_events.cluster_name,
+        "SLACK_CHANNEL": "event-integ-recycle",
+        "SLACK_NOTIFICATIONS_LAMBDA_ARN": "test-arn",
+    },
+    clear=True,
+)
+def test_handler_reports_failed_sqs_records(mock_lambda_client: unittest.mock.MagicMock):
+    mock_lambda_client.invoke.side_effect = [RuntimeError("Rate exceeded"), {"StatusCode": 200}]
+
+    event = sample_events.sqs_batch(
+        sample_events.event_in_progress,
+        {"resources": []},
+        sample_events.event_completed,
+    )
+
+    context = {}
+    response = handler(event, context)
+
+    assert response == {
+        "batchItemFailures": [
+            {"itemIdentifier": "message-0"},
+            {"itemIdentifier": "message-1"},
+        ]
+    }
+    assert mock_lambda_client.invoke.call_count == 2
+
+
+@unittest.mock.patch.dict(
+    os.environ,
+    {
+        "CLUSTER_NAME": sample_events.cluster_name,
+        "SLACK_CHANNEL": "event-integ-recycle",
+        "SLACK_NOTIFICATIONS_LAMBDA_ARN": "test-arn",
+        "IDEMPOTENCY_STORE": "sqlite://",
+    },
+    clear=True,
+)
+def test_handler_does_not_notify_redelivered_events(mock_lambda_client: unittest.mock.MagicMock):
+    mock_lambda_client.invoke.return_value = {"StatusCode": 200}
+
+    context = {}
+    handler(sample_events.event_completed, context)
+    handler(sample_events.event_completed, context)
+
+    mock_lambda_client.invoke.assert_called_once()
+
+
+@unittest.mock.patch.dict(
+    os.environ,
+    {
+        "CLUSTER_NAME": sample_events.cluster_name,
+        "SLACK_CHANNEL": "event-integ-recycle",
+        "SLACK_NOTIFICATIONS_LAMBDA_ARN": "test-arn",
+        "DEPLOYMENT_STATE_STORE": "memory://",
+    },
+    clear=True,
+)
+def test_handler_does_not_notify_stale_in_progress_events(mock_lambda_client: unittest.mock.MagicMock):
+    mock_lambda_client.invoke.return_value = {"StatusCode": 200}
+
+    context = {}
+    handler(sample_events.event_completed, context)
+    handler(sample_events.event_in_progress, context)
+
+    mock_lambda_client.invoke.assert_called_once()
+    assert json.loads(mock_lambda_client.invoke.call_args.kwargs["Payload"]) == sample_events.slack_payload_completed
+
+
+@unittest.mock.patch.dict(
+    os.environ,
+    {
+        "CLUSTER_NAME": sample_events.cluster_name,
+        "SLACK_CHANNEL": "event-integ-recycle",
+        "SLACK_NOTIFICATIONS_LAMBDA_ARN": "test-arn",
+        "SUPPRESS_IN_PROGRESS_WINDOW_SECONDS": "60",
+    },
+    clear=True,
+)
+def test_handler_suppresses_in_progress_completed_in_same_batch(mock_lambda_client: unittest.mock.MagicMock):
+    mock_lambda_client.invoke.return_value = {"StatusCode": 200}
+
+    context = {}
+    response = handler(sample_events.sqs_batch(sample_events.event_in_progress, sample_events.event_completed), context)
+
+    assert response == {"batchItemFailures": []}
+    mock_lambda_client.invoke.assert_called_once()
+    assert json.loads(mock_lambda_client.invoke.call_args.kwargs["Payload"]) == sample_events.slack_payload_completed
+
+
+@unittest.mock.patch.dict(
+    os.environ,
+    {
+        "CLUSTER_NAME": sample_events.cluster_name,
+        "SLACK_CHANNEL": "event-integ-recycle",
+        "SLACK_NOTIFICATIONS_LAMBDA_ARN": "test-arn",
+        "SUPPRESS_IN_PROGRESS_WINDOW_SECONDS": "60",
+    },
+    clear=True,
+)
+def test_handler_reports_malformed_sqs_records(mock_lambda_client: unittest.mock.MagicMock):
+    mock_lambda_client.invoke.return_value = {"StatusCode": 200}
+    detail = sample_events.event_completed["detail"]
+    malformed_completions = [
+        {**sample_events.event_completed, "detail": {**detail, "updatedAt": updated_at}}
+        for updated_at in ["yesterday", 123]
+    ]
+    unhashable_deployment = {
+        **sample_events.event_completed,
+        "detail": {**detail, "deploymentId": ["ecs-svc/1"]},
+    }
+
+    context = {}
+    response = handler(
+        sample_events.sqs_batch(
+            123,
+            {"detail": "completed"},
+            *malformed_completions,
+            unhashable_deployment,
+            sample_events.event_completed,
+        ),
+        context,
+    )
+
+    assert response == {"batchItemFailures": [{"itemIdentifier": f"message-{index}"} for index in range(5)]}
+    mock_lambda_client.invoke.assert_called_once()
+
+
+class FakeContext:
+    def __init__(self, remaining_time_in_millis: int) -> None:
+        self.remaining_time_in_millis = remaining_time_in_millis
+
+    def get_remaining_time_in_millis(self) -> int:
+        return self.remaining_time_in_millis
+
+
+@unittest.mock.patch.dict(
+    os.environ,
+    {
+        "CLUSTER_NAME": sample_events.cluster_name,
+        "SLACK_CHANNEL": "event-integ-recycle",
+        "SLACK_NOTIFICATIONS_LAMBDA_ARN": "test-arn",
+        "RATE_LIMIT_PER_SECOND": "0.1",
+        "RATE_LIMIT_BURST": "2",
+        "OVERFLOW_QUEUE": "memory://",
+        "DEADLINE_SAFETY_MARGIN_MILLIS": "8000",
+    },
+    clear=True,
+)
+def test_handler_spills_notifications_over_rate_limit(mock_lambda_client: unittest.mock.MagicMock):
+    mock_lambda_client.invoke.return_value = {"StatusCode": 200}
+
+    event = sample_events.event_completed | {
+        "resources": [
+            f"arn:aws:ecs:{sample_events.region}:{sample_events.account}:service/"
+            f"{sample_events.cluster_name}/service-{index}"
+            for index in range(3)
+        ]
+    }
+
+    context = FakeContext(remaining_time_in_millis=10000)
+    handler(event, context)
+
+    assert mock_lambda_client.invoke.call_count == 2
+    spilled = list(handler_module.get_runtime().overflow_queue.messages)
+    assert len(spilled) == 1
+    assert spilled[0]["kwargs"]["service_name"] == "service-2"
+
+
+@unittest.mock.patch.dict(
+    os.environ,
+    {
+        "ROUTING_TABLE": json.dumps(
+            [
+                {"cluster": "other-cluster", "channel": "other-deployments"},
+                {"cluster": sample_events.cluster_name, "channel": "cluster-deployments"},
+                {"cluster": sample_events.cluster_name, "service_prefix": "service-", "channel": "service-deployments"},
+            ]
+        ),
+        "SLACK_NOTIFICATIONS_LAMBDA_ARN": "test-arn",
+    },
+    clear=True,
+)
+def test_handler_routes_notifications_to_channels(mock_lambda_client: unittest.mock.MagicMock):
+    mock_lambda_client.invoke.return_value = {"StatusCode": 200}
+
+    service_arn_prefix = f"arn:aws:ecs:{sample_events.region}:{sample_events.account}:service"
+    event = sample_events.event_completed | {
+        "resources": [
+            f"{service_arn_prefix}/{sample_events.cluster_name}/service-name",
+            f"{service_arn_prefix}/{sample_events.cluster_name}/frontend",
+            f"{service_arn_prefix}/other-cluster/frontend",
+            f"{service_arn_prefix}/unrouted-cluster/frontend",
+        ]
+    }
+
+    context = {}
+    handler(event, context)
+
+    assert [json.loads(call.kwargs["Payload"])["channels"] for call in mock_lambda_client.invoke.call_args_list] == [
+        ["service-deployments"],
+        ["cluster-deployments"],
+        ["other-deployments"],
+    ]
+
+
+@pytest.fixture
+def stub_lambda():
+    with stub_server.StubServer(default_response=(202, {}, b"")) as server:
+        yield server
+
+
+def test_handler_invokes_slack_notifications_lambda_over_http(stub_lambda: stub_server.StubServer):
+    with unittest.mock.patch.dict(
+        os.environ,
+        {
+            "CLUSTER_NAME": sample_events.cluster_name,
+            "SLACK_CHANNEL": "event-integ-recycle",
+            "SLACK_NOTIFICATIONS_LAMBDA_ARN": "test-arn",
+            "LAMBDA_TRANSPORT": "http",
+            "LAMBDA_ENDPOINT_URL": stub_lambda.url,
+            "AWS_REGION": sample_events.region,
+            "AWS_ACCESS_KEY_ID": "access",
+            "AWS_SECRET_ACCESS_KEY": "secret",
+        },
+        clear=True,
+    ):
+        context = {}
+        handler(sample_events.event_failed, context)
+
+    [(path, headers, body, _)] = stub_lambda.requests
+    assert path == "/2015-03-31/functions/test-arn/invocations"
+    assert headers["X-Amz-Invocation-Type"] == "Event"
+    assert json.loads(body) == sample_events.slack_payload_failed
+
+
+def test_handler_posts_to_slack_webhook(mock_lambda_client: unittest.mock.MagicMock):
+    with stub_server.StubServer(default_response=(200, {}, b"ok")) as stub_slack:
+        with unittest.mock.patch.dict(
+            os.environ,
+            {
+                "CLUSTER_NAME": sample_events.cluster_name,
+                "SLACK_CHANNEL": "event-integ-recycle",
+                "SLACK_SINK": "webhook",
+                "SLACK_WEBHOOK_URL": f"{stub_slack.url}/services/T000/B000/XXXX",
+            },
+            clear=True,
+        ):
+            stub_slack.responses = [(429, {"Retry-After": "0"}, b"")]
+            context = {}
+            handler(sample_events.event_failed, context)
+
+    mock_lambda_client.invoke.assert_not_called()
+    assert len(stub_slack.requests) == 2
+    [(path, _, body, _)] = stub_slack.requests[1:]
+    assert path == "/services/T000/B000/XXXX"
+    assert json.loads(body) == {
+        "channel": "event-integ-recycle",
+        "username": sample_events.slack_payload_failed["username"],
+        "text": sample_events.slack_payload_failed["text"],
+        "attachments": [sample_events.slack_payload_failed["message_content"]],
+    }
+
+
+@unittest.mock.patch.dict(
+    os.environ,
+    {
+        "CLUSTER_NAME": sample_events.cluster_name,
+        "SLACK_CHANNEL": "event-integ-recycle",
+        "SLACK_NOTIFICATIONS_LAMBDA_ARN": "test-arn",
+        "EMIT_METRICS": "true",
+        "METRICS_NAMESPACE": "Test",
+    },
+    clear=True,
+)
+def test_handler_emits_embedded_metric_format_records(
+    mock_lambda_client: unittest.mock.MagicMock,
+    capsys: pytest.CaptureFixture,
+):
+    mock_lambda_client.invoke.return_value = {"StatusCode": 200}
+
+    context = {}
+    handler(sample_events.event_completed, context)
+    handler(sample_events.event_completed, context)
+
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    for record in records:
+        [directive] = record["_aws"]["CloudWatchMetrics"]
+        assert directive["Namespace"] == "Test"
+        for metric in directive["Metrics"]:
+            assert metric["Name"] in record
+        for dimension in directive["Dimensions"][0]:
+            assert dimension in record
+
+    first, second = ([record for record in records if "HandlerDuration" in record][index] for index in (0, 1))
+    assert first["ColdStart"] == 1
+    assert "ColdStart" not in second
+    for stage in ["ValidateDuration", "ParseDuration", "FilterDuration", "RenderDuration", "InvokeDuration"]:
+        assert len(first[stage]) == 1
+    assert len(first["InvokeLatency"]) == 1
+    assert first["NotificationsSent"] == 1
+
+    assert [record["Events"] for record in records if record.get("EventName") == "SERVICE_DEPLOYMENT_COMPLETED"] == [
+        1,
+        1,
+    ]
+    cluster_records = [record for record in records if record.get("ClusterName") == sample_events.cluster_name]
+    assert [record["ServiceEvents"] for record in cluster_records] == [1, 1]
+
+
+@unittest.mock.patch.dict(
+    os.environ,
+    {
+        "CLUSTER_NAME": sample_events.cluster_name,
+        "SLACK_CHANNEL": "event-integ-recycle",
+        "SLACK_NOTIFICATIONS_LAMBDA_ARN": "test-arn",
+        "DEPLOYMENT_TIMING_STORE": "memory://",
+        "DEPLOYMENT_DURATION_IN_MESSAGE": "true",
+        "EMIT_METRICS": "true",
+    },
+    clear=True,
+)
+def test_handler_reports_deployment_duration(
+    mock_lambda_client: unittest.mock.MagicMock,
+    capsys: pytest.CaptureFixture,
+):
+    mock_lambda_client.invoke.return_value = {"StatusCode": 200}
+    completed = sample_events.event_completed | {
+        "detail": sample_events.event_completed["detail"] | {"updatedAt": "2020-05-23T11:15:23Z"}
+    }
+
+    context = {}
+    handler(sample_events.event_in_progress, context)
+    handler(completed, context)
+
+    payload = json.loads(mock_lambda_client.invoke.call_args.kwargs["Payload"])
+    assert payload["message_content"]["fields"][2]["value"] == "ECS deployment deploymentId completed. (took 4m12s)"
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [record["DeploymentDuration"] for record in records if "DeploymentDuration" in record] == [[252000.0]]
+    [record] = [record for record in records if "DeploymentDuration" in record]
+    assert (record["ClusterName"], record["ServiceName"]) == (sample_events.cluster_name, sample_events.service_name)
+
+
+def _throttled() -> botocore.exceptions.ClientError:
+    return botocore.exceptions.ClientError(
+        {"Error": {"Code": "TooManyRequestsException", "Message": "Rate exceeded"}}, "Invoke"
+    )
+
+
+@unittest.mock.patch.dict(
+    os.environ,
+    {
+        "CLUSTER_NAME": sample_events.cluster_name,
+        "SLACK_CHANNEL": "event-integ-recycle",
+        "SLACK_NOTIFICATIONS_LAMBDA_ARN": "test-arn",
+        "RETRY_MAX_ATTEMPTS": "3",
+        "RETRY_BASE_DELAY_MILLIS": "0",
+    },
+    clear=True,
+)
+def test_handler_retries_throttled_invokes(mock_lambda_client: unittest.mock.MagicMock):
+    mock_lambda_client.invoke.side_effect = [_throttled(), _throttled(), {"StatusCode": 202}]
+
+    context = {}
+    handler(sample_events.event_completed, context)
+
+    assert mock_lambda_client.invoke.call_count == 3
+
+
+@unittest.mock.patch.dict(
+    os.environ,
+    {
+        "CLUSTER_NAME": sample_events.cluster_name,
+        "SLACK_CHANNEL": "event-integ-recycle",
+        "SLACK_NOTIFICATIONS_LAMBDA_ARN": "test-arn",
+        "CIRCUIT_BREAKER_FAILURE_THRESHOLD": "2",
+    },
+    clear=True,
+)
+def test_handler_fails_fast_while_circuit_breaker_is_open(mock_lambda_client: unittest.mock.MagicMock):
+    mock_lambda_client.invoke.side_effect = _throttled()
+
+    context = {}
+    for _ in range(3):
+        with pytest.raises(ExceptionGroup):
+            handler(sample_events.event_completed, context)
+
+    assert mock_lambda_client.invoke.call_count == 2
+    assert handler_module.get_runtime().breaker.state == "open"
+
+
+@unittest.mock.patch.dict(
+    os.environ,
+    {
+        "CLUSTER_NAME": sample_events.cluster_name,
+        "SLACK_CHANNEL": "event-integ-recycle",
+        "SLACK_NOTIFICATIONS_LAMBDA_ARN": "test-arn",
+        "OVERFLOW_QUEUE": "memory://",
+        "DEADLINE_SAFETY_MARGIN_MILLIS": "1000",
+        "SEND_BUDGET_MILLIS": "500",
+        "AWS_CLIENT_CONNECT_TIMEOUT": "0.25",
+        "AWS_CLIENT_READ_TIMEOUT": "0.5",
+    },
+    clear=True,
+)
+def test_handler_spills_sends_without_time_left_and_drains_them_later(mock_lambda_client: unittest.mock.MagicMock):
+    mock_lambda_client.invoke.return_value = {"StatusCode": 202}
+
+    handler(sample_events.event_failed, FakeContext(remaining_time_in_millis=1200))
+
+    mock_lambda_client.invoke.assert_not_called()
+    assert len(handler_module.get_runtime().overflow_queue.messages) == 1
+
+    handler(sample_events.event_completed, FakeContext(remaining_time_in_millis=60000))
+
+    assert [json.loads(call.kwargs["Payload"]) for call in mock_lambda_client.invoke.call_args_list] == [
+        sample_events.slack_payload_failed,
+        sample_events.slack_payload_completed,
+    ]
+    assert not handler_module.get_runtime().overflow_queue.messages
+
+
+@unittest.mock.patch.dict(
+    os.environ,
+    {
+        "CLUSTER_NAME": sample_events.cluster_name,
+        "SLACK_CHANNEL": "event-integ-recycle",
+        "SLACK_NOTIFICATIONS_LAMBDA_ARN": "test-arn",
+    },
+    clear=True,
+)
+def test_handler_does_not_budget_sends_without_safety_margin(mock_lambda_client: unittest.mock.MagicMock):
+    handler(sample_events.event_completed, FakeContext(remaining_time_in_millis=6000))
+
+    mock_lambda_client.invoke.assert_called_once()
+
+
+@unittest.mock.patch.dict(
+    os.environ,
+    {
+        "CLUSTER_NAME": sample_events.cluster_name,
+        "SLACK_CHANNEL": "event-integ-recycle",
+        "SLACK_NOTIFICATIONS_LAMBDA_ARN": "test-arn",
+        "DEADLINE_SAFETY_MARGIN_MILLIS": "8000",
+    },
+    clear=True,
+)
+def test_handler_fails_sends_without_time_left_and_no_overflow_queue(mock_lambda_client: unittest.mock.MagicMock):
+    with pytest.raises(ExceptionGroup) as exc_info:
+        handler(sample_events.event_failed, FakeContext(remaining_time_in_millis=7500))
+
+    mock_lambda_client.invoke.assert_not_called()
+    assert str(exc_info.value) == "Failed to send 1 of 1 SERVICE_DEPLOYMENT_FAILED notifications (1 sub-exception)"
+
+
+@unittest.mock.patch.dict(
+    os.environ,
+    {
+        "CLUSTER_NAME": sample_events.cluster_name,
+        "SLACK_CHANNEL": "event-integ-recycle",
+        "SLACK_NOTIFICATIONS_LAMBDA_ARN": "test-arn",
+    },
+    clear=True,
+)
+def test_handler_sends_notifications_spilled_to_sqs(mock_lambda_client: unittest.mock.MagicMock):
+    mock_lambda_client.invoke.return_value = {"StatusCode": 202}
+    spilled = {
+        "function": "send_notification",
+        "kwargs": {
+            "lambda_arn": "test-arn",
+            "description": "ECS service deployment failed",
+            "color": "danger",
+            "channel": "event-integ-recycle",
+            "cluster_name": sample_events.cluster_name,
+            "service_name": sample_events.service_name,
+            "reason": "ECS deployment circuit breaker: task failed to start.",
+        },
+    }
+
+    context = {}
+    response = handler(sample_events.sqs_batch(spilled), context)
+
+    assert response == {"batchItemFailures": []}
+    assert json.loads(mock_lambda_client.invoke.call_args.kwargs["Payload"]) == sample_events.slack_payload_failed
+
+
+@pytest.mark.parametrize(
+    "event, expected_text, expected_reason",
+    [
+        pytest.param(
+            sample_events.event_task_placement_failure,
+            "ECS service failed to place tasks",
+            "RESOURCE:MEMORY",
+            id="service_action",
+        ),
+        pytest.param(
+            sample_events.event_task_stopped,
+            "ECS service task stopped",
+            "Essential container in task exited",
+            id="task_stopped",
+        ),
+    ],
+)
+@unittest.mock.patch.dict(
+    os.environ,
+    {
+        "CLUSTER_NAME": sample_events.cluster_name,
+        "SLACK_CHANNEL": "event-integ-recycle",
+        "SLACK_NOTIFICATIONS_LAMBDA_ARN": "test-arn",
+        "IDEMPOTENCY_STORE": "memory://",
+    },
+    clear=True,
+)
+def test_handler_notifies_other_ecs_event_families(
+    mock_lambda_client: unittest.mock.MagicMock,
+    event: dict,
+    expected_text: str,
+    expected_reason: str,
+):
+    mock_lambda_client.invoke.return_value = {"StatusCode": 202}
+
+    context = {}
+    handler(event, context)
+    handler(event, context)
+
+    mock_lambda_client.invoke.assert_called_once()
+    payload = json.loads(mock_lambda_client.invoke.call_args.kwargs["Payload"])
+    assert payload["text"] == expected_text
+    assert payload["message_content"]["fields"] == [
+        {"short": True, "title": "Service Name", "value": sample_events.service_name},
+        {"short": True, "title": "Cluster Name", "value": sample_events.cluster_name},
+        {"short": False, "title": "Reason", "value": expected_reason},
+    ]
+
+
+@unittest.mock.patch.dict(
+    os.environ,
+    {
+        "CLUSTER_NAME": sample_events.cluster_name,
+        "SLACK_CHANNEL": "event-integ-recycle",
+        "SLACK_NOTIFICATIONS_LAMBDA_ARN": "test-arn",
+        "ENRICH_SERVICES": "true",
+    },
+    clear=True,
+)
+def test_handler_enriches_sqs_batch_with_one_describe_services_call_and_skips_malformed_records():
+    mock_lambda_client = unittest.mock.MagicMock()
+    mock_lambda_client.invoke.return_value = {"StatusCode": 202}
+    ecs_client = boto3.client("ecs", region_name=sample_events.region)
+    events = sample_events.synthetic_events(4, [sample_events.cluster_name], [1])
+    service_arns = list(dict.fromkeys(event["resources"][0] for event in events))
+    task_definition_arn = f"arn:aws:ecs:{sample_events.region}:{sample_events.account}:task-definition/service:7"
+
+    stubber = botocore.stub.Stubber(ecs_client)
+    stubber.add_response(
+        method="describe_services",
+        service_response={
+            "services": [
+                {"serviceArn": arn, "taskDefinition": task_definition_arn, "desiredCount": 2, "runningCount": 2}
+                for arn in service_arns
+            ]
+        },
+        expected_params={"cluster": sample_events.cluster_name, "services": service_arns},
+    )
+    stubber.add_response(
+        method="describe_task_definition",
+        service_response={"taskDefinition": {"containerDefinitions": [{"name": "app", "image": "service:0.7.0"}]}},
+    )
+
+    clients = {"ecs": ecs_client, "lambda": mock_lambda_client}
+    with stubber, unittest.mock.patch("boto3.client", side_effect=lambda service, **kwargs: clients[service]):
+        response = handler(sample_events.sqs_batch(*events, 123, {"detail": "completed", "resources": []}), {})
+
+    stubber.assert_no_pending_responses()
+    assert response == {"batchItemFailures": [{"itemIdentifier": "message-4"}, {"itemIdentifier": "message-5"}]}
+    assert mock_lambda_client.invoke.call_count == len(events)
+    for call in mock_lambda_client.invoke.call_args_list:
+        fields = json.loads(call.kwargs["Payload"])["message_content"]["fields"]
+        assert fields[2:5] == [
+            {"short": True, "title": "Task Definition", "value": "service:7"},
+            {"short": True, "title": "Image", "value": "0.7.0"},
+            {"short": True, "title": "Tasks", "value": "2 running of 2 desired"},
+        ]
+
+
+@unittest.mock.patch.dict(
+    os.environ,
+    {
+        "CLUSTER_NAME": sample_events.cluster_name,
+        "SLACK_CHANNEL": "event-integ-recycle",
+        "SLACK_NOTIFICATIONS_LAMBDA_ARN": "test-arn",
+        "CHANNEL_TAG": "slack-channel",
+    },
+    clear=True,
+)
+def test_handler_routes_to_channels_from_service_tags():
+    mock_lambda_client = unittest.mock.MagicMock()
+    mock_lambda_client.invoke.return_value = {"StatusCode": 202}
+    ecs_client = boto3.client("ecs", region_name=sample_events.region)
+    events = sample_events.synthetic_events(4, [sample_events.cluster_name, "other-cluster"], [1], seed=3)
+    watched = [event for event in events if f"/{sample_events.cluster_name}/" in event["resources"][0]]
+    tagged_arn = watched[0]["resources"][0]
+    watched_arns = list(dict.fromkeys(event["resources"][0] for event in watched))
+    tags = [{"key": "slack-channel", "value": "team-channel"}]
+
+    stubber = botocore.stub.Stubber(ecs_client)
+    stubber.add_response(
+        method="describe_services",
+        service_response={
+            "services": [
+                {"serviceArn": arn, "tags": tags if arn == tagged_arn else []}
+                for arn in watched_arns
+            ]
+        },
+        expected_params={"cluster": sample_events.cluster_name, "services": watched_arns, "include": ["TAGS"]},
+    )
+
+    clients = {"ecs": ecs_client, "lambda": mock_lambda_client}
+    with stubber, unittest.mock.patch("boto3.client", side_effect=lambda service, **kwargs: clients[service]):
+        handler(sample_events.sqs_batch(*events), {})
+        handler(sample_events.sqs_batch(*watched), {})
+
+    stubber.assert_no_pending_responses()
+    sent = [json.loads(call.kwargs["Payload"]) for call in mock_lambda_client.invoke.call_args_list]
+    expected = [
+        ["team-channel"] if event["resources"][0] == tagged_arn else ["event-integ-recycle"] for event in watched
+    ]
+    assert [payload["channels"] for payload in sent] == expected * 2
+
+
+@unittest.mock.patch.dict(
+    os.environ,
+    {
+        "CLUSTER_NAME": sample_events.cluster_name,
+        "SLACK_CHANNEL": "event-integ-recycle",
+        "SLACK_NOTIFICATIONS_LAMBDA_ARN": "test-arn",
+        "CHANNEL_TAG": "slack-channel",
+        "ENRICH_SERVICES": "true",
+    },
+    clear=True,
+)
+def test_handler_describes_services_once_for_tags_and_details():
+    mock_lambda_client = unittest.mock.MagicMock()
+    mock_ecs_client = unittest.mock.MagicMock()
+    events = sample_events.synthetic_events(3, [sample_events.cluster_name], [1])
+    task_definition_arn = f"arn:aws:ecs:{sample_events.region}:{sample_events.account}:task-definition/service:7"
+    mock_ecs_client.describe_services.return_value = {
+        "services": [
+            {
+                "serviceArn": event["resources"][0],
+                "taskDefinition": task_definition_arn,
+                "desiredCount": 1,
+                "runningCount": 1,
+                "tags": [{"key": "slack-channel", "value": "team-channel"}],
+            }
+            for event in events
+        ]
+    }
+    mock_ecs_client.describe_task_definition.return_value = {
+        "taskDefinition": {"containerDefinitions": [{"name": "app", "image": "service:0.7.0"}]}
+    }
+
+    clients = {"ecs": mock_ecs_client, "lambda": mock_lambda_client}
+    with unittest.mock.patch("boto3.client", side_effect=lambda service, **kwargs: clients[service]):
+        response = handler(sample_events.sqs_batch(*events), {})
+
+    assert response == {"batchItemFailures": []}
+    mock_ecs_client.describe_services.assert_called_once()
+    assert mock_ecs_client.describe_services.call_args.kwargs["include"] == ["TAGS"]
+    sent = [json.loads(call.kwargs["Payload"]) for call in mock_lambda_client.invoke.call_args_list]
+    assert [payload["channels"] for payload in sent] == [["team-channel"]] * len(events)
+    assert all(payload["message_content"]["fields"][3]["value"] == "0.7.0" for payload in sent)
+
+
+@unittest.mock.patch.dict(
+    os.environ,
+    {
+        "CLUSTER_NAME": sample_events.cluster_name,
+        "SLACK_CHANNEL": "event-integ-recycle",
+        "SLACK_NOTIFICATIONS_LAMBDA_ARN": "test-arn",
+        "CHANNEL_TAG": "slack-channel",
+    },
+    clear=True,
+)
+def test_handler_does_not_repeat_failed_tag_lookups_within_batch():
+    mock_lambda_client = unittest.mock.MagicMock()
+    mock_ecs_client = unittest.mock.MagicMock()
+    mock_ecs_client.describe_services.side_effect = RuntimeError("Rate exceeded")
+    events = sample_events.synthetic_events(2, [sample_events.cluster_name], [1])
+
+    clients = {"ecs": mock_ecs_client, "lambda": mock_lambda_client}
+    with unittest.mock.patch("boto3.client", side_effect=lambda service, **kwargs: clients[service]):
+        response = handler(sample_events.sqs_batch(*events), {})
+
+    assert response == {"batchItemFailures": []}
+    mock_ecs_client.describe_services.assert_called_once()
+    sent = [json.loads(call.kwargs["Payload"]) for call in mock_lambda_client.invoke.call_args_list]
+    assert [payload["channels"] for payload in sent] == [["event-integ-recycle"]] * len(events)
+
+
+def test_handler_warm_up_primes_connection_for_first_notification():
+    with stub_server.StubServer(default_response=(200, {}, b"ok")) as stub_slack:
+        with unittest.mock.patch.dict(
+            os.environ,
+            {
+                "CLUSTER_NAME": sample_events.cluster_name,
+                "SLACK_CHANNEL": "event-integ-recycle",
+                "SLACK_SINK": "webhook",
+                "SLACK_WEBHOOK_URL": f"{stub_slack.url}/services/T000/B000/XXXX",
+            },
+            clear=True,
+        ):
+            assert handler({"warmUp": True}, {}) == {"warmUp": True, "coldStart": True}
+            assert stub_slack.requests == []
+
+            [connection] = slack._sink.pool._idle.queue
+            handler(sample_events.event_completed, {})
+
+    [(_, _, _, client_address)] = stub_slack.requests
+    assert client_address == connection.sock.getsockname()
+
+
+def test_handler_updates_one_message_per_deployment():
+    response = (200, {}, b'{"ok": true, "channel": "C123", "ts": "1700000000.000100"}')
+    with stub_server.StubServer(default_response=response) as stub_slack:
+        with unittest.mock.patch.dict(
+            os.environ,
+            {
+                "CLUSTER_NAME": sample_events.cluster_name,
+                "SLACK_CHANNEL": "event-integ-recycle",
+                "SLACK_SINK": "api",
+                "SLACK_BOT_TOKEN": "xoxb-token",
+                "SLACK_API_URL": stub_slack.url,
+                "SLACK_MESSAGE_MODE": "update",
+            },
+            clear=True,
+        ):
+            context = {}
+            handler(sample_events.event_in_progress, context)
+            handler(sample_events.event_completed, context)
+
+    assert [path for path, _, _, _ in stub_slack.requests] == ["/chat.postMessage", "/chat.update"]
+    update = json.loads(stub_slack.requests[1][2])
+    assert update["ts"] == "1700000000.000100"
+    assert update["attachments"] == [sample_events.slack_payload_completed["message_content"]]
+
+
+@unittest.mock.patch.dict(
+    os.environ,
+    {
+        "CLUSTER_NAME": sample_events.cluster_name,
+        "SLACK_CHANNEL": "event-integ-recycle",
+        "SLACK_NOTIFICATIONS_LAMBDA_ARN": "test-arn",
+        "DIGEST_WINDOW_SECONDS": "300",
+        "DIGEST_STORE": "memory://",
+    },
+    clear=True,
+)
+def test_handler_flushes_buffered_notifications_as_one_digest(mock_lambda_client: unittest.mock.MagicMock):
+    mock_lambda_client.invoke.return_value = {"StatusCode": 202}
+    context = {}
+    window_start = int(time.time()) // 300 * 300
+    digest_buffer = handler_module.get_runtime().digest_buffer
+    digest_buffer.clock = lambda: window_start + 100
+
+    for event in sample_events.synthetic_events(20, [sample_events.cluster_name], [1]):
+        handler(event, context)
+    handler(sample_events.scheduled_event, context)
+    mock_lambda_client.invoke.assert_not_called()
+
+    digest_buffer.clock = lambda: window_start + 300
+    handler(sample_events.scheduled_event, context)
+    handler(sample_events.scheduled_event, context)
+
+    mock_lambda_client.invoke.assert_called_once()
+    payload = json.loads(mock_lambda_client.invoke.call_args.kwargs["Payload"])
+    assert payload["channels"] == ["event-integ-recycle"]
+    assert payload["text"] == digest.summary(window_start, 300, [])[0]
+    assert payload["message_content"]["fields"][0]["title"] == sample_events.cluster_name
+
+
+@unittest.mock.patch.dict(
+    os.environ,
+    {
+        "CLUSTER_NAME": sample_events.cluster_name,
+        "SLACK_CHANNEL": "event-integ-recycle",
+        "SLACK_NOTIFICATIONS_LAMBDA_ARN": "test-arn",
+        "DIGEST_WINDOW_SECONDS": "300",
+        "DIGEST_STORE": "memory://",
+        "DIGEST_POST_FAILED_IMMEDIATELY": "true",
+    },
+    clear=True,
+)
+def test_handler_posts_failed_events_immediately_in_digest_mode(mock_lambda_client: unittest.mock.MagicMock):
+    mock_lambda_client.invoke.return_value = {"StatusCode": 202}
+
+    context = {}
+    handler(sample_events.event_completed, context)
+    handler(sample_events.event_failed, context)
+
+    mock_lambda_client.invoke.assert_called_once()
+    assert json.loads(mock_lambda_client.invoke.call_args.kwargs["Payload"]) == sample_events.slack_payload_failed
@@ -0,0 +1,125 @@
+import unittest.mock
+
+import ecs_service_deployment_notifications.breaker as breaker
+import ecs_service_deployment_notifications.metrics as metrics
+import pytest
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _fail(circuit_breaker: breaker.CircuitBreaker, exc: Exception = TimeoutError()) -> None:
+    with pytest.raises(type(exc)):
+        circuit_breaker.call(unittest.mock.MagicMock(side_effect=exc))
+
+
+def test_opens_after_consecutive_failures_and_fails_fast():
+    circuit_breaker = breaker.CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=FakeClock())
+    function = unittest.mock.MagicMock()
+
+    _fail(circuit_breaker)
+    assert circuit_breaker.state == breaker.CLOSED
+    _fail(circuit_breaker)
+    assert circuit_breaker.state == breaker.OPEN
+
+    with pytest.raises(breaker.CircuitOpenError):
+        circuit_breaker.call(function)
+
+    function.assert_not_called()
+    assert metrics.flush() == {
+        (("State", "open"),): {"CircuitBreakerTransitions": 1},
+        (): {"CircuitBreakerRejected": 1},
+    }
+
+
+def test_success_resets_failure_count():
+    circuit_breaker = breaker.CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=FakeClock())
+
+    _fail(circuit_breaker)
+    circuit_breaker.call(lambda: None)
+    _fail(circuit_breaker)
+
+    assert circuit_breaker.state == breaker.CLOSED
+
+
+def test_errors_unrelated_to_downstream_health_do_not_count():
+    circuit_breaker = breaker.CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=FakeClock())
+
+    _fail(circuit_breaker, ValueError())
+
+    assert circuit_breaker.state == breaker.CLOSED
+
+
+def test_errors_unrelated_to_downstream_health_do_not_reset_failure_count():
+    circuit_breaker = breaker.CircuitBreaker(failure_threshold=3, reset_timeout=30, clock=FakeClock())
+
+    _fail(circuit_breaker)
+    _fail(circuit_breaker)
+    _fail(circuit_breaker, ValueError())
+    _fail(circuit_breaker)
+
+    assert circuit_breaker.state == breaker.OPEN
+
+
+def test_errors_unrelated_to_downstream_health_keep_half_open():
+    clock = FakeClock()
+    circuit_breaker = breaker.CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+    _fail(circuit_breaker)
+
+    clock.now = 30
+    _fail(circuit_breaker, ValueError())
+
+    assert circuit_breaker.state == breaker.HALF_OPEN
+    _fail(circuit_breaker)
+    assert circuit_breaker.state == breaker.OPEN
+
+
+def test_half_open_trial_closes_on_success():
+    clock = FakeClock()
+    circuit_breaker = breaker.CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+    _fail(circuit_breaker)
+
+    clock.now = 30
+    assert circuit_breaker.state == breaker.HALF_OPEN
+    assert circuit_breaker.call(lambda: "sent") == "sent"
+
+    assert circuit_breaker.state == breaker.CLOSED
+    assert metrics.flush() == {
+        (("State", "open"),): {"CircuitBreakerTransitions": 1},
+        (("State", "half_open"),): {"CircuitBreakerTransitions": 1},
+        (("State", "closed"),): {"CircuitBreakerTransitions": 1},
+    }
+
+
+def test_half_open_trial_reopens_on_failure():
+    clock = FakeClock()
+    circuit_breaker = breaker.CircuitBreaker(failure_threshold=3, reset_timeout=30, clock=clock)
+    for _ in range(3):
+        _fail(circuit_breaker)
+
+    clock.now = 30
+    _fail(circuit_breaker)
+
+    assert circuit_breaker.state == breaker.OPEN
+    clock.now = 59
+    assert circuit_breaker.state == breaker.OPEN
+
+
+def test_half_open_lets_one_trial_through():
+    clock = FakeClock()
+    circuit_breaker = breaker.CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+    _fail(circuit_breaker)
+    clock.now = 30
+
+    def trial() -> None:
+        with pytest.raises(breaker.CircuitOpenError):
+            circuit_breaker.call(lambda: None)
+
+    circuit_breaker.call(trial)
+
+    assert circuit_breaker.state == breaker.CLOSED
@@ -0,0 +1,71 @@
+import ecs_service_deployment_notifications.cache as cache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_get_returns_stored_value():
+    ttl_cache = cache.TTLCache(maxsize=10, ttl=60)
+    ttl_cache.set("key", "value")
+
+    assert ttl_cache.get("key") == "value"
+    assert "key" in ttl_cache
+
+
+def test_get_returns_default_for_missing_key():
+    ttl_cache = cache.TTLCache(maxsize=10, ttl=60)
+
+    assert ttl_cache.get("key", "default") == "default"
+    assert "key" not in ttl_cache
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    ttl_cache = cache.TTLCache(maxsize=10, ttl=60, clock=clock)
+    ttl_cache.set("key", "value")
+    ttl_cache.set("short", "value", ttl=1)
+
+    clock.now = 30
+    assert "key" in ttl_cache
+    assert "short" not in ttl_cache
+
+    clock.now = 60
+    assert "key" not in ttl_cache
+    assert len(ttl_cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    ttl_cache = cache.TTLCache(maxsize=2, ttl=60)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+    ttl_cache.get("a")
+    ttl_cache.set("c", 3)
+
+    assert "a" in ttl_cache
+    assert "b" not in ttl_cache
+    assert "c" in ttl_cache
+    assert len(ttl_cache) == 2
+
+
+def test_none_values_are_cached():
+    ttl_cache = cache.TTLCache(maxsize=10, ttl=60)
+    ttl_cache.set("key", None)
+
+    assert "key" in ttl_cache
+
+
+def test_delete_and_clear():
+    ttl_cache = cache.TTLCache(maxsize=10, ttl=60)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+
+    ttl_cache.delete("a")
+    assert "a" not in ttl_cache
+
+    ttl_cache.clear()
+    assert len(ttl_cache) == 0
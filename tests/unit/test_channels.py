@@ -0,0 +1,126 @@
+import boto3
+import botocore.stub
+import ecs_service_deployment_notifications.channels as channels
+import ecs_service_deployment_notifications.ecs as ecs
+import ecs_service_deployment_notifications.enrichment as enrichment
+import ecs_service_deployment_notifications.metrics as metrics
+import pytest
+
+
+def _service_arn(index: int) -> ecs.ServiceArn:
+    return ecs.ServiceArn(f"arn:aws:ecs:eu-west-2:123456789012:service/cluster-name/service-{index}")
+
+
+def _service(service_arn: ecs.ServiceArn, channel: str | None = None) -> dict:
+    tags = [{"key": "team", "value": "platform"}]
+    if channel is not None:
+        tags.append({"key": "slack-channel", "value": channel})
+    return {"serviceArn": service_arn.arn, "tags": tags}
+
+
+@pytest.fixture
+def ecs_client():
+    return boto3.client("ecs", region_name="eu-west-2")
+
+
+def test_lookup_batches_services_and_caches_tags(ecs_client):
+    service_arns = [_service_arn(index) for index in range(11)]
+    stubber = botocore.stub.Stubber(ecs_client)
+    stubber.add_response(
+        method="describe_services",
+        service_response={
+            "services": [_service(service_arns[0], "team-a")] + [_service(arn) for arn in service_arns[1:10]],
+        },
+        expected_params={
+            "cluster": "cluster-name",
+            "services": [service_arn.arn for service_arn in service_arns[:10]],
+            "include": ["TAGS"],
+        },
+    )
+    stubber.add_response(
+        method="describe_services",
+        service_response={"services": [_service(service_arns[10], "team-b")]},
+        expected_params={"cluster": "cluster-name", "services": [service_arns[10].arn], "include": ["TAGS"]},
+    )
+
+    with stubber:
+        channel_tags = channels.ChannelTags("slack-channel", ttl=60, negative_ttl=60, cache_size=100, client=ecs_client)
+        first = channel_tags.lookup(service_arns)
+        second = channel_tags.lookup(service_arns)
+
+    stubber.assert_no_pending_responses()
+    assert first == second == {service_arns[0].arn: "team-a", service_arns[10].arn: "team-b"}
+    assert metrics.flush()[()]["ChannelTagLookups"] == 2
+
+
+def test_lookup_retries_untagged_services_after_negative_ttl(ecs_client):
+    stubber = botocore.stub.Stubber(ecs_client)
+    stubber.add_response(method="describe_services", service_response={"services": [_service(_service_arn(1))]})
+    stubber.add_response(
+        method="describe_services", service_response={"services": [_service(_service_arn(1), "team-a")]}
+    )
+
+    with stubber:
+        channel_tags = channels.ChannelTags("slack-channel", ttl=60, negative_ttl=0, cache_size=100, client=ecs_client)
+        assert channel_tags.lookup([_service_arn(1)]) == {}
+        assert channel_tags.lookup([_service_arn(1)]) == {_service_arn(1).arn: "team-a"}
+
+    stubber.assert_no_pending_responses()
+
+
+def test_lookup_holds_off_after_failures_until_negative_ttl(ecs_client):
+    stubber = botocore.stub.Stubber(ecs_client)
+    stubber.add_client_error(method="describe_services", service_error_code="ThrottlingException")
+
+    with stubber:
+        channel_tags = channels.ChannelTags("slack-channel", ttl=60, negative_ttl=60, cache_size=100, client=ecs_client)
+        assert channel_tags.lookup([_service_arn(1)]) == {}
+        assert channel_tags.lookup([_service_arn(1)]) == {}
+
+    stubber.assert_no_pending_responses()
+    assert metrics.flush()[()] == {"ChannelTagLookups": 1, "ChannelTagFailures": 1}
+
+
+def test_lookup_retries_failures_after_negative_ttl(ecs_client):
+    stubber = botocore.stub.Stubber(ecs_client)
+    stubber.add_client_error(method="describe_services", service_error_code="ThrottlingException")
+    stubber.add_response(
+        method="describe_services", service_response={"services": [_service(_service_arn(1), "team-a")]}
+    )
+
+    with stubber:
+        channel_tags = channels.ChannelTags("slack-channel", ttl=60, negative_ttl=0, cache_size=100, client=ecs_client)
+        assert channel_tags.lookup([_service_arn(1)]) == {}
+        assert channel_tags.lookup([_service_arn(1)]) == {_service_arn(1).arn: "team-a"}
+
+    stubber.assert_no_pending_responses()
+
+
+def test_lookup_shares_described_services_with_enricher(ecs_client):
+    service = _service(_service_arn(1), "team-a") | {
+        "taskDefinition": "arn:aws:ecs:eu-west-2:123456789012:task-definition/service:42",
+        "desiredCount": 3,
+        "runningCount": 2,
+    }
+    stubber = botocore.stub.Stubber(ecs_client)
+    stubber.add_response(method="describe_services", service_response={"services": [service]})
+    stubber.add_response(
+        method="describe_task_definition",
+        service_response={"taskDefinition": {"containerDefinitions": [{"name": "app", "image": "service:1.2.3"}]}},
+    )
+
+    with stubber:
+        enricher = enrichment.ServiceEnricher(ttl=60, cache_size=100, client=ecs_client)
+        channel_tags = channels.ChannelTags(
+            "slack-channel", ttl=60, negative_ttl=60, cache_size=100, client=ecs_client, enricher=enricher
+        )
+        channel_tags.lookup([_service_arn(1)])
+        details = enricher.describe([_service_arn(1)])
+
+    stubber.assert_no_pending_responses()
+    assert details == {
+        _service_arn(1).arn: enrichment.ServiceDetails(
+            task_definition="service:42", image="1.2.3", desired_count=3, running_count=2
+        )
+    }
+    assert "DescribeServicesCalls" not in metrics.flush()[()]
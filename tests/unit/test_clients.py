@@ -0,0 +1,66 @@
+import unittest.mock
+
+import ecs_service_deployment_notifications.clients as clients
+import pytest
+
+
+@unittest.mock.patch("boto3.client")
+def test_get_client_creates_client_once(mock_client: unittest.mock.MagicMock):
+    first = clients.get_client("lambda")
+    second = clients.get_client("lambda")
+
+    assert first is second
+    mock_client.assert_called_once()
+    assert mock_client.call_args.args == ("lambda",)
+
+
+@unittest.mock.patch("boto3.client")
+def test_get_client_creates_client_per_service(mock_client: unittest.mock.MagicMock):
+    mock_client.side_effect = lambda service_name, **kwargs: unittest.mock.MagicMock(name=service_name)
+
+    assert clients.get_client("lambda") is not clients.get_client("ecs")
+    assert mock_client.call_count == 2
+
+
+@unittest.mock.patch("boto3.client")
+def test_reset_discards_cached_clients(mock_client: unittest.mock.MagicMock):
+    clients.get_client("lambda")
+    clients.reset()
+    clients.get_client("lambda")
+
+    assert mock_client.call_count == 2
+
+
+def test_client_config_defaults():
+    config = clients.client_config()
+
+    assert config.max_pool_connections == 10
+    assert config.connect_timeout == 2
+    assert config.read_timeout == 5
+    assert config.tcp_keepalive is True
+    assert config.retries == {"mode": "standard", "max_attempts": 3}
+
+
+@unittest.mock.patch("boto3.client")
+def test_configure_applies_settings_to_new_clients(mock_client: unittest.mock.MagicMock):
+    clients.get_client("lambda")
+
+    clients.configure(
+        clients.ClientSettings(
+            max_pool_connections=50,
+            connect_timeout=0.5,
+            read_timeout=1.5,
+            tcp_keepalive=False,
+            retry_mode="adaptive",
+            max_attempts=5,
+        )
+    )
+    clients.get_client("lambda")
+
+    assert mock_client.call_count == 2
+    config = mock_client.call_args.kwargs["config"]
+    assert config.max_pool_connections == 50
+    assert config.connect_timeout == pytest.approx(0.5)
+    assert config.read_timeout == pytest.approx(1.5)
+    assert config.tcp_keepalive is False
+    assert config.retries == {"mode": "adaptive", "max_attempts": 5}
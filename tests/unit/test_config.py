@@ -0,0 +1,363 @@
+import json
+
+import pytest
+from ecs_service_deployment_notifications.config import Config, ConfigurationError
+
+lambda_arn = "arn:aws:lambda:eu-west-2:123456789012:function:example-function:1"
+
+
+def test_from_environ_with_defaults():
+    config = Config.from_environ(
+        {
+            "CLUSTER_NAME": "cluster-name",
+            "SLACK_CHANNEL": "test-channel",
+            "SLACK_NOTIFICATIONS_LAMBDA_ARN": lambda_arn,
+        }
+    )
+
+    assert config == Config(
+        slack_notifications_lambda_arn=lambda_arn,
+        routes=({"cluster": "cluster-name", "channel": "test-channel"},),
+    )
+
+
+def test_from_environ_with_routing_table():
+    routes = [{"cluster": "public", "service_prefix": "payments-", "channel": "payments"}]
+
+    config = Config.from_environ(
+        {
+            "ROUTING_TABLE": json.dumps(routes),
+            "SLACK_NOTIFICATIONS_LAMBDA_ARN": lambda_arn,
+        }
+    )
+
+    assert config.routes == tuple(routes)
+
+
+def test_from_environ_with_options():
+    config = Config.from_environ(
+        {
+            "CLUSTER_NAME": "cluster-name",
+            "SLACK_CHANNEL": "test-channel",
+            "SLACK_NOTIFICATIONS_LAMBDA_ARN": lambda_arn,
+            "LOG_LEVEL": "DEBUG",
+            "AGGREGATE_NOTIFICATIONS": "TRUE",
+            "NOTIFICATION_MAX_CONCURRENCY": "8",
+            "IDEMPOTENCY_STORE": "memory://",
+            "RATE_LIMIT_PER_SECOND": "5",
+        }
+    )
+
+    assert config.log_level == "DEBUG"
+    assert config.aggregate_notifications is True
+    assert config.notification_max_concurrency == 8
+    assert config.idempotency_store == "memory://"
+    assert config.rate_limit_per_second == 5
+    assert config.rate_limit_burst == 5
+
+
+def test_from_environ_with_http_transport():
+    config = Config.from_environ(
+        {
+            "ROUTING_TABLE": "[]",
+            "SLACK_NOTIFICATIONS_LAMBDA_ARN": lambda_arn,
+            "LAMBDA_TRANSPORT": "http",
+            "AWS_REGION": "eu-west-2",
+            "AWS_ACCESS_KEY_ID": "access",
+            "AWS_SECRET_ACCESS_KEY": "secret",
+        }
+    )
+
+    assert config.lambda_transport == "http"
+    assert config.aws_region == "eu-west-2"
+
+
+def test_from_environ_with_webhook_sink_does_not_need_lambda_arn():
+    config = Config.from_environ(
+        {
+            "ROUTING_TABLE": "[]",
+            "SLACK_SINK": "webhook",
+            "SLACK_WEBHOOK_URL": "https://hooks.slack.com/services/T000/B000/XXXX",
+        }
+    )
+
+    assert config.slack_sink == "webhook"
+    assert config.slack_notifications_lambda_arn == ""
+
+
+def test_from_environ_with_aws_client_settings():
+    config = Config.from_environ(
+        {
+            "ROUTING_TABLE": "[]",
+            "SLACK_NOTIFICATIONS_LAMBDA_ARN": lambda_arn,
+            "AWS_CLIENT_MAX_POOL_CONNECTIONS": "50",
+            "AWS_CLIENT_READ_TIMEOUT": "1.5",
+            "AWS_CLIENT_TCP_KEEPALIVE": "false",
+            "AWS_CLIENT_RETRY_MODE": "adaptive",
+        }
+    )
+
+    assert config.aws_client_max_pool_connections == 50
+    assert config.aws_client_connect_timeout_seconds == 2
+    assert config.aws_client_read_timeout_seconds == 1.5
+    assert config.aws_client_tcp_keepalive is False
+    assert config.aws_client_retry_mode == "adaptive"
+    assert config.aws_client_max_attempts == 3
+
+
+@pytest.mark.parametrize(
+    "options, expected_margin",
+    [
+        pytest.param({}, None, id="disabled_by_default"),
+        pytest.param({"DEADLINE_SAFETY_MARGIN_MILLIS": "7000"}, 7000, id="boto3_client_timeouts"),
+        pytest.param(
+            {
+                "DEADLINE_SAFETY_MARGIN_MILLIS": "3000",
+                "AWS_CLIENT_CONNECT_TIMEOUT": "1",
+                "AWS_CLIENT_READ_TIMEOUT": "2",
+            },
+            3000,
+            id="tuned_client",
+        ),
+        pytest.param(
+            {
+                "DEADLINE_SAFETY_MARGIN_MILLIS": "5000",
+                "LAMBDA_TRANSPORT": "http",
+                "AWS_REGION": "eu-west-2",
+                "AWS_ACCESS_KEY_ID": "access",
+                "AWS_SECRET_ACCESS_KEY": "secret",
+            },
+            5000,
+            id="http_transport",
+        ),
+        pytest.param(
+            {
+                "DEADLINE_SAFETY_MARGIN_MILLIS": "3000",
+                "SLACK_SINK": "webhook",
+                "SLACK_WEBHOOK_URL": "https://hooks.slack.com/x",
+                "SLACK_TIMEOUT_SECONDS": "3",
+            },
+            3000,
+            id="slack_sink",
+        ),
+    ],
+)
+def test_deadline_safety_margin(options: dict, expected_margin: int | None):
+    config = Config.from_environ({"ROUTING_TABLE": "[]", "SLACK_NOTIFICATIONS_LAMBDA_ARN": lambda_arn} | options)
+
+    assert config.deadline_safety_margin_millis == expected_margin
+
+
+def test_config_does_not_show_bot_token():
+    config = Config(slack_notifications_lambda_arn="", routes=(), slack_sink="api", slack_bot_token="xoxb-secret")
+
+    assert "xoxb-secret" not in repr(config)
+
+
+def test_from_environ_with_retry_and_circuit_breaker():
+    config = Config.from_environ(
+        {
+            "ROUTING_TABLE": "[]",
+            "SLACK_NOTIFICATIONS_LAMBDA_ARN": lambda_arn,
+            "RETRY_MAX_ATTEMPTS": "4",
+            "RETRY_BASE_DELAY_MILLIS": "50",
+            "CIRCUIT_BREAKER_FAILURE_THRESHOLD": "5",
+            "CIRCUIT_BREAKER_RESET_SECONDS": "10",
+        }
+    )
+
+    assert config.retry_max_attempts == 4
+    assert config.retry_base_delay_millis == 50
+    assert config.retry_max_delay_millis == 2000
+    assert config.circuit_breaker_failure_threshold == 5
+    assert config.circuit_breaker_reset_seconds == 10
+
+
+def test_from_environ_with_digest():
+    config = Config.from_environ(
+        {
+            "ROUTING_TABLE": "[]",
+            "SLACK_NOTIFICATIONS_LAMBDA_ARN": lambda_arn,
+            "DIGEST_WINDOW_SECONDS": "900",
+            "DIGEST_STORE": "dynamodb://digests",
+            "DIGEST_POST_FAILED_IMMEDIATELY": "true",
+        }
+    )
+
+    assert config.digest_window_seconds == 900
+    assert config.digest_store == "dynamodb://digests"
+    assert config.digest_ttl_seconds == 86400
+    assert config.digest_post_failed_immediately
+
+
+def test_from_environ_with_deployment_timing():
+    config = Config.from_environ(
+        {
+            "ROUTING_TABLE": "[]",
+            "SLACK_NOTIFICATIONS_LAMBDA_ARN": lambda_arn,
+            "DEPLOYMENT_TIMING_STORE": "dynamodb://deployments",
+            "DEPLOYMENT_DURATION_IN_MESSAGE": "true",
+        }
+    )
+
+    assert config.deployment_timing_store == "dynamodb://deployments"
+    assert config.deployment_timing_ttl_seconds == 86400
+    assert config.deployment_duration_in_message
+
+
+def test_from_environ_with_channel_tag():
+    config = Config.from_environ(
+        {
+            "ROUTING_TABLE": "[]",
+            "SLACK_NOTIFICATIONS_LAMBDA_ARN": lambda_arn,
+            "CHANNEL_TAG": "slack-channel",
+            "CHANNEL_TAG_NEGATIVE_TTL_SECONDS": "3600",
+        }
+    )
+
+    assert config.channel_tag == "slack-channel"
+    assert config.channel_tag_ttl_seconds == 300
+    assert config.channel_tag_negative_ttl_seconds == 3600
+
+
+def test_config_is_frozen():
+    config = Config(slack_notifications_lambda_arn=lambda_arn, routes=())
+
+    with pytest.raises(AttributeError):
+        config.log_level = "DEBUG"
+
+
+@pytest.mark.parametrize(
+    "environ, expected_message",
+    [
+        pytest.param(
+            {"CLUSTER_NAME": "cluster-name", "SLACK_CHANNEL": "test-channel"},
+            "SLACK_NOTIFICATIONS_LAMBDA_ARN must be set",
+            id="missing_lambda_arn",
+        ),
+        pytest.param(
+            {"SLACK_NOTIFICATIONS_LAMBDA_ARN": lambda_arn, "CLUSTER_NAME": "cluster-name"},
+            "Either ROUTING_TABLE or CLUSTER_NAME and SLACK_CHANNEL must be set",
+            id="missing_channel",
+        ),
+        pytest.param(
+            {"SLACK_NOTIFICATIONS_LAMBDA_ARN": lambda_arn, "ROUTING_TABLE": "{"},
+            "ROUTING_TABLE is not valid JSON: "
+            "Expecting property name enclosed in double quotes: line 1 column 2 (char 1)",
+            id="invalid_routing_table",
+        ),
+        pytest.param(
+            {"SLACK_NOTIFICATIONS_LAMBDA_ARN": lambda_arn, "ROUTING_TABLE": "{}"},
+            "ROUTING_TABLE must be a list of routes",
+            id="routing_table_not_list",
+        ),
+        pytest.param(
+            {"SLACK_NOTIFICATIONS_LAMBDA_ARN": lambda_arn, "ROUTING_TABLE": "[]", "LOG_LEVEL": "LOUD"},
+            "LOG_LEVEL is not a valid log level, got 'LOUD'",
+            id="invalid_log_level",
+        ),
+        pytest.param(
+            {"SLACK_NOTIFICATIONS_LAMBDA_ARN": lambda_arn, "ROUTING_TABLE": "[]", "AGGREGATE_NOTIFICATIONS": "yes"},
+            "AGGREGATE_NOTIFICATIONS must be true or false, got 'yes'",
+            id="invalid_bool",
+        ),
+        pytest.param(
+            {"SLACK_NOTIFICATIONS_LAMBDA_ARN": lambda_arn, "ROUTING_TABLE": "[]", "NOTIFICATION_MAX_CONCURRENCY": "x"},
+            "NOTIFICATION_MAX_CONCURRENCY must be a number, got 'x'",
+            id="invalid_number",
+        ),
+        pytest.param(
+            {"SLACK_NOTIFICATIONS_LAMBDA_ARN": lambda_arn, "ROUTING_TABLE": "[]", "NOTIFICATION_MAX_CONCURRENCY": "0"},
+            "NOTIFICATION_MAX_CONCURRENCY must be at least 1, got '0'",
+            id="number_too_small",
+        ),
+        pytest.param(
+            {"SLACK_NOTIFICATIONS_LAMBDA_ARN": lambda_arn, "ROUTING_TABLE": "[]", "LAMBDA_TRANSPORT": "grpc"},
+            "LAMBDA_TRANSPORT must be boto3 or http, got 'grpc'",
+            id="invalid_transport",
+        ),
+        pytest.param(
+            {"SLACK_NOTIFICATIONS_LAMBDA_ARN": lambda_arn, "ROUTING_TABLE": "[]", "LAMBDA_TRANSPORT": "http"},
+            "AWS_REGION and credentials must be set in the environment for the http transport",
+            id="http_transport_without_credentials",
+        ),
+        pytest.param(
+            {"ROUTING_TABLE": "[]", "SLACK_SINK": "email"},
+            "SLACK_SINK must be lambda, webhook or api, got 'email'",
+            id="invalid_sink",
+        ),
+        pytest.param(
+            {"ROUTING_TABLE": "[]", "SLACK_SINK": "webhook"},
+            "SLACK_WEBHOOK_URL must be set for the webhook sink",
+            id="webhook_sink_without_url",
+        ),
+        pytest.param(
+            {"ROUTING_TABLE": "[]", "SLACK_SINK": "api"},
+            "SLACK_BOT_TOKEN must be set for the api sink",
+            id="api_sink_without_token",
+        ),
+        pytest.param(
+            {"ROUTING_TABLE": "[]", "SLACK_SINK": "api", "SLACK_BOT_TOKEN": "xoxb", "SLACK_MESSAGE_MODE": "edit"},
+            "SLACK_MESSAGE_MODE must be post, update or thread, got 'edit'",
+            id="invalid_message_mode",
+        ),
+        pytest.param(
+            {"SLACK_NOTIFICATIONS_LAMBDA_ARN": lambda_arn, "ROUTING_TABLE": "[]", "SLACK_MESSAGE_MODE": "update"},
+            "SLACK_MESSAGE_MODE update and thread need the api sink",
+            id="message_mode_without_api_sink",
+        ),
+        pytest.param(
+            {
+                "SLACK_NOTIFICATIONS_LAMBDA_ARN": lambda_arn,
+                "ROUTING_TABLE": "[]",
+                "DEPLOYMENT_DURATION_IN_MESSAGE": "true",
+            },
+            "DEPLOYMENT_DURATION_IN_MESSAGE needs DEPLOYMENT_TIMING_STORE",
+            id="duration_in_message_without_store",
+        ),
+        pytest.param(
+            {"SLACK_NOTIFICATIONS_LAMBDA_ARN": lambda_arn, "ROUTING_TABLE": "[]", "DIGEST_WINDOW_SECONDS": "300"},
+            "DIGEST_WINDOW_SECONDS needs DIGEST_STORE",
+            id="digest_without_store",
+        ),
+        pytest.param(
+            {
+                "SLACK_NOTIFICATIONS_LAMBDA_ARN": lambda_arn,
+                "ROUTING_TABLE": "[]",
+                "AWS_CLIENT_MAX_POOL_CONNECTIONS": "ten",
+            },
+            "AWS_CLIENT_MAX_POOL_CONNECTIONS must be a number, got 'ten'",
+            id="invalid_aws_client_pool_size",
+        ),
+        pytest.param(
+            {"SLACK_NOTIFICATIONS_LAMBDA_ARN": lambda_arn, "ROUTING_TABLE": "[]", "AWS_CLIENT_RETRY_MODE": "eager"},
+            "AWS_CLIENT_RETRY_MODE must be legacy, standard or adaptive, got 'eager'",
+            id="invalid_aws_client_retry_mode",
+        ),
+        pytest.param(
+            {
+                "SLACK_NOTIFICATIONS_LAMBDA_ARN": lambda_arn,
+                "ROUTING_TABLE": "[]",
+                "DEADLINE_SAFETY_MARGIN_MILLIS": "1000",
+            },
+            "DEADLINE_SAFETY_MARGIN_MILLIS must be at least the send timeout of 7000 ms, got 1000",
+            id="deadline_safety_margin_shorter_than_send",
+        ),
+        pytest.param(
+            {
+                "SLACK_NOTIFICATIONS_LAMBDA_ARN": lambda_arn,
+                "ROUTING_TABLE": "[]",
+                "DEADLINE_SAFETY_MARGIN_MILLIS": "4000",
+                "SLACK_SINK": "webhook",
+                "SLACK_WEBHOOK_URL": "https://hooks.slack.com/x",
+            },
+            "DEADLINE_SAFETY_MARGIN_MILLIS must be at least the send timeout of 5000 ms, got 4000",
+            id="deadline_safety_margin_shorter_than_slack_timeout",
+        ),
+    ],
+)
+def test_from_environ_rejects_invalid_configuration(environ: dict, expected_message: str):
+    with pytest.raises(ConfigurationError) as exc_info:
+        Config.from_environ(environ)
+
+    assert str(exc_info.value) == expected_message
@@ -0,0 +1,126 @@
+import ecs_service_deployment_notifications.deployments as deployments
+import ecs_service_deployment_notifications.store as store
+import pytest
+
+
+@pytest.fixture
+def tracker() -> deployments.DeploymentTracker:
+    return deployments.DeploymentTracker(store.InMemoryStore(), ttl=60, cache_size=10)
+
+
+def test_transition_accepts_in_order_events(tracker: deployments.DeploymentTracker):
+    assert tracker.transition("ecs-svc/1", deployments.IN_PROGRESS, "2020-05-23T11:11:11Z")
+    assert tracker.transition("ecs-svc/1", deployments.COMPLETED, "2020-05-23T11:15:11Z")
+
+
+def test_transition_drops_late_in_progress_after_completion(tracker: deployments.DeploymentTracker):
+    assert tracker.transition("ecs-svc/1", deployments.COMPLETED, "2020-05-23T11:15:11Z")
+
+    assert not tracker.transition("ecs-svc/1", deployments.IN_PROGRESS, "2020-05-23T11:11:11Z")
+    assert not tracker.transition("ecs-svc/1", deployments.IN_PROGRESS, "2020-05-23T11:16:11Z")
+
+
+def test_transition_drops_older_events(tracker: deployments.DeploymentTracker):
+    assert tracker.transition("ecs-svc/1", deployments.FAILED, "2020-05-23T11:15:11.500Z")
+
+    assert not tracker.transition("ecs-svc/1", deployments.COMPLETED, "2020-05-23T11:15:11Z")
+
+
+def test_transition_drops_repeated_state(tracker: deployments.DeploymentTracker):
+    assert tracker.transition("ecs-svc/1", deployments.IN_PROGRESS, "2020-05-23T11:11:11Z")
+
+    assert not tracker.transition("ecs-svc/1", deployments.IN_PROGRESS, "2020-05-23T11:12:11Z")
+
+
+def test_transition_accepts_redelivery_of_current_state(tracker: deployments.DeploymentTracker):
+    assert tracker.transition("ecs-svc/1", deployments.IN_PROGRESS, "2020-05-23T11:11:11Z")
+
+    assert tracker.transition("ecs-svc/1", deployments.IN_PROGRESS, "2020-05-23T11:11:11Z")
+
+
+def test_transition_tracks_deployments_independently(tracker: deployments.DeploymentTracker):
+    assert tracker.transition("ecs-svc/1", deployments.COMPLETED, "2020-05-23T11:15:11Z")
+
+    assert tracker.transition("ecs-svc/2", deployments.IN_PROGRESS, "2020-05-23T11:11:11Z")
+
+
+def test_state_is_read_from_store():
+    durable_store = store.InMemoryStore()
+    deployments.DeploymentTracker(durable_store, ttl=60, cache_size=10).transition(
+        "ecs-svc/1", deployments.COMPLETED, "2020-05-23T11:15:11Z"
+    )
+
+    tracker = deployments.DeploymentTracker(durable_store, ttl=60, cache_size=10)
+    assert tracker.state("ecs-svc/1") == {"eventName": deployments.COMPLETED, "updatedAt": "2020-05-23T11:15:11Z"}
+    assert not tracker.transition("ecs-svc/1", deployments.IN_PROGRESS, "2020-05-23T11:11:11Z")
+
+
+def test_finished_deployments_are_bounded_in_memory():
+    tracker = deployments.DeploymentTracker(store.InMemoryStore(), ttl=60, cache_size=2)
+
+    for index in range(10):
+        tracker.transition(f"ecs-svc/{index}", deployments.COMPLETED, "2020-05-23T11:15:11Z")
+
+    assert len(tracker._states) == 2
+
+
+def _event(event_name: str, deployment_id: str, updated_at: str) -> dict:
+    return {"detail": {"eventName": event_name, "deploymentId": deployment_id, "updatedAt": updated_at}}
+
+
+@pytest.fixture
+def timer() -> deployments.DeploymentTimer:
+    return deployments.DeploymentTimer(store.InMemoryStore(), ttl=60, cache_size=10)
+
+
+def test_duration_from_first_in_progress_event(timer: deployments.DeploymentTimer):
+    timer.start("ecs-svc/1", "2020-05-23T11:11:11Z")
+    timer.start("ecs-svc/1", "2020-05-23T11:12:11Z")
+
+    assert timer.duration("ecs-svc/1", "2020-05-23T11:15:23Z") == 252
+
+
+def test_duration_without_start(timer: deployments.DeploymentTimer):
+    timer.start("ecs-svc/1", "2020-05-23T11:11:11Z")
+
+    assert timer.duration("ecs-svc/2", "2020-05-23T11:15:23Z") is None
+    assert timer.duration("ecs-svc/1", "2020-05-23T11:10:00Z") is None
+
+
+def test_duration_reads_start_from_store():
+    durable_store = store.InMemoryStore()
+    deployments.DeploymentTimer(durable_store, ttl=60, cache_size=10).start("ecs-svc/1", "2020-05-23T11:11:11Z")
+
+    timer = deployments.DeploymentTimer(durable_store, ttl=60, cache_size=10)
+
+    assert timer.duration("ecs-svc/1", "2020-05-23T11:11:56Z") == 45
+
+
+@pytest.mark.parametrize(
+    "seconds, expected",
+    [(45, "45s"), (252, "4m12s"), (3600, "1h0m0s"), (3723.9, "1h2m3s")],
+)
+def test_format_duration(seconds: float, expected: str):
+    assert deployments.format_duration(seconds) == expected
+
+
+@pytest.mark.parametrize(
+    "event, expected",
+    [
+        pytest.param(_event(deployments.IN_PROGRESS, "ecs-svc/1", "2020-05-23T11:14:11Z"), True, id="within_window"),
+        pytest.param(_event(deployments.IN_PROGRESS, "ecs-svc/1", "2020-05-23T11:05:11Z"), False, id="outside_window"),
+        pytest.param(
+            _event(deployments.IN_PROGRESS, "ecs-svc/2", "2020-05-23T11:14:11Z"), False, id="other_deployment"
+        ),
+        pytest.param(_event(deployments.COMPLETED, "ecs-svc/1", "2020-05-23T11:15:11Z"), False, id="completed"),
+    ],
+)
+def test_superseded(event: dict, expected: bool):
+    completed_at = deployments.completed_times(
+        [
+            _event(deployments.COMPLETED, "ecs-svc/1", "2020-05-23T11:15:11Z"),
+            _event(deployments.FAILED, "ecs-svc/2", "2020-05-23T11:15:11Z"),
+        ]
+    )
+
+    assert deployments.superseded(event, completed_at, window=120) is expected
@@ -0,0 +1,131 @@
+import time
+
+import ecs_service_deployment_notifications.digest as digest
+import ecs_service_deployment_notifications.store as store
+import pytest
+
+
+def _entry(service_name: str, event_name: str, cluster_name: str = "cluster-a", updated_at: str = "") -> dict:
+    return dict(
+        cluster_name=cluster_name,
+        service_name=service_name,
+        event_name=f"SERVICE_DEPLOYMENT_{event_name}",
+        deployment_id=f"ecs-svc/{service_name}",
+        updated_at=updated_at,
+    )
+
+
+# the store expires items against the real clock, so windows start from the current time
+start = int(time.time()) // 300 * 300
+
+
+class FakeClock:
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.parametrize(
+    "event, expected",
+    [
+        ({"source": "aws.events", "detail-type": "Scheduled Event"}, True),
+        ({"source": "aws.ecs", "detail-type": "ECS Deployment State Change"}, False),
+        ({"source": "custom", "detail-type": "Scheduled Event"}, False),
+    ],
+)
+def test_is_scheduled(event: dict, expected: bool):
+    assert digest.is_scheduled(event) is expected
+
+
+def test_buffer_yields_only_closed_windows():
+    clock = FakeClock(start + 100)
+    buffer = digest.DigestBuffer(store.InMemoryStore(), window=300, ttl=3600, clock=clock)
+    buffer.add("channel", _entry("a", "COMPLETED"))
+    clock.now = start + 350
+    buffer.add("channel", _entry("b", "FAILED"))
+
+    assert [window for window, entries in buffer.closed_windows("channel") if entries] == [start]
+
+    clock.now = start + 600
+    assert [(window, entries) for window, entries in buffer.closed_windows("channel") if entries] == [
+        (start, [_entry("a", "COMPLETED")]),
+        (start + 300, [_entry("b", "FAILED")]),
+    ]
+
+
+def test_buffer_resumes_after_advanced_cursor():
+    clock = FakeClock(start + 100)
+    buffer = digest.DigestBuffer(store.InMemoryStore(), window=300, ttl=3600, clock=clock)
+    buffer.add("channel", _entry("a", "COMPLETED"))
+    clock.now = start + 300
+
+    for window, _ in buffer.closed_windows("channel"):
+        buffer.discard("channel", window)
+        buffer.advance("channel", window)
+
+    clock.now = start + 1000
+    assert list(buffer.closed_windows("channel")) == [(start + 300, []), (start + 600, [])]
+
+
+def test_buffer_records_channels():
+    durable_store = store.InMemoryStore()
+    digest.DigestBuffer(durable_store, window=300, ttl=3600).add("channel-a", _entry("a", "COMPLETED"))
+    buffer = digest.DigestBuffer(durable_store, window=300, ttl=3600)
+    buffer.add("channel-a", _entry("b", "COMPLETED"))
+    buffer.add("channel-b", _entry("c", "COMPLETED"))
+    buffer.add("channel-b", _entry("d", "COMPLETED"))
+
+    assert buffer.channels() == {"channel-a", "channel-b"}
+    assert durable_store.get_item(digest.CHANNELS_KEY) == {"members": ["channel-a", "channel-b"]}
+
+
+def test_buffer_records_each_channel_once_across_execution_environments():
+    durable_store = store.InMemoryStore()
+    for _ in range(50):
+        digest.DigestBuffer(durable_store, window=300, ttl=3600).add("channel", _entry("a", "COMPLETED"))
+
+    assert durable_store.get_item(digest.CHANNELS_KEY) == {"members": ["channel"]}
+
+
+def test_buffer_looks_back_a_bounded_number_of_windows():
+    buffer = digest.DigestBuffer(store.InMemoryStore(), window=60, ttl=86400, clock=FakeClock(start))
+
+    assert len(list(buffer.closed_windows("channel"))) == digest.MAX_LOOKBACK_WINDOWS
+
+
+def test_summary_counts_latest_outcome_per_deployment_by_cluster():
+    entries = [
+        _entry("a", "IN_PROGRESS", updated_at="2020-05-23T11:00:00Z"),
+        _entry("a", "COMPLETED", updated_at="2020-05-23T11:05:00Z"),
+        _entry("b", "FAILED"),
+        _entry("c", "IN_PROGRESS", cluster_name="cluster-b"),
+        _entry("d", "COMPLETED", cluster_name="cluster-b"),
+    ]
+
+    description, fields, color = digest.summary(1590231600, 300, entries)
+
+    assert description == "ECS service deployments from 2020-05-23 11:00 to 2020-05-23 11:05 UTC"
+    assert fields == [
+        {"short": False, "title": "cluster-a", "value": "1 completed, 1 failed"},
+        {"short": False, "title": "cluster-b", "value": "1 completed, 1 in progress"},
+        {"short": False, "title": "Failing services", "value": "b (cluster-a)"},
+    ]
+    assert color == "danger"
+
+
+def test_summary_limits_failing_services():
+    entries = [_entry(f"service-{index:03}", "FAILED") for index in range(digest.MAX_FAILING_SERVICES + 2)]
+
+    _, fields, _ = digest.summary(0, 300, entries)
+
+    assert fields[0]["value"] == f"{digest.MAX_FAILING_SERVICES + 2} failed"
+    assert fields[1]["value"].endswith("service-049 (cluster-a) and 2 more")
+
+
+def test_summary_without_failures_is_good():
+    _, fields, color = digest.summary(0, 300, [_entry("a", "COMPLETED")])
+
+    assert fields == [{"short": False, "title": "cluster-a", "value": "1 completed"}]
+    assert color == "good"
@@ -0,0 +1,160 @@
+import json
+import threading
+import time
+import unittest.mock
+
+import ecs_service_deployment_notifications.dispatch as dispatch
+import ecs_service_deployment_notifications.metrics as metrics
+import ecs_service_deployment_notifications.overflow as overflow
+import pytest
+
+
+@pytest.mark.parametrize("max_concurrency", [1, 4])
+def test_send_all_returns_results_in_order(max_concurrency: int):
+    error = RuntimeError("boom")
+
+    def fail():
+        raise error
+
+    results = dispatch.send_all([lambda: None, fail, lambda: None], max_concurrency=max_concurrency)
+
+    assert results == [None, error, None]
+
+
+@pytest.mark.parametrize("max_concurrency", [1, 4])
+def test_send_all_continues_after_errors(max_concurrency: int):
+    sent = []
+
+    def fail():
+        raise RuntimeError("boom")
+
+    dispatch.send_all([fail, lambda: sent.append(1), fail, lambda: sent.append(2)], max_concurrency=max_concurrency)
+
+    assert sorted(sent) == [1, 2]
+
+
+def test_send_all_bounds_concurrency():
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+
+    def send():
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.01)
+        with lock:
+            active -= 1
+
+    dispatch.send_all([send] * 12, max_concurrency=3)
+
+    assert peak <= 3
+
+
+def test_send_all_runs_concurrently():
+    start = time.perf_counter()
+    dispatch.send_all([lambda: time.sleep(0.05)] * 8, max_concurrency=8)
+
+    assert time.perf_counter() - start < 0.05 * 4
+
+
+@unittest.mock.patch("ecs_service_deployment_notifications.slack.send_notification")
+def test_notification_calls_slack_function(mock_send_notification: unittest.mock.MagicMock):
+    dispatch.Notification("send_notification", {"channel": "test-channel"})()
+
+    mock_send_notification.assert_called_once_with(channel="test-channel")
+    assert metrics.flush() == {(): {"NotificationsSent": 1}}
+
+
+def test_notification_round_trips_through_message():
+    notification = dispatch.Notification("send_aggregated_notification", {"channel": "test-channel"})
+
+    assert dispatch.Notification.from_message(json.loads(json.dumps(notification.to_message()))) == notification
+
+
+def test_notification_from_message_rejects_unexpected_function():
+    with pytest.raises(ValueError) as exc_info:
+        dispatch.Notification.from_message({"function": "invoke_lambda", "kwargs": {}})
+
+    assert str(exc_info.value) == "Unexpected notification function invoke_lambda"
+
+
+def test_send_sends_when_token_available():
+    notification = unittest.mock.MagicMock()
+    limiter = unittest.mock.MagicMock()
+    limiter.acquire.return_value = True
+    deadline = time.monotonic() + 10
+
+    dispatch.send(notification, deadline, limiter, budget=1)
+
+    notification.assert_called_once_with(deadline)
+    assert 8 < limiter.acquire.call_args.args[0] <= 9
+
+
+def test_send_spills_throttled_notification_to_overflow_queue():
+    notification = dispatch.Notification("send_notification", {"channel": "test-channel"})
+    limiter = unittest.mock.MagicMock()
+    limiter.acquire.return_value = False
+    overflow_queue = overflow.InMemoryQueue()
+
+    dispatch.send(notification, time.monotonic(), limiter, overflow_queue)
+
+    assert list(overflow_queue.messages) == [notification.to_message()]
+    assert metrics.flush() == {(): {"NotificationsThrottled": 1, "NotificationsSpilled": 1}}
+
+
+def test_send_raises_when_throttled_without_overflow_queue():
+    limiter = unittest.mock.MagicMock()
+    limiter.acquire.return_value = False
+
+    with pytest.raises(dispatch.ThrottledError):
+        dispatch.send(unittest.mock.MagicMock(), time.monotonic(), limiter)
+
+    assert metrics.flush() == {(): {"NotificationsThrottled": 1}}
+
+
+def test_send_without_deadline_or_limiter_sends():
+    notification = unittest.mock.MagicMock()
+
+    dispatch.send(notification)
+
+    notification.assert_called_once_with(None)
+
+
+def test_send_spills_notification_without_time_to_send():
+    notification = dispatch.Notification("send_notification", {"channel": "test-channel"})
+    overflow_queue = overflow.InMemoryQueue()
+
+    dispatch.send(notification, time.monotonic() + 0.5, overflow_queue=overflow_queue, budget=1)
+
+    assert list(overflow_queue.messages) == [notification.to_message()]
+    assert metrics.flush() == {(): {"NotificationsPastDeadline": 1, "NotificationsSpilled": 1}}
+
+
+def test_send_raises_without_time_to_send_or_overflow_queue():
+    notification = unittest.mock.MagicMock()
+
+    with pytest.raises(dispatch.DeadlineExceededError):
+        dispatch.send(notification, time.monotonic() - 1)
+
+    notification.assert_not_called()
+
+
+@unittest.mock.patch("ecs_service_deployment_notifications.slack.send_notification")
+def test_notification_passes_deadline_to_slack_function(mock_send_notification: unittest.mock.MagicMock):
+    dispatch.Notification("send_notification", {"channel": "test-channel"})(deadline=12.5)
+
+    mock_send_notification.assert_called_once_with(channel="test-channel", deadline=12.5)
+
+
+@pytest.mark.parametrize(
+    "body, expected",
+    [
+        ({"function": "send_notification", "kwargs": {}}, True),
+        ({"detail-type": "ECS Deployment State Change", "detail": {}}, False),
+        ([], False),
+    ],
+)
+def test_is_message(body: object, expected: bool):
+    assert dispatch.is_message(body) is expected
@@ -1,3 +1,6 @@
+import copy
+import pickle
+
 import ecs_service_deployment_notifications.ecs as ecs
 import pytest
 
@@ -97,3 +100,44 @@ class TestServiceArn:
         with pytest.raises(ValueError) as exc:
             ecs.ServiceArn(invalid_service_arn)
         assert str(exc.value) == expected_exception_message
+
+    def test_constructor_splits_arn_components(self):
+        service_arn = ecs.ServiceArn("arn:aws-us-gov:ecs:us-gov-west-1:111122223333:service/default/servicetest")
+
+        assert service_arn.partition == "aws-us-gov"
+        assert service_arn.service == "ecs"
+        assert service_arn.region == "us-gov-west-1"
+        assert service_arn.account_id == "111122223333"
+
+    def test_parse_service_arn_reuses_parsed_arns(self):
+        service_arn = "arn:aws:ecs:eu-west-2:111122223333:service/testing/servicename"
+
+        assert ecs.parse_service_arn(service_arn) is ecs.parse_service_arn(service_arn)
+        assert ecs.parse_service_arn(service_arn) == ecs.ServiceArn(service_arn)
+
+    def test_service_arn_has_no_other_attributes(self):
+        service_arn = ecs.ServiceArn("arn:aws:ecs:eu-west-2:111122223333:service/testing/servicename")
+
+        with pytest.raises(AttributeError):
+            service_arn.cluster = "other"
+
+    @pytest.mark.parametrize("clone", [copy.copy, copy.deepcopy, lambda value: pickle.loads(pickle.dumps(value))])
+    def test_service_arn_can_be_copied(self, clone):
+        service_arn = ecs.ServiceArn("arn:aws:ecs:eu-west-2:111122223333:service/testing/servicename")
+
+        copied = clone(service_arn)
+
+        assert copied == service_arn
+        assert (copied.cluster_name, copied.service_name) == ("testing", "servicename")
+
+    def test_service_arn_equality_uses_arn(self):
+        service_arn = ecs.ServiceArn("arn:aws:ecs:eu-west-2:111122223333:service/testing/servicename")
+
+        assert service_arn != tuple(getattr(service_arn, name) for name in ecs.ServiceArn.__slots__)
+        assert service_arn != ecs.ServiceArn("arn:aws:ecs:eu-west-2:111122223333:service/testing/other")
+        assert {service_arn: "value"}[ecs.ServiceArn(service_arn.arn)] == "value"
+
+    def test_service_arn_has_no_instance_dict(self):
+        service_arn = ecs.ServiceArn("arn:aws:ecs:eu-west-2:111122223333:service/testing/servicename")
+
+        assert not hasattr(service_arn, "__dict__")
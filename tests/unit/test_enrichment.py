@@ -0,0 +1,120 @@
+import boto3
+import botocore.stub
+import ecs_service_deployment_notifications.ecs as ecs
+import ecs_service_deployment_notifications.enrichment as enrichment
+import ecs_service_deployment_notifications.metrics as metrics
+import pytest
+
+task_definition_arn = "arn:aws:ecs:eu-west-2:123456789012:task-definition/service:42"
+
+
+def _service_arn(index: int, cluster_name: str = "cluster-name") -> ecs.ServiceArn:
+    return ecs.ServiceArn(f"arn:aws:ecs:eu-west-2:123456789012:service/{cluster_name}/service-{index}")
+
+
+def _service(service_arn: ecs.ServiceArn) -> dict:
+    return {
+        "serviceArn": service_arn.arn,
+        "taskDefinition": task_definition_arn,
+        "desiredCount": 3,
+        "runningCount": 2,
+    }
+
+
+@pytest.fixture
+def ecs_client():
+    return boto3.client("ecs", region_name="eu-west-2")
+
+
+def _expect_task_definition(stubber: botocore.stub.Stubber) -> None:
+    stubber.add_response(
+        method="describe_task_definition",
+        service_response={
+            "taskDefinition": {
+                "containerDefinitions": [
+                    {"name": "app", "image": "123456789012.dkr.ecr.eu-west-2.amazonaws.com/service:1.2.3"},
+                    {"name": "sidecar", "image": "envoy"},
+                ]
+            }
+        },
+        expected_params={"taskDefinition": task_definition_arn},
+    )
+
+
+def test_describe_batches_services_per_cluster(ecs_client):
+    service_arns = [_service_arn(index) for index in range(12)] + [_service_arn(0, "other-cluster")]
+    stubber = botocore.stub.Stubber(ecs_client)
+    stubber.add_response(
+        method="describe_services",
+        service_response={"services": [_service(service_arn) for service_arn in service_arns[:10]]},
+        expected_params={"cluster": "cluster-name", "services": [arn.arn for arn in service_arns[:10]]},
+    )
+    _expect_task_definition(stubber)
+    stubber.add_response(
+        method="describe_services",
+        service_response={"services": [_service(service_arn) for service_arn in service_arns[10:12]]},
+        expected_params={"cluster": "cluster-name", "services": [arn.arn for arn in service_arns[10:12]]},
+    )
+    stubber.add_response(
+        method="describe_services",
+        service_response={"services": [_service(service_arns[12])]},
+        expected_params={"cluster": "other-cluster", "services": [service_arns[12].arn]},
+    )
+
+    with stubber:
+        enricher = enrichment.ServiceEnricher(ttl=60, cache_size=100, client=ecs_client)
+        details = enricher.describe(service_arns + service_arns[:1])
+
+    stubber.assert_no_pending_responses()
+    assert details.keys() == {service_arn.arn for service_arn in service_arns}
+    assert details[service_arns[0].arn] == enrichment.ServiceDetails(
+        task_definition="service:42",
+        image="1.2.3, latest",
+        desired_count=3,
+        running_count=2,
+    )
+    assert metrics.flush()[()]["DescribeServicesCalls"] == 3
+
+
+def test_describe_caches_services(ecs_client):
+    stubber = botocore.stub.Stubber(ecs_client)
+    stubber.add_response(method="describe_services", service_response={"services": [_service(_service_arn(1))]})
+    _expect_task_definition(stubber)
+    stubber.add_response(method="describe_services", service_response={"services": [_service(_service_arn(2))]})
+
+    with stubber:
+        enricher = enrichment.ServiceEnricher(ttl=60, cache_size=100, client=ecs_client)
+        enricher.describe([_service_arn(1)])
+        assert enricher.describe([_service_arn(1)]).keys() == {_service_arn(1).arn}
+        details = enricher.describe([_service_arn(1), _service_arn(2)])
+
+    assert details.keys() == {_service_arn(1).arn, _service_arn(2).arn}
+
+    stubber.assert_no_pending_responses()
+
+
+def test_describe_without_details_when_ecs_fails(ecs_client):
+    stubber = botocore.stub.Stubber(ecs_client)
+    stubber.add_client_error(method="describe_services", service_error_code="ThrottlingException")
+    stubber.add_response(method="describe_services", service_response={"services": [_service(_service_arn(1))]})
+    stubber.add_client_error(method="describe_task_definition", service_error_code="AccessDeniedException")
+
+    with stubber:
+        enricher = enrichment.ServiceEnricher(ttl=60, cache_size=100, client=ecs_client)
+        assert enricher.describe([_service_arn(1)]) == {}
+        assert enricher.describe([_service_arn(1)])[_service_arn(1).arn].image is None
+
+    assert metrics.flush()[()]["EnrichmentFailures"] == 2
+
+
+@pytest.mark.parametrize(
+    "image, expected",
+    [
+        ("123456789012.dkr.ecr.eu-west-2.amazonaws.com/service:1.2.3", "1.2.3"),
+        ("localhost:5000/service:0.1.0", "0.1.0"),
+        ("nginx", "latest"),
+        ("service@sha256:0123abcd", "sha256:0123abcd"),
+    ],
+)
+def test_image_tag(image: str, expected: str):
+    assert enrichment.image_tag(image) == expected
@@ -0,0 +1,106 @@
+import ecs_service_deployment_notifications.events as events
+import fixtures.sample_events as sample_events
+import pytest
+
+service_arn = f"arn:aws:ecs:{sample_events.region}:{sample_events.account}:service/cluster-name/service-name"
+
+
+@pytest.mark.parametrize(
+    "event, expected_key",
+    [
+        pytest.param(
+            sample_events.event_completed,
+            ("ECS Deployment State Change", "SERVICE_DEPLOYMENT_COMPLETED"),
+            id="deployment",
+        ),
+        pytest.param(
+            sample_events.event_task_placement_failure,
+            ("ECS Service Action", "SERVICE_TASK_PLACEMENT_FAILURE"),
+            id="service_action",
+        ),
+        pytest.param(sample_events.event_task_stopped, ("ECS Task State Change", "STOPPED"), id="task"),
+        pytest.param(
+            {"detail": {"eventName": "SERVICE_DEPLOYMENT_FAILED"}},
+            ("ECS Deployment State Change", "SERVICE_DEPLOYMENT_FAILED"),
+            id="no_detail_type",
+        ),
+    ],
+)
+def test_event_key(event: dict, expected_key: tuple[str, str]):
+    assert (events.detail_type(event), events.event_name(event)) == expected_key
+
+
+@pytest.mark.parametrize(
+    "event, expected",
+    [
+        pytest.param({"warmUp": True}, True, id="warm_up"),
+        pytest.param({"warmUp": "true"}, False, id="not_boolean"),
+        pytest.param(sample_events.scheduled_event, False, id="scheduled"),
+        pytest.param(sample_events.event_completed, False, id="deployment"),
+    ],
+)
+def test_is_warm_up(event: dict, expected: bool):
+    assert events.is_warm_up(event) is expected
+
+
+def test_registry_lookup():
+    registry = events.Registry()
+    event_type = events.EventType(description="description", color=None)
+    registry.register("Detail Type", "EVENT_NAME", event_type)
+
+    assert registry.lookup("Detail Type", "EVENT_NAME") is event_type
+    assert registry.lookup("Detail Type", "OTHER_EVENT_NAME") is None
+    assert registry.lookup("Other Detail Type", "EVENT_NAME") is None
+    assert registry.lookup("Detail Type", None) is None
+    assert registry.handles("Detail Type")
+    assert not registry.handles("Other Detail Type")
+    assert list(registry) == [event_type]
+
+
+@pytest.mark.parametrize(
+    "event, expected_reason",
+    [
+        pytest.param(sample_events.event_completed, "ECS deployment deploymentId completed.", id="deployment"),
+        pytest.param(sample_events.event_task_placement_failure, "RESOURCE:MEMORY", id="service_action"),
+        pytest.param(sample_events.event_task_stopped, "Essential container in task exited", id="task"),
+    ],
+)
+def test_default_registry_renders_reasons(event: dict, expected_reason: str):
+    event_type = events.default_registry().lookup(events.detail_type(event), events.event_name(event))
+
+    event_type.validate(event)
+    assert event_type.reason(event) == expected_reason
+    assert [event_type.service(event, resource).arn for resource in event["resources"]] == [service_arn]
+
+
+@pytest.mark.parametrize(
+    "detail",
+    [
+        pytest.param({"group": "family:task-family"}, id="standalone_task"),
+        pytest.param({"stopCode": "ServiceSchedulerInitiated"}, id="stopped_by_scheduler"),
+    ],
+)
+def test_task_service_ignores_expected_stops(detail: dict):
+    event = sample_events.event_task_stopped | {"detail": sample_events.event_task_stopped["detail"] | detail}
+
+    assert events.task_service(event, event["resources"][0]) is None
+
+
+@pytest.mark.parametrize(
+    "event, expected_message",
+    [
+        pytest.param({"detail": {"eventName": "SERVICE_DEPLOYMENT_COMPLETED"}}, "Missing reason", id="deployment"),
+        pytest.param(
+            {"detail-type": "ECS Task State Change", "detail": {"lastStatus": "STOPPED"}},
+            "Missing cluster ARN",
+            id="task",
+        ),
+    ],
+)
+def test_default_registry_validates_events(event: dict, expected_message: str):
+    event_type = events.default_registry().lookup(events.detail_type(event), events.event_name(event))
+
+    with pytest.raises(ValueError) as exc_info:
+        event_type.validate(event)
+
+    assert str(exc_info.value) == expected_message
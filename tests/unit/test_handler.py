@@ -4,9 +4,20 @@ import logging
 import os
 import unittest.mock
 
+import ecs_service_deployment_notifications.clients as clients
+import ecs_service_deployment_notifications.handler as handler_module
+import ecs_service_deployment_notifications.metrics as metrics
+import ecs_service_deployment_notifications.render as render
 import pytest
+from ecs_service_deployment_notifications.config import ConfigurationError
 from ecs_service_deployment_notifications.handler import handler
 
+environment = {
+    "CLUSTER_NAME": "cluster-name",
+    "SLACK_CHANNEL": "test-channel",
+    "SLACK_NOTIFICATIONS_LAMBDA_ARN": "arn:aws:lambda:eu-west-2:123456789012:function:example-function:1",
+}
+
 
 @pytest.mark.parametrize(
     "event",
@@ -28,6 +39,7 @@ from ecs_service_deployment_notifications.handler import handler
         ),
     ],
 )
+@unittest.mock.patch.dict(os.environ, environment, clear=True)
 def test_handler_raises_exception_on_missing_event_name(event: dict):
     context = {}
 
@@ -37,22 +49,27 @@ def test_handler_raises_exception_on_missing_event_name(event: dict):
     assert str(exc_info.value) == "Missing event name"
 
 
-def test_handler_raises_exception_on_unexpected_event_name():
-    context = {}
-
-    with pytest.raises(ValueError) as exc_info:
-        handler(
-            {
-                "resources": [],
-                "detail": {
-                    "eventName": "NOT_A_SERVICE_DEPLOYMENT",
-                    "reason": "No reason",
-                },
-            },
-            context,
-        )
+@pytest.mark.parametrize(
+    "event",
+    [
+        pytest.param(
+            {"resources": [], "detail": {"eventName": "NOT_A_SERVICE_DEPLOYMENT", "reason": "No reason"}},
+            id="unknown_event_name",
+        ),
+        pytest.param(
+            {"detail-type": "ECS Container Instance State Change", "resources": [], "detail": {"status": "ACTIVE"}},
+            id="unknown_detail_type",
+        ),
+    ],
+)
+@unittest.mock.patch("ecs_service_deployment_notifications.slack.send_notification")
+@unittest.mock.patch.dict(os.environ, environment, clear=True)
+def test_process_event_counts_and_drops_unknown_events(mock_send_notification: unittest.mock.MagicMock, event: dict):
+    handler_module.process_event(event)
 
-    assert str(exc_info.value) == "Unexpected event name NOT_A_SERVICE_DEPLOYMENT"
+    mock_send_notification.assert_not_called()
+    detail_type = event.get("detail-type", "ECS Deployment State Change")
+    assert metrics.flush()[(("DetailType", detail_type),)] == {"UnknownEvents": 1}
 
 
 @dataclasses.dataclass
@@ -335,6 +352,22 @@ def test_handler_logs_event_at_debug(
     assert ("root", logging.DEBUG, json.dumps(event)) in caplog.record_tuples
 
 
+@unittest.mock.patch("ecs_service_deployment_notifications.handler.json")
+@unittest.mock.patch.dict(os.environ, environment, clear=True)
+def test_handler_does_not_serialise_event_above_debug(mock_json: unittest.mock.MagicMock):
+    event = {
+        "resources": [],
+        "detail": {
+            "eventName": "SERVICE_DEPLOYMENT_COMPLETED",
+            "reason": "No reason",
+        },
+    }
+
+    handler(event, {})
+
+    mock_json.dumps.assert_not_called()
+
+
 @unittest.mock.patch("ecs_service_deployment_notifications.slack.send_notification")
 @unittest.mock.patch("ecs_service_deployment_notifications.ecs.ServiceArn")
 def test_handler_logs_at_debug_when_service_in_wrong_cluster(
@@ -387,3 +420,426 @@ def test_handler_logs_at_debug_when_service_in_wrong_cluster(
         logging.DEBUG,
         f"Ignoring SERVICE_DEPLOYMENT_COMPLETED event for {service_arn}-2",
     ) in caplog.record_tuples
+
+
+@unittest.mock.patch("ecs_service_deployment_notifications.slack.send_notification")
+@unittest.mock.patch("ecs_service_deployment_notifications.ecs.ServiceArn")
+def test_handler_sends_remaining_notifications_and_raises_on_failure(
+    mock_service_arn: unittest.mock.MagicMock,
+    mock_send_notification: unittest.mock.MagicMock,
+    caplog: pytest.LogCaptureFixture,
+):
+    service_arn = "arn:test"
+    cluster_name = "cluster-name"
+    service_name = "service-name"
+    error = RuntimeError("Rate exceeded")
+
+    event = {
+        "resources": [
+            f"{service_arn}-1",
+            f"{service_arn}-2",
+        ],
+        "detail": {
+            "eventName": "SERVICE_DEPLOYMENT_COMPLETED",
+            "reason": "No reason",
+        },
+    }
+    context = {}
+
+    mock_service_arn.side_effect = [
+        MockServiceArn(arn=f"{service_arn}-1", cluster_name=cluster_name, service_name=f"{service_name}-1"),
+        MockServiceArn(arn=f"{service_arn}-2", cluster_name=cluster_name, service_name=f"{service_name}-2"),
+    ]
+    mock_send_notification.side_effect = [error, None]
+
+    with unittest.mock.patch.dict(
+        os.environ,
+        {
+            "CLUSTER_NAME": cluster_name,
+            "SLACK_CHANNEL": "test-channel",
+            "SLACK_NOTIFICATIONS_LAMBDA_ARN": "arn:aws:lambda:eu-west-2:123456789012:function:example-function:1",
+        },
+        clear=True,
+    ):
+        with pytest.raises(ExceptionGroup) as exc_info:
+            handler(event, context)
+
+    assert exc_info.value.exceptions == (error,)
+    assert mock_send_notification.call_count == 2
+    assert (
+        "root",
+        logging.ERROR,
+        f"Failed to send SERVICE_DEPLOYMENT_COMPLETED notification for {service_arn}-1: Rate exceeded",
+    ) in caplog.record_tuples
+
+
+@unittest.mock.patch("ecs_service_deployment_notifications.slack.send_notification")
+@unittest.mock.patch("ecs_service_deployment_notifications.ecs.ServiceArn")
+def test_handler_logs_in_resource_order_when_sending_concurrently(
+    mock_service_arn: unittest.mock.MagicMock,
+    mock_send_notification: unittest.mock.MagicMock,
+    caplog: pytest.LogCaptureFixture,
+):
+    service_arns = [f"arn:test-{index}" for index in range(8)]
+
+    event = {
+        "resources": service_arns,
+        "detail": {
+            "eventName": "SERVICE_DEPLOYMENT_IN_PROGRESS",
+            "reason": "No reason",
+        },
+    }
+    context = {}
+
+    mock_service_arn.side_effect = [
+        MockServiceArn(arn=arn, cluster_name="cluster-name", service_name=arn) for arn in service_arns
+    ]
+
+    with unittest.mock.patch.dict(
+        os.environ,
+        {
+            "CLUSTER_NAME": "cluster-name",
+            "SLACK_CHANNEL": "test-channel",
+            "SLACK_NOTIFICATIONS_LAMBDA_ARN": "arn:aws:lambda:eu-west-2:123456789012:function:example-function:1",
+            "NOTIFICATION_MAX_CONCURRENCY": "4",
+        },
+        clear=True,
+    ):
+        handler(event, context)
+
+    assert mock_send_notification.call_count == len(service_arns)
+    assert caplog.record_tuples == [
+        ("root", logging.INFO, f"Sending SERVICE_DEPLOYMENT_IN_PROGRESS notification for {arn}") for arn in service_arns
+    ]
+
+
+@unittest.mock.patch("ecs_service_deployment_notifications.slack.send_aggregated_notification")
+@unittest.mock.patch("ecs_service_deployment_notifications.slack.send_notification")
+@unittest.mock.patch("ecs_service_deployment_notifications.ecs.ServiceArn")
+def test_handler_sends_aggregated_notification(
+    mock_service_arn: unittest.mock.MagicMock,
+    mock_send_notification: unittest.mock.MagicMock,
+    mock_send_aggregated_notification: unittest.mock.MagicMock,
+):
+    service_arn = "arn:test"
+    cluster_name = "cluster-name"
+    service_name = "service-name"
+    slack_channel = "test-channel"
+    lambda_arn = "arn:aws:lambda:eu-west-2:123456789012:function:example-function:1"
+
+    event = {
+        "resources": [
+            f"{service_arn}-1",
+            f"{service_arn}-2",
+            f"{service_arn}-3",
+        ],
+        "detail": {
+            "eventName": "SERVICE_DEPLOYMENT_FAILED",
+            "reason": "No reason",
+        },
+    }
+    context = {}
+
+    mock_service_arn.side_effect = [
+        MockServiceArn(arn=f"{service_arn}-1", cluster_name=cluster_name, service_name=f"{service_name}-1"),
+        MockServiceArn(arn=f"{service_arn}-2", cluster_name=f"not-{cluster_name}", service_name=f"{service_name}-2"),
+        MockServiceArn(arn=f"{service_arn}-3", cluster_name=cluster_name, service_name=f"{service_name}-3"),
+    ]
+
+    with unittest.mock.patch.dict(
+        os.environ,
+        {
+            "CLUSTER_NAME": cluster_name,
+            "SLACK_CHANNEL": slack_channel,
+            "SLACK_NOTIFICATIONS_LAMBDA_ARN": lambda_arn,
+            "AGGREGATE_NOTIFICATIONS": "true",
+        },
+        clear=True,
+    ):
+        handler(event, context)
+
+    mock_send_notification.assert_not_called()
+    mock_send_aggregated_notification.assert_called_once_with(
+        lambda_arn=lambda_arn,
+        description="ECS service deployment failed",
+        color="danger",
+        channel=slack_channel,
+        services=[(cluster_name, f"{service_name}-1"), (cluster_name, f"{service_name}-3")],
+        reason="No reason",
+    )
+
+
+@unittest.mock.patch("ecs_service_deployment_notifications.handler.process_event")
+@unittest.mock.patch.dict(os.environ, environment, clear=True)
+def test_handler_processes_each_sqs_record(mock_process_event: unittest.mock.MagicMock):
+    events = [
+        {"detail": {"eventName": "SERVICE_DEPLOYMENT_IN_PROGRESS", "deploymentId": "ecs-svc/1"}, "resources": ["a"]},
+        {"detail": {"eventName": "SERVICE_DEPLOYMENT_COMPLETED", "deploymentId": "ecs-svc/1"}, "resources": ["a"]},
+        {"detail": {"eventName": "SERVICE_DEPLOYMENT_COMPLETED", "deploymentId": "ecs-svc/2"}, "resources": ["b"]},
+    ]
+    event = {"Records": [{"messageId": str(index), "body": json.dumps(body)} for index, body in enumerate(events)]}
+    context = {}
+
+    response = handler(event, context)
+
+    assert response == {"batchItemFailures": []}
+    assert mock_process_event.call_args_list == [unittest.mock.call(body, None) for body in events]
+
+
+@unittest.mock.patch("ecs_service_deployment_notifications.handler.process_event")
+@unittest.mock.patch.dict(os.environ, environment, clear=True)
+def test_handler_deduplicates_sqs_records_for_same_deployment(mock_process_event: unittest.mock.MagicMock):
+    body = {"detail": {"eventName": "SERVICE_DEPLOYMENT_COMPLETED", "deploymentId": "ecs-svc/1"}, "resources": ["a"]}
+    event = {"Records": [{"messageId": str(index), "body": json.dumps(body)} for index in range(3)]}
+    context = {}
+
+    response = handler(event, context)
+
+    assert response == {"batchItemFailures": []}
+    mock_process_event.assert_called_once_with(body, None)
+
+
+@unittest.mock.patch("ecs_service_deployment_notifications.handler.process_event")
+@unittest.mock.patch.dict(os.environ, environment, clear=True)
+def test_handler_retries_duplicate_when_first_sqs_record_fails(mock_process_event: unittest.mock.MagicMock):
+    body = {"detail": {"eventName": "SERVICE_DEPLOYMENT_COMPLETED", "deploymentId": "ecs-svc/1"}, "resources": ["a"]}
+    event = {"Records": [{"messageId": str(index), "body": json.dumps(body)} for index in range(2)]}
+    context = {}
+
+    mock_process_event.side_effect = [RuntimeError("boom"), None]
+
+    response = handler(event, context)
+
+    assert response == {"batchItemFailures": [{"itemIdentifier": "0"}]}
+    assert mock_process_event.call_count == 2
+
+
+@unittest.mock.patch("ecs_service_deployment_notifications.slack.send_notification")
+@unittest.mock.patch("ecs_service_deployment_notifications.ecs.parse_service_arn")
+def test_handler_skips_duplicate_events_before_parsing(
+    mock_service_arn: unittest.mock.MagicMock,
+    mock_send_notification: unittest.mock.MagicMock,
+):
+    service_arn = "arn:test"
+    cluster_name = "cluster-name"
+
+    event = {
+        "id": "event-id",
+        "resources": [service_arn],
+        "detail": {
+            "eventName": "SERVICE_DEPLOYMENT_COMPLETED",
+            "reason": "No reason",
+        },
+    }
+    context = {}
+
+    mock_service_arn.return_value = MockServiceArn(arn=service_arn, cluster_name=cluster_name, service_name="service")
+
+    with unittest.mock.patch.dict(
+        os.environ,
+        {
+            "CLUSTER_NAME": cluster_name,
+            "SLACK_CHANNEL": "test-channel",
+            "SLACK_NOTIFICATIONS_LAMBDA_ARN": "arn:aws:lambda:eu-west-2:123456789012:function:example-function:1",
+            "IDEMPOTENCY_STORE": "memory://",
+        },
+        clear=True,
+    ):
+        handler(event, context)
+        handler(event, context)
+        handler(event | {"id": "other-event-id"}, context)
+
+    assert mock_service_arn.call_count == 2
+    assert mock_send_notification.call_count == 2
+
+
+@unittest.mock.patch("ecs_service_deployment_notifications.slack.send_notification")
+@unittest.mock.patch("ecs_service_deployment_notifications.ecs.ServiceArn")
+def test_handler_resends_duplicate_after_failed_send(
+    mock_service_arn: unittest.mock.MagicMock,
+    mock_send_notification: unittest.mock.MagicMock,
+):
+    service_arn = "arn:test"
+    cluster_name = "cluster-name"
+
+    event = {
+        "id": "event-id",
+        "resources": [service_arn],
+        "detail": {
+            "eventName": "SERVICE_DEPLOYMENT_COMPLETED",
+            "reason": "No reason",
+        },
+    }
+    context = {}
+
+    mock_service_arn.return_value = MockServiceArn(arn=service_arn, cluster_name=cluster_name, service_name="service")
+    mock_send_notification.side_effect = [RuntimeError("Rate exceeded"), None]
+
+    with unittest.mock.patch.dict(
+        os.environ,
+        {
+            "CLUSTER_NAME": cluster_name,
+            "SLACK_CHANNEL": "test-channel",
+            "SLACK_NOTIFICATIONS_LAMBDA_ARN": "arn:aws:lambda:eu-west-2:123456789012:function:example-function:1",
+            "IDEMPOTENCY_STORE": "memory://",
+        },
+        clear=True,
+    ):
+        with pytest.raises(ExceptionGroup):
+            handler(event, context)
+        handler(event, context)
+
+    assert mock_send_notification.call_count == 2
+
+
+@unittest.mock.patch("ecs_service_deployment_notifications.slack.send_notification")
+@unittest.mock.patch("ecs_service_deployment_notifications.ecs.ServiceArn")
+def test_handler_reprocesses_duplicate_after_failure_before_sending(
+    mock_service_arn: unittest.mock.MagicMock,
+    mock_send_notification: unittest.mock.MagicMock,
+):
+    service_arn = "arn:test"
+    event = {
+        "id": "event-id",
+        "resources": [service_arn],
+        "detail": {
+            "eventName": "SERVICE_DEPLOYMENT_COMPLETED",
+            "reason": "No reason",
+        },
+    }
+
+    mock_service_arn.side_effect = [
+        RuntimeError("Throttled"),
+        MockServiceArn(arn=service_arn, cluster_name="cluster-name", service_name="service"),
+    ]
+
+    with unittest.mock.patch.dict(os.environ, environment | {"IDEMPOTENCY_STORE": "memory://"}, clear=True):
+        with pytest.raises(RuntimeError):
+            handler(event, {})
+        handler(event, {})
+
+    mock_send_notification.assert_called_once()
+
+
+@unittest.mock.patch("ecs_service_deployment_notifications.handler.drain_overflow")
+@unittest.mock.patch("ecs_service_deployment_notifications.slack.warm")
+@unittest.mock.patch("ecs_service_deployment_notifications.slack.send_notification")
+@unittest.mock.patch.dict(os.environ, environment, clear=True)
+def test_handler_warms_up_without_sending(
+    mock_send_notification: unittest.mock.MagicMock,
+    mock_warm: unittest.mock.MagicMock,
+    mock_drain_overflow: unittest.mock.MagicMock,
+):
+    assert handler({"warmUp": True}, {}) == {"warmUp": True, "coldStart": True}
+    assert handler({"warmUp": True}, {}) == {"warmUp": True, "coldStart": False}
+
+    assert mock_warm.call_count == 2
+    mock_send_notification.assert_not_called()
+    mock_drain_overflow.assert_not_called()
+
+
+@unittest.mock.patch("ecs_service_deployment_notifications.slack.warm")
+@unittest.mock.patch.dict(os.environ, environment, clear=True)
+def test_warm_up_counts_connection_failures(mock_warm: unittest.mock.MagicMock):
+    mock_warm.side_effect = ConnectionRefusedError("Connection refused")
+
+    assert handler_module.warm_up(handler_module.get_runtime(), cold_start=False) == {
+        "warmUp": True,
+        "coldStart": False,
+    }
+    flushed = metrics.flush()[()]
+    assert flushed["WarmUps"] == 1
+    assert flushed["WarmUpFailures"] == 1
+
+
+@pytest.mark.parametrize(
+    "options, expected_services",
+    [
+        pytest.param({}, [], id="defaults"),
+        pytest.param({"IDEMPOTENCY_STORE": "sqlite://"}, [], id="local_store"),
+        pytest.param({"IDEMPOTENCY_STORE": "dynamodb://idempotency"}, ["dynamodb"], id="dynamodb_store"),
+        pytest.param({"DIGEST_STORE": "dynamodb://digests"}, [], id="unused_digest_store"),
+        pytest.param(
+            {
+                "DEPLOYMENT_TIMING_STORE": "dynamodb://deployments",
+                "OVERFLOW_QUEUE": "https://sqs.eu-west-2.amazonaws.com/123456789012/overflow",
+                "CHANNEL_TAG": "slack-channel",
+            },
+            ["dynamodb", "ecs", "sqs"],
+            id="all",
+        ),
+    ],
+)
+@unittest.mock.patch("ecs_service_deployment_notifications.slack.warm")
+@unittest.mock.patch("ecs_service_deployment_notifications.clients.get_client")
+def test_warm_up_creates_clients(
+    mock_get_client: unittest.mock.MagicMock,
+    mock_warm: unittest.mock.MagicMock,
+    options: dict,
+    expected_services: list[str],
+):
+    runtime = handler_module.init(environment | options)
+
+    handler_module.warm_up(runtime, cold_start=True)
+
+    assert [call.args[0] for call in mock_get_client.call_args_list] == expected_services
+
+
+def test_init_raises_on_invalid_configuration():
+    with pytest.raises(ConfigurationError):
+        handler_module.init({"CLUSTER_NAME": "cluster-name"})
+
+
+@unittest.mock.patch("ecs_service_deployment_notifications.slack.send_notification")
+def test_handler_does_not_read_environment_after_init(mock_send_notification: unittest.mock.MagicMock):
+    handler_module.init(environment)
+
+    event = {
+        "resources": ["arn:aws:ecs:eu-west-2:123456789012:service/cluster-name/service-name"],
+        "detail": {
+            "eventName": "SERVICE_DEPLOYMENT_COMPLETED",
+            "reason": "No reason",
+        },
+    }
+    context = {}
+
+    with unittest.mock.patch.dict(os.environ, {}, clear=True):
+        handler(event, context)
+
+    mock_send_notification.assert_called_once()
+    assert mock_send_notification.call_args.kwargs["channel"] == "test-channel"
+
+
+def test_init_configures_aws_clients():
+    handler_module.init(environment | {"AWS_CLIENT_READ_TIMEOUT": "1.5"})
+
+    with unittest.mock.patch.dict(os.environ, {}, clear=True):
+        assert clients.client_config().read_timeout == 1.5
+
+
+@unittest.mock.patch("boto3.client")
+def test_init_disables_botocore_retries_for_invokes_with_deadline(mock_client: unittest.mock.MagicMock):
+    handler_module.init(environment | {"DEADLINE_SAFETY_MARGIN_MILLIS": "8000"})
+
+    clients.get_client("lambda")
+    clients.get_client("ecs")
+
+    lambda_config, ecs_config = (call.kwargs["config"] for call in mock_client.call_args_list)
+    assert lambda_config.retries == {"mode": "standard", "max_attempts": 0}
+    assert ecs_config.retries == {"mode": "standard", "max_attempts": 3}
+
+
+def test_init_records_init_duration():
+    runtime = handler_module.init(environment)
+
+    assert runtime.init_duration_millis > 0
+    assert metrics.flush()[()]["InitDuration"] == [runtime.init_duration_millis]
+
+
+def test_init_prepares_payload_templates():
+    render.template.cache_clear()
+
+    runtime = handler_module.init(environment)
+
+    templates = {(event_type.description, event_type.color) for event_type in runtime.event_types}
+    assert render.template.cache_info().currsize == len(templates)
@@ -0,0 +1,46 @@
+import unittest.mock
+
+import ecs_service_deployment_notifications.idempotency as idempotency
+import ecs_service_deployment_notifications.store as store
+
+
+def test_key():
+    assert (
+        idempotency.key("event-id", "arn:aws:ecs:eu-west-2:123456789012:service/c/s", "SERVICE_DEPLOYMENT_COMPLETED")
+        == "event-id#arn:aws:ecs:eu-west-2:123456789012:service/c/s#SERVICE_DEPLOYMENT_COMPLETED"
+    )
+
+
+def test_claim_only_succeeds_once():
+    guard = idempotency.IdempotencyGuard(store.InMemoryStore(), ttl=60, cache_size=10)
+
+    assert guard.claim("key")
+    assert not guard.claim("key")
+
+
+def test_claim_checks_durable_store_on_cache_miss():
+    durable_store = store.InMemoryStore()
+    durable_store.put_item("key", {"status": "claimed"})
+    guard = idempotency.IdempotencyGuard(durable_store, ttl=60, cache_size=10)
+
+    assert not guard.claim("key")
+
+
+def test_claim_short_circuits_on_cache_hit():
+    durable_store = unittest.mock.MagicMock(wraps=store.InMemoryStore())
+    guard = idempotency.IdempotencyGuard(durable_store, ttl=60, cache_size=10)
+
+    guard.claim("key")
+    guard.claim("key")
+
+    durable_store.put_item.assert_called_once()
+
+
+def test_release_allows_reclaim():
+    guard = idempotency.IdempotencyGuard(store.InMemoryStore(), ttl=60, cache_size=10)
+
+    guard.claim("key")
+    guard.release("key")
+
+    assert guard.claim("key")
+
@@ -0,0 +1,26 @@
+import unittest.mock
+
+import ecs_service_deployment_notifications.messages as messages
+import ecs_service_deployment_notifications.store as store
+
+
+def test_put_and_get_reference():
+    message_store = messages.MessageStore(store.InMemoryStore(), ttl=60, cache_size=10)
+
+    message_store.put("ecs-svc/123", "test-channel", {"channel": "C123", "ts": "1700000000.000100"})
+
+    assert message_store.get("ecs-svc/123", "test-channel") == {"channel": "C123", "ts": "1700000000.000100"}
+    assert message_store.get("ecs-svc/123", "other-channel") is None
+    assert message_store.get("ecs-svc/456", "test-channel") is None
+
+
+def test_get_reads_through_cache_to_durable_store():
+    durable_store = store.InMemoryStore()
+    messages.MessageStore(durable_store, ttl=60, cache_size=10).put("ecs-svc/123", "test-channel", {"ts": "1"})
+    durable_store = unittest.mock.MagicMock(wraps=durable_store)
+    message_store = messages.MessageStore(durable_store, ttl=60, cache_size=10)
+
+    assert message_store.get("ecs-svc/123", "test-channel") == {"ts": "1"}
+    assert message_store.get("ecs-svc/123", "test-channel") == {"ts": "1"}
+
+    durable_store.get_item.assert_called_once_with("message#ecs-svc/123#test-channel")
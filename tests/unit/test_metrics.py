@@ -0,0 +1,97 @@
+import io
+import json
+
+import ecs_service_deployment_notifications.metrics as metrics
+
+
+def test_flush_returns_and_resets_counters():
+    metrics.increment("NotificationsSent")
+    metrics.increment("NotificationsSent", 2)
+    metrics.increment("NotificationsThrottled")
+
+    assert metrics.flush() == {(): {"NotificationsSent": 3, "NotificationsThrottled": 1}}
+    assert metrics.flush() == {}
+
+
+def test_flush_returns_observations():
+    metrics.observe("InitDuration", 12.5)
+    metrics.observe("InitDuration", 2.5)
+
+    assert metrics.flush() == {(): {"InitDuration": [12.5, 2.5]}}
+
+
+def test_flush_groups_by_dimensions():
+    metrics.increment("Events", dimensions={"EventName": "SERVICE_DEPLOYMENT_COMPLETED"})
+    metrics.increment("Events", dimensions={"EventName": "SERVICE_DEPLOYMENT_FAILED"})
+    metrics.increment("Events", dimensions={"EventName": "SERVICE_DEPLOYMENT_COMPLETED"})
+
+    assert metrics.flush() == {
+        (("EventName", "SERVICE_DEPLOYMENT_COMPLETED"),): {"Events": 2},
+        (("EventName", "SERVICE_DEPLOYMENT_FAILED"),): {"Events": 1},
+    }
+
+
+def test_timer_observes_milliseconds():
+    with metrics.timer("ParseDuration"):
+        pass
+
+    [duration] = metrics.flush()[()]["ParseDuration"]
+    assert 0 <= duration < 1000
+
+
+def test_emf_records():
+    flushed = {
+        (): {"ColdStart": 1, "InvokeLatency": [12.5, 30.0]},
+        (("ClusterName", "cluster-name"),): {"ServiceEvents": 2},
+    }
+
+    assert metrics.emf_records("Namespace", flushed, timestamp=1700000000000) == [
+        {
+            "_aws": {
+                "Timestamp": 1700000000000,
+                "CloudWatchMetrics": [
+                    {
+                        "Namespace": "Namespace",
+                        "Dimensions": [[]],
+                        "Metrics": [
+                            {"Name": "ColdStart", "Unit": "Count"},
+                            {"Name": "InvokeLatency", "Unit": "Milliseconds"},
+                        ],
+                    }
+                ],
+            },
+            "ColdStart": 1,
+            "InvokeLatency": [12.5, 30.0],
+        },
+        {
+            "_aws": {
+                "Timestamp": 1700000000000,
+                "CloudWatchMetrics": [
+                    {
+                        "Namespace": "Namespace",
+                        "Dimensions": [["ClusterName"]],
+                        "Metrics": [{"Name": "ServiceEvents", "Unit": "Count"}],
+                    }
+                ],
+            },
+            "ClusterName": "cluster-name",
+            "ServiceEvents": 2,
+        },
+    ]
+
+
+def test_emf_records_split_values_over_limit():
+    flushed = {(): {"InvokeLatency": [float(value) for value in range(250)]}}
+
+    records = metrics.emf_records("Namespace", flushed, timestamp=0)
+
+    assert [len(record["InvokeLatency"]) for record in records] == [100, 100, 50]
+    assert sum((record["InvokeLatency"] for record in records), []) == flushed[()]["InvokeLatency"]
+
+
+def test_emit_writes_one_json_line_per_record():
+    stream = io.StringIO()
+
+    metrics.emit([{"a": 1}, {"b": 2}], stream)
+
+    assert [json.loads(line) for line in stream.getvalue().splitlines()] == [{"a": 1}, {"b": 2}]
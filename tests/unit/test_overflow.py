@@ -0,0 +1,54 @@
+import json
+
+import boto3
+import botocore.stub
+import ecs_service_deployment_notifications.overflow as overflow
+import pytest
+
+
+def test_in_memory_queue_put():
+    queue = overflow.InMemoryQueue()
+    queue.put({"a": 1})
+    queue.put({"b": 2})
+
+    assert list(queue.messages) == [{"a": 1}, {"b": 2}]
+
+
+def test_in_memory_queue_get_returns_messages_in_order():
+    queue = overflow.InMemoryQueue()
+    queue.put({"a": 1})
+    queue.put({"b": 2})
+
+    assert [queue.get(), queue.get(), queue.get()] == [{"a": 1}, {"b": 2}, None]
+
+
+def test_sqs_queue_get_leaves_messages_to_event_source_mapping():
+    assert overflow.SQSQueue("https://sqs.eu-west-2.amazonaws.com/123456789012/overflow", client=object()).get() is None
+
+
+def test_sqs_queue_put():
+    client = boto3.client("sqs", region_name="eu-west-2")
+    queue_url = "https://sqs.eu-west-2.amazonaws.com/123456789012/overflow"
+    stubber = botocore.stub.Stubber(client)
+    stubber.add_response(
+        method="send_message",
+        service_response={"MessageId": "message-id"},
+        expected_params={"QueueUrl": queue_url, "MessageBody": json.dumps({"a": 1})},
+    )
+
+    with stubber:
+        overflow.SQSQueue(queue_url, client=client).put({"a": 1})
+
+    stubber.assert_no_pending_responses()
+
+
+def test_from_url():
+    assert isinstance(overflow.from_url("memory://"), overflow.InMemoryQueue)
+    assert isinstance(overflow.from_url("https://sqs.eu-west-2.amazonaws.com/123456789012/overflow"), overflow.SQSQueue)
+
+
+def test_from_url_rejects_unknown_url():
+    with pytest.raises(ValueError) as exc_info:
+        overflow.from_url("redis://localhost")
+
+    assert str(exc_info.value) == "Unsupported overflow queue URL redis://localhost"
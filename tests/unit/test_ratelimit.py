@@ -0,0 +1,57 @@
+import math
+
+import ecs_service_deployment_notifications.ratelimit as ratelimit
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_acquire_allows_burst_without_waiting():
+    clock = FakeClock()
+    bucket = ratelimit.TokenBucket(rate=1, burst=3, clock=clock, sleep=clock.sleep)
+
+    assert all(bucket.acquire(timeout=0) for _ in range(3))
+    assert clock.sleeps == []
+
+
+def test_acquire_fails_when_wait_exceeds_timeout():
+    clock = FakeClock()
+    bucket = ratelimit.TokenBucket(rate=2, burst=1, clock=clock, sleep=clock.sleep)
+
+    assert bucket.acquire(timeout=0)
+    assert not bucket.acquire(timeout=0.4)
+    assert clock.sleeps == []
+
+
+def test_acquire_waits_for_tokens_within_timeout():
+    clock = FakeClock()
+    bucket = ratelimit.TokenBucket(rate=2, burst=1, clock=clock, sleep=clock.sleep)
+
+    assert bucket.acquire(timeout=0)
+    assert bucket.acquire(timeout=1)
+    assert bucket.acquire(timeout=math.inf)
+    assert clock.sleeps == [0.5, 0.5]
+
+
+def test_tokens_refill_up_to_burst():
+    clock = FakeClock()
+    bucket = ratelimit.TokenBucket(rate=10, burst=2, clock=clock, sleep=clock.sleep)
+
+    assert bucket.acquire(timeout=0)
+    assert bucket.acquire(timeout=0)
+    clock.now += 60
+
+    assert bucket.acquire(timeout=0)
+    assert bucket.acquire(timeout=0)
+    assert not bucket.acquire(timeout=0)
+
@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+import ecs_service_deployment_notifications.render as render
+
+
+def _legacy_payload(description: str, channel: str, fields: list[dict], color: str | None) -> bytes:
+    return json.dumps(render.build_payload(description, channel, fields, color)).encode()
+
+
+def _service_fields(cluster_name: str, service_name: str) -> list[dict]:
+    return [
+        {"short": True, "title": "Service Name", "value": service_name},
+        {"short": True, "title": "Cluster Name", "value": cluster_name},
+    ]
+
+
+@pytest.mark.parametrize(
+    "channel, cluster_name, service_name, reason, color",
+    [
+        ("event-integ-recycle", "cluster-name", "service-name", "No reason, just felt like it", "good"),
+        ("event-integ-recycle", "cluster-name", "service-name", "No reason, just felt like it", None),
+        ("événements", "cluster-名前", "service-名前", "Deployed by ☃", "danger"),
+        ("event-integ-recycle", "cluster-name", "service-name", 'Quoted "reason"\\ with\nnew\tlines', None),
+    ],
+)
+def test_render_notification_matches_json_dumps(
+    channel: str, cluster_name: str, service_name: str, reason: str, color: str | None
+):
+    description = "ECS service deployment completed"
+    fields = _service_fields(cluster_name, service_name) + [{"short": False, "title": "Reason", "value": reason}]
+
+    payload = render.render_notification(description, channel, cluster_name, service_name, reason, color)
+
+    assert payload == _legacy_payload(description, channel, fields, color)
+
+
+@pytest.mark.parametrize("image", ["1.2.3", 'quoted "tag"', None])
+def test_render_notification_with_details_matches_json_dumps(image: str | None):
+    details = {"task_definition": "service:42", "image": image, "desired_count": 3, "running_count": 2}
+    fields = _service_fields("cluster-name", "service-name") + [
+        {"short": True, "title": "Task Definition", "value": "service:42"},
+        *([{"short": True, "title": "Image", "value": image}] if image is not None else []),
+        {"short": True, "title": "Tasks", "value": "2 running of 3 desired"},
+        {"short": False, "title": "Reason", "value": "reason"},
+    ]
+
+    payload = render.render_notification(
+        "description", "channel", "cluster-name", "service-name", "reason", "good", details
+    )
+
+    assert payload == _legacy_payload("description", "channel", fields, "good")
+
+
+@pytest.mark.parametrize("color", ["good", None])
+def test_render_aggregated_matches_json_dumps(color: str | None):
+    description = "ECS service deployment completed"
+    services = [("cluster-name", "service-1"), ("cluster-名前", 'service-"2"')]
+    fields = [field for service in services for field in _service_fields(*service)]
+    fields.append({"short": False, "title": "Reason", "value": "No reason"})
+
+    payloads = render.render_aggregated(description, "event-integ-recycle", services, "No reason", color, 256 * 1024)
+
+    assert payloads == [_legacy_payload(description, "event-integ-recycle", fields, color)]
+
+
+def test_render_aggregated_chunks_fit_exactly():
+    services = [("cluster-name", f"service-{index:03}") for index in range(100)]
+    payloads = render.render_aggregated(
+        "ECS service deployment completed", "channel", services, "No reason", None, 2048
+    )
+
+    assert len(payloads) > 1
+    assert all(len(payload) <= 2048 for payload in payloads)
+
+
+def test_template_is_cached():
+    render.template.cache_clear()
+
+    first = render.template("ECS service deployment completed", "channel", "good")
+    second = render.template("ECS service deployment completed", "channel", "good")
+
+    assert first is second
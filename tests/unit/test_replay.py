@@ -0,0 +1,188 @@
+import gzip
+import json
+import os
+import pathlib
+import threading
+import time
+import unittest.mock
+
+import ecs_service_deployment_notifications.metrics as metrics
+import ecs_service_deployment_notifications.replay as replay
+import fixtures.sample_events as sample_events
+import fixtures.stub_server as stub_server
+import pytest
+
+environment = {
+    "CLUSTER_NAME": sample_events.cluster_name,
+    "SLACK_CHANNEL": "event-integ-recycle",
+    "SLACK_NOTIFICATIONS_LAMBDA_ARN": "test-arn",
+}
+
+
+def _write_archive(path: pathlib.Path, events: list[dict], compress: bool = False) -> pathlib.Path:
+    lines = "".join(f"{json.dumps(event)}\n" for event in events)
+    if compress:
+        with gzip.open(path, "wt", encoding="utf-8") as file:
+            file.write(lines)
+    else:
+        path.write_text(lines)
+    return path
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_read_lines_streams_plain_and_gzipped_archives(tmp_path: pathlib.Path, compress: bool):
+    events = sample_events.synthetic_events(3, [sample_events.cluster_name], [1])
+    archive = _write_archive(tmp_path / "events.json", events, compress)
+
+    lines = replay.read_lines(str(archive))
+
+    assert [(number, json.loads(line)) for number, line in lines] == list(enumerate(events, start=1))
+
+
+@unittest.mock.patch("ecs_service_deployment_notifications.handler.process_event")
+def test_replay_processes_every_event(mock_process_event: unittest.mock.MagicMock, tmp_path: pathlib.Path):
+    events = sample_events.synthetic_events(10, [sample_events.cluster_name], [1])
+    archive = _write_archive(tmp_path / "events.json.gz", events, compress=True)
+    checkpoint = replay.Checkpoint(tmp_path / "checkpoint.json")
+
+    runner = replay.Replay(checkpoint, concurrency=4)
+    runner.run([str(archive)])
+
+    assert sorted(call.args[0]["id"] for call in mock_process_event.call_args_list) == [event["id"] for event in events]
+    assert runner.counts == {"processed": 10}
+    assert json.loads(checkpoint.path.read_text()) == {str(archive): 10}
+
+
+@unittest.mock.patch("ecs_service_deployment_notifications.metrics.flush", wraps=metrics.flush)
+@unittest.mock.patch("ecs_service_deployment_notifications.handler.process_event")
+def test_replay_flushes_metrics_as_it_goes(
+    mock_process_event: unittest.mock.MagicMock, mock_flush: unittest.mock.MagicMock, tmp_path: pathlib.Path
+):
+    mock_process_event.side_effect = lambda event: metrics.observe("ValidateDuration", 1.0)
+    events = sample_events.synthetic_events(10, [sample_events.cluster_name], [1])
+    archive = _write_archive(tmp_path / "events.json", events, compress=False)
+
+    replay.Replay(replay.Checkpoint(None), checkpoint_every=4).run([str(archive)])
+
+    assert mock_flush.call_count >= 3
+    assert not metrics.flush()
+
+
+@unittest.mock.patch("ecs_service_deployment_notifications.handler.process_event")
+def test_replay_resumes_after_checkpoint(mock_process_event: unittest.mock.MagicMock, tmp_path: pathlib.Path):
+    events = sample_events.synthetic_events(5, [sample_events.cluster_name], [1])
+    archive = _write_archive(tmp_path / "events.json", events)
+    (tmp_path / "checkpoint.json").write_text(json.dumps({str(archive): 3}))
+
+    runner = replay.Replay(replay.Checkpoint.load(tmp_path / "checkpoint.json"))
+    runner.run([str(archive)])
+
+    assert [call.args[0]["id"] for call in mock_process_event.call_args_list] == [event["id"] for event in events[3:]]
+    assert runner.counts == {"skipped": 3, "processed": 2}
+
+
+@unittest.mock.patch("ecs_service_deployment_notifications.handler.process_event")
+def test_replay_checkpoints_only_contiguous_lines(mock_process_event: unittest.mock.MagicMock, tmp_path: pathlib.Path):
+    events = sample_events.synthetic_events(4, [sample_events.cluster_name], [1])
+    archive = _write_archive(tmp_path / "events.json", events)
+    first_event_started = threading.Event()
+    release_first_event = threading.Event()
+
+    def process_event(event: dict) -> None:
+        if event["id"] == events[0]["id"]:
+            first_event_started.set()
+            release_first_event.wait(5)
+
+    mock_process_event.side_effect = process_event
+    checkpoint = replay.Checkpoint(tmp_path / "checkpoint.json")
+    runner = replay.Replay(checkpoint, concurrency=2, checkpoint_every=1)
+
+    thread = threading.Thread(target=runner.run, args=([str(archive)],))
+    thread.start()
+    first_event_started.wait(5)
+    time.sleep(0.1)
+    assert checkpoint.positions.get(str(archive), 0) == 0
+
+    release_first_event.set()
+    thread.join(5)
+    assert checkpoint.positions[str(archive)] == 4
+
+
+@unittest.mock.patch("ecs_service_deployment_notifications.handler.process_event")
+def test_replay_records_failed_and_invalid_events(mock_process_event: unittest.mock.MagicMock, tmp_path: pathlib.Path):
+    archive = tmp_path / "events.json"
+    archive.write_text(
+        f"{json.dumps(sample_events.event_completed)}\nnot json\n\n{json.dumps(sample_events.event_failed)}\n"
+    )
+    mock_process_event.side_effect = [None, ValueError("Unexpected event name")]
+    failures = tmp_path / "failures.json"
+
+    with open(failures, "w") as failures_file:
+        runner = replay.Replay(replay.Checkpoint(None), failures=failures_file)
+        runner.run([str(archive)])
+
+    assert runner.counts == {"processed": 1, "invalid": 1, "blank": 1, "failed": 1}
+    assert [json.loads(line) for line in failures.read_text().splitlines()] == [sample_events.event_failed]
+
+
+@unittest.mock.patch.dict(os.environ, environment | {"IDEMPOTENCY_STORE": "memory://"}, clear=True)
+def test_main_dry_run_prints_payloads_without_invoking(tmp_path: pathlib.Path, capsys: pytest.CaptureFixture):
+    archive = _write_archive(tmp_path / "events.json", [sample_events.event_completed])
+
+    with unittest.mock.patch("ecs_service_deployment_notifications.slack.get_lambda_client") as mock_get_lambda_client:
+        assert replay.main([str(archive), "--dry-run"]) == 0
+
+    mock_get_lambda_client.assert_not_called()
+    assert json.loads(capsys.readouterr().out) == {
+        "function_name": "test-arn",
+        "payload": sample_events.slack_payload_completed,
+    }
+    assert replay.handler.get_runtime().guard is None
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        pytest.param({"SLACK_SINK": "webhook"}, id="webhook_sink"),
+        pytest.param(
+            {"SLACK_SINK": "api", "SLACK_BOT_TOKEN": "xoxb-token", "SLACK_MESSAGE_MODE": "update"},
+            id="api_sink",
+        ),
+        pytest.param({"DIGEST_WINDOW_SECONDS": "300", "DIGEST_STORE": "memory://"}, id="digest"),
+    ],
+)
+def test_main_dry_run_prints_payloads_without_posting_to_slack(
+    tmp_path: pathlib.Path, capsys: pytest.CaptureFixture, options: dict
+):
+    archive = _write_archive(tmp_path / "events.json", [sample_events.event_completed])
+
+    with stub_server.StubServer(default_response=(200, {}, b'{"ok": true}')) as stub_slack:
+        with unittest.mock.patch.dict(
+            os.environ,
+            environment
+            | {"SLACK_WEBHOOK_URL": f"{stub_slack.url}/services/T000/B000/XXXX", "SLACK_API_URL": stub_slack.url}
+            | options,
+            clear=True,
+        ):
+            assert replay.main([str(archive), "--dry-run"]) == 0
+
+    assert stub_slack.requests == []
+    assert json.loads(capsys.readouterr().out)["payload"] == sample_events.slack_payload_completed
+    assert replay.handler.get_runtime().digest_buffer is None
+
+
+@unittest.mock.patch.dict(os.environ, environment, clear=True)
+def test_main_returns_failure_when_events_fail(tmp_path: pathlib.Path):
+    archive = _write_archive(tmp_path / "events.json", [sample_events.event_completed])
+
+    with unittest.mock.patch("ecs_service_deployment_notifications.slack.get_lambda_client") as mock_get_lambda_client:
+        mock_get_lambda_client.return_value.invoke.side_effect = Exception("Lambda unavailable")
+        assert replay.main([str(archive), "--rate", "100"]) == 1
+
+    assert replay.handler.get_runtime().limiter is not None
+
+
+@pytest.mark.parametrize("argv", [["--concurrency", "0"], ["--rate", "-1"], ["--checkpoint-every", "0"]])
+def test_parse_args_rejects_invalid_options(argv: list[str]):
+    with pytest.raises(SystemExit):
+        replay.parse_args(["events.json", *argv])
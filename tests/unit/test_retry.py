@@ -0,0 +1,82 @@
+import http.client
+import unittest.mock
+
+import botocore.exceptions
+import ecs_service_deployment_notifications.metrics as metrics
+import ecs_service_deployment_notifications.retry as retry
+import ecs_service_deployment_notifications.slack as slack
+import ecs_service_deployment_notifications.transport as transport
+import pytest
+
+
+def _client_error(code: str, status: int) -> botocore.exceptions.ClientError:
+    return botocore.exceptions.ClientError(
+        {"Error": {"Code": code, "Message": ""}, "ResponseMetadata": {"HTTPStatusCode": status}}, "Invoke"
+    )
+
+
+@pytest.mark.parametrize(
+    "exc, expected",
+    [
+        pytest.param(_client_error("TooManyRequestsException", 429), True, id="lambda_throttled"),
+        pytest.param(_client_error("ServiceException", 500), True, id="lambda_service_error"),
+        pytest.param(_client_error("ResourceNotFoundException", 404), False, id="lambda_not_found"),
+        pytest.param(botocore.exceptions.EndpointConnectionError(endpoint_url="https://lambda"), True, id="boto"),
+        pytest.param(transport.InvokeError(503, "ServiceUnavailable", ""), True, id="http_unavailable"),
+        pytest.param(transport.InvokeError(400, "InvalidRequestContentException", ""), False, id="http_bad_request"),
+        pytest.param(slack.SlackError(429, "rate_limited", 60), True, id="slack_rate_limited"),
+        pytest.param(slack.SlackError(200, "channel_not_found"), False, id="slack_channel_not_found"),
+        pytest.param(http.client.RemoteDisconnected(), True, id="disconnected"),
+        pytest.param(TimeoutError(), True, id="timeout"),
+        pytest.param(ValueError(), False, id="value_error"),
+    ],
+)
+def test_retryable(exc: Exception, expected: bool):
+    assert retry.retryable(exc) is expected
+
+
+def test_delay_is_jittered_exponential_backoff_up_to_max():
+    policy = retry.RetryPolicy(max_attempts=10, base_delay=0.1, max_delay=1)
+
+    assert [policy.delay(attempt, random=lambda: 1.0) for attempt in range(6)] == [0.1, 0.2, 0.4, 0.8, 1, 1]
+    assert policy.delay(3, random=lambda: 0.5) == 0.4
+
+
+def test_call_retries_retryable_errors_until_success():
+    function = unittest.mock.MagicMock(side_effect=[TimeoutError(), TimeoutError(), "sent"])
+    sleep = unittest.mock.MagicMock()
+
+    assert retry.call(function, retry.RetryPolicy(max_attempts=3), sleep=sleep) == "sent"
+    assert function.call_count == 3
+    assert sleep.call_count == 2
+    assert metrics.flush() == {(): {"NotificationRetries": 2}}
+
+
+def test_call_raises_after_max_attempts():
+    function = unittest.mock.MagicMock(side_effect=TimeoutError())
+
+    with pytest.raises(TimeoutError):
+        retry.call(function, retry.RetryPolicy(max_attempts=3), sleep=unittest.mock.MagicMock())
+
+    assert function.call_count == 3
+
+
+def test_call_does_not_retry_other_errors():
+    function = unittest.mock.MagicMock(side_effect=ValueError())
+
+    with pytest.raises(ValueError):
+        retry.call(function, retry.RetryPolicy(max_attempts=3), sleep=unittest.mock.MagicMock())
+
+    function.assert_called_once()
+
+
+def test_call_does_not_retry_past_deadline():
+    function = unittest.mock.MagicMock(side_effect=TimeoutError())
+    sleep = unittest.mock.MagicMock()
+    policy = retry.RetryPolicy(max_attempts=5, base_delay=1, max_delay=1)
+
+    with pytest.raises(TimeoutError):
+        retry.call(function, policy, deadline=10.0, sleep=sleep, clock=lambda: 10.0)
+
+    function.assert_called_once()
+    sleep.assert_not_called()
@@ -0,0 +1,70 @@
+import ecs_service_deployment_notifications.routing as routing
+import pytest
+
+
+def test_prefix_trie_returns_longest_matching_prefix():
+    trie = routing.PrefixTrie()
+    trie.insert("", "default")
+    trie.insert("payments-", "payments")
+    trie.insert("payments-api", "payments-api")
+
+    assert trie.longest_prefix("catalogue") == "default"
+    assert trie.longest_prefix("payments-worker") == "payments"
+    assert trie.longest_prefix("payments-api-v2") == "payments-api"
+    assert trie.longest_prefix("payments") == "default"
+
+
+def test_prefix_trie_without_match():
+    trie = routing.PrefixTrie()
+    trie.insert("payments-", "payments")
+
+    assert trie.longest_prefix("catalogue") is None
+
+
+@pytest.fixture
+def routing_table() -> routing.RoutingTable:
+    return routing.RoutingTable.from_routes(
+        [
+            {"cluster": "public", "channel": "public-deployments"},
+            {"cluster": "public", "service_prefix": "payments-", "channel": "payments-deployments"},
+            {"cluster": "protected", "service_prefix": "admin-", "channel": "admin-deployments"},
+        ]
+    )
+
+
+@pytest.mark.parametrize(
+    "cluster_name, service_name, expected_channel",
+    [
+        ("public", "catalogue", "public-deployments"),
+        ("public", "payments-api", "payments-deployments"),
+        ("protected", "admin-frontend", "admin-deployments"),
+        ("protected", "catalogue", None),
+        ("other", "catalogue", None),
+    ],
+)
+def test_routing_table_lookup(
+    routing_table: routing.RoutingTable,
+    cluster_name: str,
+    service_name: str,
+    expected_channel: str | None,
+):
+    assert routing_table.lookup(cluster_name, service_name) == expected_channel
+
+
+def test_routing_table_cluster_names(routing_table: routing.RoutingTable):
+    assert routing_table.cluster_names == ["public", "protected"]
+
+
+def test_routing_table_watches(routing_table: routing.RoutingTable):
+    assert routing_table.watches("protected")
+    assert not routing_table.watches("other")
+
+
+def test_routing_table_channels(routing_table: routing.RoutingTable):
+    assert routing_table.channels == {"public-deployments", "payments-deployments", "admin-deployments"}
+
+
+def test_routing_table_rejects_incomplete_route():
+    with pytest.raises(ValueError):
+        routing.RoutingTable.from_routes([{"cluster": "public"}])
+
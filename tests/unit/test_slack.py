@@ -1,8 +1,12 @@
+import json
 import unittest.mock
 
 import boto3
 import botocore.stub
+import ecs_service_deployment_notifications.messages as messages
 import ecs_service_deployment_notifications.slack as slack
+import ecs_service_deployment_notifications.store as store
+import fixtures.stub_server as stub_server
 import pytest
 
 
@@ -59,8 +63,9 @@ def test_send_notification_with_color(mock_invoke_lambda: unittest.mock.MagicMoc
         reason=reason,
     )
 
-    mock_invoke_lambda.assert_called_once_with(
-        lambda_arn,
+    mock_invoke_lambda.assert_called_once()
+    assert mock_invoke_lambda.call_args.args[0] == lambda_arn
+    assert json.loads(mock_invoke_lambda.call_args.args[1]) == (
         {
             "channels": [channel],
             "username": "ecs_service_deployment_notifications",
@@ -73,7 +78,7 @@ def test_send_notification_with_color(mock_invoke_lambda: unittest.mock.MagicMoc
                     {"short": False, "title": "Reason", "value": reason},
                 ],
             },
-        },
+        }
     )
 
 
@@ -95,8 +100,9 @@ def test_send_notification_without_color(mock_invoke_lambda: unittest.mock.Magic
         reason=reason,
     )
 
-    mock_invoke_lambda.assert_called_once_with(
-        lambda_arn,
+    mock_invoke_lambda.assert_called_once()
+    assert mock_invoke_lambda.call_args.args[0] == lambda_arn
+    assert json.loads(mock_invoke_lambda.call_args.args[1]) == (
         {
             "channels": [channel],
             "username": "ecs_service_deployment_notifications",
@@ -108,5 +114,358 @@ def test_send_notification_without_color(mock_invoke_lambda: unittest.mock.Magic
                     {"short": False, "title": "Reason", "value": reason},
                 ]
             },
-        },
+        }
     )
+
+
+def test_aggregated_payloads_renders_one_row_per_service():
+    payloads = slack.aggregated_payloads(
+        description="ECS service deployment completed",
+        channel="event-integ-recycle",
+        services=[("cluster-name", "service-1"), ("cluster-name", "service-2")],
+        reason="No reason, just felt like it",
+        color="good",
+    )
+
+    assert [json.loads(payload) for payload in payloads] == [
+        {
+            "channels": ["event-integ-recycle"],
+            "username": "ecs_service_deployment_notifications",
+            "text": "ECS service deployment completed",
+            "message_content": {
+                "color": "good",
+                "fields": [
+                    {"short": True, "title": "Service Name", "value": "service-1"},
+                    {"short": True, "title": "Cluster Name", "value": "cluster-name"},
+                    {"short": True, "title": "Service Name", "value": "service-2"},
+                    {"short": True, "title": "Cluster Name", "value": "cluster-name"},
+                    {"short": False, "title": "Reason", "value": "No reason, just felt like it"},
+                ],
+            },
+        }
+    ]
+
+
+@pytest.mark.parametrize("max_bytes", [1024, 4096])
+def test_aggregated_payloads_splits_into_chunks_under_limit(max_bytes: int):
+    services = [("cluster-name", f"service-{index:03}") for index in range(100)]
+
+    payloads = [
+        json.loads(payload)
+        for payload in slack.aggregated_payloads(
+            description="ECS service deployment completed",
+            channel="event-integ-recycle",
+            services=services,
+            reason="No reason",
+            max_bytes=max_bytes,
+        )
+    ]
+
+    assert len(payloads) > 1
+    assert all(len(json.dumps(payload).encode()) <= max_bytes for payload in payloads)
+    assert all(payload["message_content"]["fields"][-1]["title"] == "Reason" for payload in payloads)
+    assert [
+        field["value"]
+        for payload in payloads
+        for field in payload["message_content"]["fields"]
+        if field["title"] == "Service Name"
+    ] == [service_name for _, service_name in services]
+
+
+@unittest.mock.patch("ecs_service_deployment_notifications.slack.aggregated_payloads")
+@unittest.mock.patch("ecs_service_deployment_notifications.slack.invoke_lambda")
+def test_send_aggregated_notification_invokes_per_chunk(
+    mock_invoke_lambda: unittest.mock.MagicMock,
+    mock_aggregated_payloads: unittest.mock.MagicMock,
+):
+    lambda_arn = "arn:aws:lambda:eu-west-2:123456789012:function:example-function:1"
+    mock_aggregated_payloads.return_value = [{"text": "1"}, {"text": "2"}]
+
+    slack.send_aggregated_notification(
+        lambda_arn=lambda_arn,
+        description="ECS service deployment completed",
+        channel="event-integ-recycle",
+        services=[("cluster-name", "service-name")],
+        reason="No reason",
+    )
+
+    assert mock_invoke_lambda.call_args_list == [
+        unittest.mock.call(lambda_arn, {"text": "1"}),
+        unittest.mock.call(lambda_arn, {"text": "2"}),
+    ]
+
+
+def test_invoke_lambda_with_configured_transport(lambda_client_stubber: botocore.stub.Stubber):
+    lambda_arn = "arn:aws:lambda:eu-west-2:123456789012:function:example-function:1"
+    lambda_transport = unittest.mock.MagicMock()
+
+    slack.configure_transport(lambda_transport)
+    try:
+        with lambda_client_stubber:
+            slack.invoke_lambda(lambda_arn, {"text": "hoooray!"})
+    finally:
+        slack.configure_transport(None)
+
+    lambda_transport.invoke.assert_called_once_with(lambda_arn, b'{"text": "hoooray!"}')
+
+
+@pytest.fixture
+def stub_slack():
+    with stub_server.StubServer(default_response=(200, {"Content-Type": "text/plain"}, b"ok")) as server:
+        yield server
+
+
+payload = {
+    "channels": ["event-integ-recycle"],
+    "username": "ecs_service_deployment_notifications",
+    "text": "ECS service deployment completed",
+    "message_content": {
+        "fields": [{"short": True, "title": "Service Name", "value": "service-name"}],
+        "color": "good",
+    },
+}
+
+message = {
+    "channel": "event-integ-recycle",
+    "username": "ecs_service_deployment_notifications",
+    "text": "ECS service deployment completed",
+    "attachments": [
+        {
+            "fields": [{"short": True, "title": "Service Name", "value": "service-name"}],
+            "color": "good",
+        }
+    ],
+}
+
+
+def test_slack_messages_turns_payload_into_one_message_per_channel():
+    assert slack.slack_messages(payload | {"channels": ["one", "two"]}) == [
+        message | {"channel": "one"},
+        message | {"channel": "two"},
+    ]
+
+
+def test_webhook_sink_posts_message_over_kept_alive_connection(stub_slack: stub_server.StubServer):
+    sink = slack.SlackSink.webhook(f"{stub_slack.url}/services/T000/B000/XXXX")
+
+    sink.send(json.dumps(payload).encode())
+    sink.send(json.dumps(payload).encode())
+
+    [(path, headers, body, client_address), (_, _, _, second_client_address)] = stub_slack.requests
+    assert path == "/services/T000/B000/XXXX"
+    assert "Authorization" not in headers
+    assert json.loads(body) == message
+    assert second_client_address == client_address
+
+
+def test_api_sink_posts_message_with_token(stub_slack: stub_server.StubServer):
+    stub_slack.default_response = (200, {"Content-Type": "application/json"}, b'{"ok": true}')
+    sink = slack.SlackSink.api("xoxb-token", api_url=f"{stub_slack.url}/api/")
+
+    sink.send(json.dumps(payload).encode())
+
+    [(path, headers, body, _)] = stub_slack.requests
+    assert path == "/api/chat.postMessage"
+    assert headers["Authorization"] == "Bearer xoxb-token"
+    assert json.loads(body) == message
+
+
+def test_api_sink_raises_on_error_response(stub_slack: stub_server.StubServer):
+    stub_slack.default_response = (200, {}, b'{"ok": false, "error": "channel_not_found"}')
+    sink = slack.SlackSink.api("xoxb-token", api_url=stub_slack.url)
+
+    with pytest.raises(slack.SlackError) as exc_info:
+        sink.send(json.dumps(payload).encode())
+
+    assert exc_info.value.error == "channel_not_found"
+
+
+def test_sink_waits_for_retry_after(stub_slack: stub_server.StubServer):
+    stub_slack.responses = [(429, {"Retry-After": "3"}, b""), (429, {"Retry-After": "1"}, b"")]
+    sleep = unittest.mock.MagicMock()
+    sink = slack.SlackSink.webhook(stub_slack.url, sleep=sleep)
+
+    sink.send(json.dumps(payload).encode())
+
+    assert len(stub_slack.requests) == 3
+    assert sleep.call_args_list == [unittest.mock.call(3.0), unittest.mock.call(1.0)]
+
+
+def test_sink_waits_default_delay_for_unreadable_retry_after(stub_slack: stub_server.StubServer):
+    stub_slack.responses = [(429, {"Retry-After": "soon"}, b"")]
+    sleep = unittest.mock.MagicMock()
+    sink = slack.SlackSink.webhook(stub_slack.url, sleep=sleep)
+
+    sink.send(json.dumps(payload).encode())
+
+    assert len(stub_slack.requests) == 2
+    sleep.assert_called_once_with(slack.DEFAULT_RETRY_AFTER)
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        pytest.param(None, slack.DEFAULT_RETRY_AFTER, id="missing"),
+        pytest.param("3", 3.0, id="seconds"),
+        pytest.param("0.5", 0.5, id="fraction"),
+        pytest.param("Wed, 21 Oct 2015 07:28:00 GMT", 10.0, id="http_date"),
+        pytest.param("Wed, 21 Oct 2015 07:27:00 GMT", 0.0, id="http_date_passed"),
+        pytest.param("soon", slack.DEFAULT_RETRY_AFTER, id="not_a_number"),
+        pytest.param("-1", slack.DEFAULT_RETRY_AFTER, id="negative"),
+        pytest.param("nan", slack.DEFAULT_RETRY_AFTER, id="nan"),
+    ],
+)
+def test_retry_after_seconds(value: str | None, expected: float):
+    assert slack.retry_after_seconds(value, now=lambda: 1445412470.0) == expected
+
+
+@pytest.mark.parametrize(
+    "responses, max_retries, max_retry_after",
+    [
+        pytest.param([(429, {"Retry-After": "1"}, b"")] * 3, 2, 30, id="too_many_retries"),
+        pytest.param([(429, {"Retry-After": "60"}, b"")], 2, 30, id="retry_after_too_long"),
+    ],
+)
+def test_sink_raises_when_rate_limited_too_long(
+    stub_slack: stub_server.StubServer, responses: list, max_retries: int, max_retry_after: float
+):
+    stub_slack.responses = list(responses)
+    sink = slack.SlackSink.webhook(
+        stub_slack.url, max_retries=max_retries, max_retry_after=max_retry_after, sleep=unittest.mock.MagicMock()
+    )
+
+    with pytest.raises(slack.SlackError) as exc_info:
+        sink.send(json.dumps(payload).encode())
+
+    assert exc_info.value.status == 429
+    assert exc_info.value.retry_after == float(responses[-1][1]["Retry-After"])
+
+
+def test_sink_does_not_wait_for_retry_after_past_deadline(stub_slack: stub_server.StubServer):
+    stub_slack.responses = [(429, {"Retry-After": "3"}, b"")]
+    sleep = unittest.mock.MagicMock()
+    sink = slack.SlackSink.webhook(stub_slack.url, sleep=sleep, clock=lambda: 100.0)
+
+    with pytest.raises(slack.SlackError) as exc_info:
+        sink.send(json.dumps(payload).encode(), deadline=102.0)
+
+    assert exc_info.value.status == 429
+    assert len(stub_slack.requests) == 1
+    sleep.assert_not_called()
+
+
+def test_sink_raises_on_error_status(stub_slack: stub_server.StubServer):
+    stub_slack.default_response = (404, {}, b"no_service")
+    sink = slack.SlackSink.webhook(stub_slack.url)
+
+    with pytest.raises(slack.SlackError) as exc_info:
+        sink.send(json.dumps(payload).encode())
+
+    assert str(exc_info.value) == "no_service (404)"
+
+
+@unittest.mock.patch("ecs_service_deployment_notifications.slack.invoke_lambda")
+def test_deliver_uses_configured_sink(mock_invoke_lambda: unittest.mock.MagicMock):
+    sink = unittest.mock.MagicMock()
+
+    slack.configure_sink(sink)
+    slack.deliver("test-arn", b"{}", deadline=12.5)
+
+    sink.send.assert_called_once_with(b"{}", 12.5)
+    mock_invoke_lambda.assert_not_called()
+
+
+def test_warm_opens_sink_connection(stub_slack: stub_server.StubServer):
+    sink = slack.SlackSink.webhook(f"{stub_slack.url}/services/T000/B000/XXXX")
+    slack.configure_sink(sink)
+
+    slack.warm()
+    [connection] = sink.pool._idle.queue
+    slack.deliver("", json.dumps(payload).encode())
+
+    [(_, _, _, client_address)] = stub_slack.requests
+    assert client_address == connection.sock.getsockname()
+
+
+@unittest.mock.patch("ecs_service_deployment_notifications.slack.get_lambda_client")
+def test_warm_creates_lambda_client_without_sink(mock_get_lambda_client: unittest.mock.MagicMock):
+    slack.warm()
+
+    mock_get_lambda_client.assert_called_once_with()
+
+
+def _send_deployment_notification(description: str, color: str | None = None) -> None:
+    slack.send_deployment_notification(
+        lambda_arn="",
+        description=description,
+        channel="event-integ-recycle",
+        cluster_name="cluster-name",
+        service_name="service-name",
+        reason="No reason",
+        deployment_id="ecs-svc/123",
+        color=color,
+    )
+
+
+@pytest.mark.parametrize(
+    "mode, expected_requests",
+    [
+        pytest.param(
+            "update",
+            [
+                ("/api/chat.postMessage", {"channel": "event-integ-recycle"}),
+                ("/api/chat.update", {"channel": "C123", "ts": "1700000000.000100"}),
+                ("/api/chat.update", {"channel": "C123", "ts": "1700000000.000100"}),
+            ],
+            id="update",
+        ),
+        pytest.param(
+            "thread",
+            [
+                ("/api/chat.postMessage", {"channel": "event-integ-recycle"}),
+                ("/api/chat.postMessage", {"channel": "C123", "thread_ts": "1700000000.000100"}),
+                ("/api/chat.postMessage", {"channel": "C123", "thread_ts": "1700000000.000100"}),
+            ],
+            id="thread",
+        ),
+    ],
+)
+def test_send_deployment_notification_posts_once_per_deployment(
+    stub_slack: stub_server.StubServer, mode: str, expected_requests: list
+):
+    stub_slack.default_response = (200, {}, b'{"ok": true, "channel": "C123", "ts": "1700000000.000100"}')
+    slack.configure_sink(slack.SlackSink.api("xoxb-token", api_url=f"{stub_slack.url}/api"))
+    slack.configure_messages(messages.MessageStore(store.InMemoryStore(), ttl=60, cache_size=10), mode)
+
+    _send_deployment_notification("ECS service deployment in progress")
+    _send_deployment_notification("ECS service deployment completed", "good")
+    _send_deployment_notification("ECS service deployment failed", "danger")
+
+    requests = [(path, json.loads(body)) for path, _, body, _ in stub_slack.requests]
+    for (path, body), (expected_path, expected_fields) in zip(requests, expected_requests, strict=True):
+        assert path == expected_path
+        assert body.items() >= expected_fields.items()
+    assert [body["text"] for _, body in requests] == [
+        "ECS service deployment in progress",
+        "ECS service deployment completed",
+        "ECS service deployment failed",
+    ]
+    assert requests[2][1]["attachments"][0]["color"] == "danger"
+
+
+def test_send_deployment_notification_skips_unchanged_message(stub_slack: stub_server.StubServer):
+    stub_slack.default_response = (200, {}, b'{"ok": true, "channel": "C123", "ts": "1700000000.000100"}')
+    slack.configure_sink(slack.SlackSink.api("xoxb-token", api_url=stub_slack.url))
+    slack.configure_messages(messages.MessageStore(store.InMemoryStore(), ttl=60, cache_size=10), "update")
+
+    _send_deployment_notification("ECS service deployment in progress")
+    _send_deployment_notification("ECS service deployment in progress")
+
+    assert [path for path, _, _, _ in stub_slack.requests] == ["/chat.postMessage"]
+
+
+@unittest.mock.patch("ecs_service_deployment_notifications.slack.deliver")
+def test_send_deployment_notification_without_message_store_delivers(mock_deliver: unittest.mock.MagicMock):
+    _send_deployment_notification("ECS service deployment completed", "good")
+
+    mock_deliver.assert_called_once()
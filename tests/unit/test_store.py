@@ -0,0 +1,213 @@
+import json
+import time
+
+import boto3
+import botocore.stub
+import ecs_service_deployment_notifications.store as store
+import pytest
+
+
+@pytest.fixture(params=["memory://", "sqlite://"])
+def local_store(request: pytest.FixtureRequest) -> store.Store:
+    return store.from_url(request.param)
+
+
+def test_put_and_get_item(local_store: store.Store):
+    assert local_store.put_item("key", {"status": "claimed"})
+
+    assert local_store.get_item("key") == {"status": "claimed"}
+
+
+def test_get_missing_item(local_store: store.Store):
+    assert local_store.get_item("key") is None
+
+
+def test_put_item_if_not_exists(local_store: store.Store):
+    assert local_store.put_item("key", {"value": 1}, if_not_exists=True)
+    assert not local_store.put_item("key", {"value": 2}, if_not_exists=True)
+
+    assert local_store.get_item("key") == {"value": 1}
+
+
+def test_expired_items_are_absent(local_store: store.Store):
+    local_store.put_item("key", {"value": 1}, expires_at=time.time() - 1)
+
+    assert local_store.get_item("key") is None
+    assert local_store.put_item("key", {"value": 2}, expires_at=time.time() + 60, if_not_exists=True)
+    assert local_store.get_item("key") == {"value": 2}
+
+
+def test_delete_item(local_store: store.Store):
+    local_store.put_item("key", {"value": 1})
+    local_store.delete_item("key")
+
+    assert local_store.get_item("key") is None
+
+
+def test_append_item(local_store: store.Store):
+    local_store.append_item("key", {"value": 1}, expires_at=time.time() + 60)
+    local_store.append_item("key", {"value": 2}, expires_at=time.time() + 60)
+
+    assert local_store.get_item("key") == {"entries": [{"value": 1}, {"value": 2}]}
+
+
+def test_add_member_keeps_each_member_once(local_store: store.Store):
+    for member in ["b", "a", "b", "a"]:
+        local_store.add_member("key", member, expires_at=time.time() + 60)
+
+    assert local_store.get_item("key") == {"members": ["a", "b"]}
+
+
+def test_append_item_replaces_expired_entries(local_store: store.Store):
+    local_store.append_item("key", {"value": 1}, expires_at=time.time() - 1)
+    local_store.append_item("key", {"value": 2})
+
+    assert local_store.get_item("key") == {"entries": [{"value": 2}]}
+
+
+def test_in_memory_store_evicts_oldest_items_over_maxsize():
+    memory_store = store.InMemoryStore(maxsize=2)
+    memory_store.put_item("a", {"value": 1})
+    memory_store.put_item("b", {"value": 2})
+    memory_store.put_item("a", {"value": 3})
+    memory_store.put_item("c", {"value": 4})
+
+    assert memory_store.get_item("a") == {"value": 3}
+    assert memory_store.get_item("b") is None
+    assert memory_store.get_item("c") == {"value": 4}
+
+
+def test_sqlite_store_persists_to_file(tmp_path):
+    path = tmp_path / "store.db"
+    store.from_url(f"sqlite://{path}").put_item("key", {"value": 1})
+
+    assert store.from_url(f"sqlite://{path}").get_item("key") == {"value": 1}
+
+
+def test_from_url_dynamodb():
+    dynamodb_store = store.from_url("dynamodb://idempotency")
+
+    assert isinstance(dynamodb_store, store.DynamoDBStore)
+    assert dynamodb_store.table_name == "idempotency"
+
+
+def test_from_url_rejects_unknown_scheme():
+    with pytest.raises(ValueError) as exc_info:
+        store.from_url("redis://localhost")
+
+    assert str(exc_info.value) == "Unsupported store URL redis://localhost"
+
+
+@pytest.fixture
+def dynamodb_client():
+    return boto3.client("dynamodb", region_name="eu-west-2")
+
+
+def test_dynamodb_store_put_item_if_not_exists(dynamodb_client):
+    stubber = botocore.stub.Stubber(dynamodb_client)
+    stubber.add_response(
+        method="put_item",
+        service_response={},
+        expected_params={
+            "TableName": "idempotency",
+            "Item": {"pk": {"S": "key"}, "item": {"S": json.dumps({"value": 1})}, "expires_at": {"N": "2000000000"}},
+            "ConditionExpression": "attribute_not_exists(pk) OR expires_at <= :now",
+            "ExpressionAttributeValues": {":now": botocore.stub.ANY},
+        },
+    )
+    stubber.add_client_error(method="put_item", service_error_code="ConditionalCheckFailedException")
+
+    with stubber:
+        dynamodb_store = store.DynamoDBStore("idempotency", client=dynamodb_client)
+        assert dynamodb_store.put_item("key", {"value": 1}, expires_at=2000000000, if_not_exists=True)
+        assert not dynamodb_store.put_item("key", {"value": 1}, expires_at=2000000000, if_not_exists=True)
+
+    stubber.assert_no_pending_responses()
+
+
+def test_dynamodb_store_get_item(dynamodb_client):
+    stubber = botocore.stub.Stubber(dynamodb_client)
+    stubber.add_response(
+        method="get_item",
+        service_response={"Item": {"pk": {"S": "key"}, "item": {"S": json.dumps({"value": 1})}}},
+        expected_params={"TableName": "idempotency", "Key": {"pk": {"S": "key"}}, "ConsistentRead": True},
+    )
+    stubber.add_response(
+        method="get_item",
+        service_response={
+            "Item": {"pk": {"S": "key"}, "item": {"S": json.dumps({"value": 1})}, "expires_at": {"N": "1"}}
+        },
+    )
+    stubber.add_response(method="get_item", service_response={})
+
+    with stubber:
+        dynamodb_store = store.DynamoDBStore("idempotency", client=dynamodb_client)
+        assert dynamodb_store.get_item("key") == {"value": 1}
+        assert dynamodb_store.get_item("key") is None
+        assert dynamodb_store.get_item("key") is None
+
+    stubber.assert_no_pending_responses()
+
+
+def test_dynamodb_store_append_item(dynamodb_client):
+    stubber = botocore.stub.Stubber(dynamodb_client)
+    stubber.add_response(
+        method="update_item",
+        service_response={},
+        expected_params={
+            "TableName": "digests",
+            "Key": {"pk": {"S": "key"}},
+            "UpdateExpression": (
+                "SET entries = list_append(if_not_exists(entries, :empty), :entry), expires_at = :expires_at"
+            ),
+            "ExpressionAttributeValues": {
+                ":empty": {"L": []},
+                ":entry": {"L": [{"S": json.dumps({"value": 1})}]},
+                ":expires_at": {"N": "2000000000"},
+            },
+        },
+    )
+    stubber.add_response(
+        method="get_item",
+        service_response={
+            "Item": {
+                "pk": {"S": "key"},
+                "entries": {"L": [{"S": json.dumps({"value": 1})}]},
+                "expires_at": {"N": "2000000000"},
+            }
+        },
+    )
+
+    with stubber:
+        dynamodb_store = store.DynamoDBStore("digests", client=dynamodb_client)
+        dynamodb_store.append_item("key", {"value": 1}, expires_at=2000000000)
+        assert dynamodb_store.get_item("key") == {"entries": [{"value": 1}]}
+
+    stubber.assert_no_pending_responses()
+
+
+def test_dynamodb_store_add_member(dynamodb_client):
+    stubber = botocore.stub.Stubber(dynamodb_client)
+    stubber.add_response(
+        method="update_item",
+        service_response={},
+        expected_params={
+            "TableName": "digests",
+            "Key": {"pk": {"S": "key"}},
+            "UpdateExpression": "ADD members :member SET expires_at = :expires_at",
+            "ExpressionAttributeValues": {":member": {"SS": ["channel"]}, ":expires_at": {"N": "2000000000"}},
+        },
+    )
+    stubber.add_response(
+        method="get_item",
+        service_response={
+            "Item": {"pk": {"S": "key"}, "members": {"SS": ["channel"]}, "expires_at": {"N": "2000000000"}}
+        },
+    )
+
+    with stubber:
+        dynamodb_store = store.DynamoDBStore("digests", client=dynamodb_client)
+        dynamodb_store.add_member("key", "channel", expires_at=2000000000)
+        assert dynamodb_store.get_item("key") == {"members": ["channel"]}
+
+    stubber.assert_no_pending_responses()
@@ -0,0 +1,120 @@
+import datetime
+import json
+import unittest.mock
+
+import botocore.auth
+import botocore.awsrequest
+import botocore.credentials
+import ecs_service_deployment_notifications.transport as transport
+import fixtures.stub_server as stub_server
+import pytest
+
+lambda_arn = "arn:aws:lambda:eu-west-2:123456789012:function:example-function:1"
+now = datetime.datetime(2020, 5, 23, 11, 11, 11, tzinfo=datetime.timezone.utc)
+
+
+@pytest.mark.parametrize("session_token", [None, "session-token"])
+def test_sign_matches_botocore(session_token: str | None):
+    credentials = transport.Credentials("AKIDEXAMPLE", "wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY", session_token)
+    path = f"/2015-03-31/functions/{lambda_arn.replace(':', '%3A')}/invocations"
+    headers = {"Content-Type": "application/json", "X-Amz-Invocation-Type": "Event"}
+    body = b'{"text": "hoooray!"}'
+
+    signed_headers = transport.sign(
+        "POST", "lambda.eu-west-2.amazonaws.com", path, headers, body, credentials, "eu-west-2", "lambda", now
+    )
+
+    request = botocore.awsrequest.AWSRequest(
+        method="POST", url=f"https://lambda.eu-west-2.amazonaws.com{path}", headers=dict(headers), data=body
+    )
+    with unittest.mock.patch("botocore.auth.get_current_datetime", return_value=now.replace(tzinfo=None)):
+        botocore.auth.SigV4Auth(
+            botocore.credentials.Credentials("AKIDEXAMPLE", "wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY", session_token),
+            "lambda",
+            "eu-west-2",
+        ).add_auth(request)
+
+    assert signed_headers["Authorization"] == request.headers["Authorization"]
+    assert signed_headers["X-Amz-Date"] == "20200523T111111Z"
+    assert signed_headers.get("X-Amz-Security-Token") == session_token
+
+
+def test_credentials_from_environ():
+    credentials = transport.Credentials.from_environ(
+        {"AWS_ACCESS_KEY_ID": "access", "AWS_SECRET_ACCESS_KEY": "secret", "AWS_SESSION_TOKEN": "token"}
+    )
+
+    assert credentials == transport.Credentials("access", "secret", "token")
+
+
+@pytest.fixture
+def stub_lambda():
+    with stub_server.StubServer(default_response=(202, {}, b"")) as server:
+        yield server
+
+
+@pytest.fixture
+def lambda_transport(stub_lambda) -> transport.LambdaInvokeTransport:
+    return transport.LambdaInvokeTransport(
+        region="eu-west-2",
+        credentials=transport.Credentials("access", "secret"),
+        endpoint=stub_lambda.url,
+    )
+
+
+def test_invoke_sends_signed_event_invocation(stub_lambda, lambda_transport: transport.LambdaInvokeTransport):
+    lambda_transport.invoke(lambda_arn, b'{"text": "hoooray!"}')
+
+    [(path, headers, body, _)] = stub_lambda.requests
+    assert path == (
+        "/2015-03-31/functions/"
+        "arn%3Aaws%3Alambda%3Aeu-west-2%3A123456789012%3Afunction%3Aexample-function%3A1/invocations"
+    )
+    assert headers["X-Amz-Invocation-Type"] == "Event"
+    assert headers["Authorization"].startswith("AWS4-HMAC-SHA256 Credential=access/")
+    assert body == b'{"text": "hoooray!"}'
+
+
+def test_invoke_reuses_connection(stub_lambda, lambda_transport: transport.LambdaInvokeTransport):
+    for _ in range(3):
+        lambda_transport.invoke(lambda_arn, b"{}")
+
+    assert len({client_address for _, _, _, client_address in stub_lambda.requests}) == 1
+
+
+def test_warm_opens_connection_for_next_invoke(stub_lambda, lambda_transport: transport.LambdaInvokeTransport):
+    lambda_transport.pool.warm()
+    [connection] = lambda_transport.pool._idle.queue
+
+    lambda_transport.invoke(lambda_arn, b"{}")
+
+    [(_, _, _, client_address)] = stub_lambda.requests
+    assert client_address == connection.sock.getsockname()
+
+
+def test_warm_replaces_idle_connections(stub_lambda, lambda_transport: transport.LambdaInvokeTransport):
+    lambda_transport.invoke(lambda_arn, b"{}")
+    [idle] = lambda_transport.pool._idle.queue
+
+    lambda_transport.pool.warm()
+
+    [connection] = lambda_transport.pool._idle.queue
+    assert connection is not idle
+    assert idle.sock is None
+
+
+def test_invoke_raises_on_error(stub_lambda, lambda_transport: transport.LambdaInvokeTransport):
+    stub_lambda.responses.append(
+        (
+            429,
+            {"x-amzn-ErrorType": "TooManyRequestsException:http://internal.amazon.com/coral/"},
+            json.dumps({"message": "Rate exceeded"}).encode(),
+        )
+    )
+
+    with pytest.raises(transport.InvokeError) as exc_info:
+        lambda_transport.invoke(lambda_arn, b"{}")
+
+    assert exc_info.value.status == 429
+    assert exc_info.value.error_type == "TooManyRequestsException"
+    assert str(exc_info.value) == "TooManyRequestsException (429): Rate exceeded"